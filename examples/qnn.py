@@ -22,12 +22,17 @@ from scipy.optimize import minimize
 from sklearn.datasets import make_circles
 
 from graphix.parameter import Placeholder
+from graphix.sim.tensornet import ContractionPathCache
 from graphix.transpiler import Circuit
 
 rng = np.random.default_rng()
 
 Z_OP = np.array([[1, 0], [0, -1]])
 
+# The pattern has the same structure for every data point and parameters:
+# the contraction paths of the tensor network are computed once and reused.
+PATH_CACHE = ContractionPathCache()
+
 # %%
 # Dataset
 # -----------------
@@ -184,7 +189,7 @@ class QNN:
         statevector of the output state of the circuit.
         """
         pattern = pattern.xreplace(dict(zip(data_point_placeholders, data_point)))
-        out_state = pattern.simulate_pattern("tensornetwork")
+        out_state = pattern.simulate_pattern("tensornetwork", path_cache=PATH_CACHE)
         sv = out_state.to_statevector().flatten()
         return self.get_expectation_value(sv)
 
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import copy
+import functools
 import typing
 from typing import TYPE_CHECKING, SupportsIndex, TypeVar
 
@@ -139,6 +140,32 @@ class KrausChannel:
         """Return the number of qubits."""
         return self.__nqubit
 
+    @functools.cached_property
+    def is_mixed_unitary(self) -> bool:
+        """Return whether all the Kraus operators are unitary, as for Pauli channels.
+
+        The probability of each branch of such a channel is then the squared modulus of its coefficient,
+        independently of the state. The result is computed once and cached.
+        """
+        identity = np.eye(2**self.__nqubit)
+        return all(np.allclose(data.operator.conj().T @ data.operator, identity) for data in self.__data)
+
+    @functools.cached_property
+    def superoperator(self) -> npt.NDArray[np.complex128]:
+        r"""Return the matrix of the channel in Liouville space.
+
+        For a density matrix :math:`\rho` of the qubits the channel acts on, flattened
+        in row-major order, the flattened :math:`\sum_i |c_i|^2 K_i \rho K_i^\dagger`
+        is the product of this `4**nqubit x 4**nqubit` matrix with the flattened :math:`\rho`.
+        The matrix is computed once and cached.
+        """
+        dim = 4**self.__nqubit
+        result = np.zeros((dim, dim), dtype=np.complex128)
+        for data in self.__data:
+            result += abs(data.coef) ** 2 * np.kron(data.operator, data.operator.conj())
+        result.flags.writeable = False
+        return result
+
 
 def dephasing_channel(prob: float) -> KrausChannel:
     r"""Single-qubit dephasing channel, :math:`(1-p) \rho + p Z  \rho Z`.
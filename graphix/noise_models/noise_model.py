@@ -3,10 +3,19 @@
 from __future__ import annotations
 
 import abc
+from typing import ClassVar
 
 
 class NoiseModel(abc.ABC):
-    """Abstract base class for all noise models."""
+    """Abstract base class for all noise models.
+
+    Noise models whose methods return channels that only change when :meth:`tick_clock`
+    is called can set :attr:`cache_channels` to `True`: :class:`graphix.simulator.PatternSimulator`
+    then calls each method once per clock cycle and reuses the channel.
+    """
+
+    cache_channels: ClassVar[bool] = False
+    "Whether the simulator may reuse the channels returned by the methods until the next clock tick."
 
     # shared by all objects of the child class.
     def assign_simulator(self, simulator) -> None:
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from typing import ClassVar
+
 import numpy as np
 
 from graphix.channels import KrausChannel, KrausData
@@ -14,6 +16,8 @@ class NoiselessNoiseModel(NoiseModel):
     Only return the identity channel.
     """
 
+    cache_channels: ClassVar[bool] = True
+
     def prepare_qubit(self):
         """Return the channel to apply after clean single-qubit preparation. Here just identity."""
         return KrausChannel([KrausData(1.0, np.eye(2))])
@@ -13,22 +13,26 @@ from dataclasses import dataclass
 from typing import TYPE_CHECKING, SupportsFloat
 
 import networkx as nx
+import numpy as np
 import typing_extensions
 
 from graphix import command, parameter
 from graphix.clifford import Clifford
-from graphix.command import Command, CommandKind
+from graphix.command import Command, CommandKind, MeasureUpdate
 from graphix.device_interface import PatternRunner
 from graphix.fundamentals import Axis, Plane, Sign
 from graphix.gflow import find_flow, find_gflow, get_layers
 from graphix.graphsim.graphstate import GraphState
 from graphix.measurements import Domains, PauliMeasurement
-from graphix.simulator import PatternSimulator
+from graphix.simulator import CompiledMeasureMethod, PatternSimulator
 from graphix.states import BasicStates
 from graphix.visualization import GraphVisualizer
 
 if TYPE_CHECKING:
     from abc.collections import Iterator, Mapping
+    from collections.abc import Callable, Sequence
+
+    import numpy.typing as npt
 
     from graphix.parameter import ExpressionOrSupportsFloat, Parameter
     from graphix.sim.base_backend import State
@@ -1283,6 +1287,84 @@ class Pattern:
         sim.run(input_state)
         return sim.backend.state
 
+    def compile(
+        self,
+        parameters: Sequence[Parameter],
+        backend: str = "statevector",
+        input_state: BasicStates = BasicStates.PLUS,
+        **kwargs,
+    ) -> Callable[[npt.ArrayLike], State]:
+        """Compile a parameterized pattern into a function simulating it numerically for given parameter values.
+
+        The pattern is analyzed once: measurement angles that are affine in the
+        parameters are turned into a matrix mapping the parameter values to the
+        angles, and the updates of each measurement by its signals are precomputed.
+        The returned function then runs a fully numerical simulation (without
+        `symbolic=True` and without copying the pattern), which is much faster
+        than simulating the pattern symbolically or calling :meth:`xreplace` for
+        each set of values. Other expressions are evaluated with :func:`graphix.parameter.xreplace`.
+
+        Parameters
+        ----------
+        parameters : sequence of :class:`graphix.parameter.Parameter`
+            parameters, in the order of the values given to the returned function.
+        backend : str
+            simulator backend, see :meth:`simulate_pattern`.
+        input_state :
+            state of the input nodes.
+        kwargs: keyword args for specified backend.
+
+        Returns
+        -------
+        function taking an array of parameter values and returning the
+        quantum state representation for the selected backend.
+
+        .. seealso:: :class:`graphix.simulator.CompiledMeasureMethod`
+        """
+        pattern = self.copy()
+        parameters = list(parameters)
+        positions = {param: i for i, param in enumerate(parameters)}
+        measures = [cmd for cmd in pattern if cmd.kind == CommandKind.M]
+        coeffs = np.zeros((len(measures), len(parameters)))
+        offsets = np.zeros(len(measures))
+        others: list[tuple[int, parameter.Expression]] = []
+        for k, cmd in enumerate(measures):
+            if isinstance(cmd.angle, SupportsFloat):
+                offsets[k] = cmd.angle
+            elif isinstance(cmd.angle, parameter.AffineExpression) and cmd.angle.x in positions:
+                coeffs[k, positions[cmd.angle.x]] = cmd.angle.a
+                offsets[k] = cmd.angle.b
+            else:
+                others.append((k, cmd.angle))
+        nodes = [cmd.node for cmd in measures]
+        updates = {
+            cmd.node: tuple(
+                MeasureUpdate.compute(cmd.plane, s, t, Clifford.I) for s in (False, True) for t in (False, True)
+            )
+            for cmd in measures
+        }
+        if backend == "statevector":
+            kwargs.setdefault("max_space", pattern.max_space())
+
+        def simulate(values: npt.ArrayLike) -> State:
+            values = np.asarray(values, dtype=np.float64)
+            if values.shape != (len(parameters),):
+                raise ValueError(f"Expected {len(parameters)} parameter values, got shape {values.shape}.")
+            angles = coeffs @ values + offsets
+            if others:
+                assignment = dict(zip(parameters, values))
+                for k, angle in others:
+                    value = parameter.xreplace(angle, assignment)
+                    if isinstance(value, parameter.Expression):
+                        raise ValueError(f"Measurement angle {angle} depends on parameters that are not compiled.")
+                    angles[k] = complex(value).real
+            measure_method = CompiledMeasureMethod(dict(zip(nodes, angles * np.pi)), updates, pattern.results.copy())
+            sim = PatternSimulator(pattern, backend=backend, measure_method=measure_method, **kwargs)
+            sim.run(input_state)
+            return sim.backend.state
+
+        return simulate
+
     def run_pattern(self, backend, **kwargs):
         """Run the pattern on cloud-based quantum devices and their simulators.
 
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import bisect
 from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING
 
@@ -14,7 +15,7 @@ from graphix.rng import ensure_rng
 from graphix.states import BasicStates
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable, Iterator
+    from collections.abc import Iterable, Iterator, Sequence
 
     import numpy.typing as npt
     from numpy.random import Generator
@@ -30,16 +31,22 @@ class NodeIndex:
 
     This allows for efficient access and manipulation of qubit orderings throughout the execution of a pattern.
 
+    Qubit indices are not stored explicitly: each node is given an increasing key when it is added,
+    and the index of a node is the rank of its key among the keys of the active nodes.
+    Removing a node therefore does not require to re-attribute the indices of the following nodes.
+
     Attributes
     ----------
         __list (list): A private list of the current active node (labelled with integers).
-        __dict (dict): A private dictionary mapping current node labels (integers) to their corresponding qubit indices
-                       in the backend's internal quantum state.
+        __keys (list): A private sorted list of the keys of the active nodes, in the same order as `__list`.
+        __dict (dict): A private dictionary mapping current node labels (integers) to their keys.
     """
 
     def __init__(self) -> None:
         self.__dict = {}
         self.__list = []
+        self.__keys = []
+        self.__next_key = 0
 
     def __getitem__(self, index: int) -> int:
         """Return the qubit node associated with the specified index."""
@@ -47,7 +54,7 @@ class NodeIndex:
 
     def index(self, node: int) -> int:
         """Return the qubit index associated with the specified node label."""
-        return self.__dict[node]
+        return bisect.bisect_left(self.__keys, self.__dict[node])
 
     def __iter__(self) -> Iterator[int]:
         """Return an iterator over indices."""
@@ -64,16 +71,35 @@ class NodeIndex:
         # The following loop iterates over `self.__list[base:]` instead of `nodes`
         # because the iterable `nodes` can be transient and consumed by the
         # `self.__list.extend` on the line just above.
-        for index, node in enumerate(self.__list[base:]):
-            self.__dict[node] = base + index
+        for node in self.__list[base:]:
+            self.__dict[node] = self.__next_key
+            self.__keys.append(self.__next_key)
+            self.__next_key += 1
 
     def remove(self, node: int) -> None:
-        """Remove the specified node label from the list and dictionary, and re-attributes qubit indices for the remaining nodes."""
-        index = self.__dict[node]
+        """Remove the specified node label from the list and dictionary.
+
+        The qubit indices of the remaining nodes are implicitly shifted, without being re-attributed.
+        """
+        index = self.index(node)
         del self.__list[index]
+        del self.__keys[index]
         del self.__dict[node]
-        for new_index, u in enumerate(self.__list[index:], start=index):
-            self.__dict[u] = new_index
+
+    def reorder(self, order: Iterable[int]) -> None:
+        """Reorder the nodes: the node at index `order[i]` moves to index `i`.
+
+        Parameters
+        ----------
+        order : iterable of int
+            permutation of the indices of the active nodes.
+        """
+        nodes = [self.__list[i] for i in order]
+        if sorted(nodes) != sorted(self.__list):
+            raise ValueError("order must be a permutation of the indices of the active nodes.")
+        self.__list = nodes
+        for node, key in zip(nodes, self.__keys):
+            self.__dict[node] = key
 
     def swap(self, i: int, j: int) -> None:
         """Swap two nodes given their indices."""
@@ -81,8 +107,8 @@ class NodeIndex:
         node_j = self.__list[j]
         self.__list[i] = node_j
         self.__list[j] = node_i
-        self.__dict[node_i] = j
-        self.__dict[node_j] = i
+        self.__dict[node_i] = self.__keys[j]
+        self.__dict[node_j] = self.__keys[i]
 
 
 class State(ABC):
@@ -92,6 +118,25 @@ class State(ABC):
     def flatten(self) -> npt.NDArray[np.complex128]:
         """Return flattened state."""
 
+    def permute(self, order: Sequence[int]) -> None:
+        """Permute the qubits: qubit `i` of the new state is qubit `order[i]` of the current one.
+
+        This default implementation moves the qubits in place one at a time with the `swap`
+        method of the state. States that can permute all the qubits at once override it.
+
+        Parameters
+        ----------
+        order : sequence of int
+            permutation of the qubit indices
+        """
+        # qubits[k] is the current qubit at index k
+        qubits = list(range(len(order)))
+        for i, qubit in enumerate(order):
+            j = qubits.index(qubit)
+            if j != i:
+                self.swap((i, j))
+                qubits[i], qubits[j] = qubits[j], qubits[i]
+
 
 def _op_mat_from_result(vec: tuple[float, float, float], result: bool, symbolic: bool = False) -> npt.NDArray:
     dtype = "O" if symbolic else np.complex128
@@ -161,6 +206,14 @@ class Backend:
         self.__rng = ensure_rng(rng)
         self.__symbolic = symbolic
 
+    def reset(self, rng: Generator | None = None) -> None:
+        """Clear the node index and use the given random-number generator, to run another simulation.
+
+        The state is left to the subclasses, which know how to empty it.
+        """
+        self.__node_index = NodeIndex()
+        self.__rng = ensure_rng(rng)
+
     def copy(self) -> Backend:
         """Return a copy of the backend."""
         return Backend(self.__state, self.__node_index, self.__pr_calc, self.__rng)
@@ -175,6 +228,11 @@ class Backend:
         """Return the state of the backend."""
         return self.__state
 
+    @property
+    def pr_calc(self) -> bool:
+        """Return whether the probability distribution is computed before choosing the measurement result."""
+        return self.__pr_calc
+
     @property
     def node_index(self) -> NodeIndex:
         """Return the node index table of the backend."""
@@ -207,6 +265,19 @@ class Backend:
         control = self.node_index.index(edge[1])
         self.state.entangle((target, control))
 
+    def entangle_edges(self, edges: Iterable[tuple[int, int]]) -> None:
+        """Apply CZ gates to several pairs of connected nodes.
+
+        Backends may override this method to apply all the gates at once.
+
+        Parameters
+        ----------
+        edges : iterable of tuple (i, j)
+            pairs of node indices
+        """
+        for edge in edges:
+            self.entangle_nodes(edge)
+
     def measure(self, node: int, measurement: Measurement) -> bool:
         """Perform measurement of a node and trace out the qubit.
 
@@ -249,12 +320,20 @@ class Backend:
         self.state.evolve_single(clifford.matrix, loc)
 
     def sort_qubits(self, output_nodes: Iterable[int]) -> None:
-        """Sort the qubit order in internal statevector."""
-        for i, ind in enumerate(output_nodes):
-            if self.node_index.index(ind) != i:
-                move_from = self.node_index.index(ind)
-                self.state.swap((i, move_from))
-                self.node_index.swap(i, move_from)
+        """Sort the qubit order in internal statevector.
+
+        During the simulation, the node index is the only record of the order
+        of the qubits in the state. The qubits are permuted here at once, so that
+        the output nodes come first, in the given order; the remaining qubits
+        follow in their current order.
+        """
+        order = [self.node_index.index(node) for node in output_nodes]
+        outputs = set(order)
+        order.extend(i for i in range(len(self.node_index)) if i not in outputs)
+        if order == sorted(order):
+            return
+        self.state.permute(order)
+        self.node_index.reorder(order)
 
     def finalize(self, output_nodes: Iterable[int]) -> None:
         """To be run at the end of pattern simulation."""
@@ -0,0 +1,299 @@
+"""MBQC state vector backend simulating a batch of runs at once."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import numpy.typing as npt
+
+from graphix.command import CommandKind
+from graphix.ops import Ops
+from graphix.rng import ensure_rng
+from graphix.sim.base_backend import Backend, State
+from graphix.sim.statevec import Statevec, _cz_slice
+from graphix.states import BasicStates
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping, Sequence
+
+    from numpy.random import Generator
+
+    from graphix import command
+    from graphix.clifford import Clifford
+    from graphix.fundamentals import Plane
+    from graphix.measurements import Measurement
+    from graphix.parameter import Parameter
+    from graphix.sim.statevec import Data
+    from graphix.simulator import MeasureMethod
+
+
+class BatchedStatevectorBackend(Backend):
+    """MBQC simulator running a batch of state vector simulations of the same pattern at once.
+
+    The state of all the members of the batch is stored in a single array,
+    so that each command is applied to the whole batch in one vectorized
+    operation. Measurement outcomes are drawn independently for each member;
+    measurement angles may depend on the member through parameters and signals,
+    and byproduct corrections are applied only to the members where the
+    corresponding signal is set.
+
+    Measurement results, as stored by :class:`graphix.simulator.BatchedMeasureMethod`,
+    are boolean arrays with one value per member of the batch.
+    """
+
+    def __init__(self, batch_size: int, parameters: Mapping[Parameter, npt.ArrayLike] | None = None, **kwargs) -> None:
+        """Construct a batched state vector backend.
+
+        Parameters
+        ----------
+        batch_size : int
+            number of simulations run at once.
+        parameters : mapping from :class:`graphix.parameter.Parameter` to array_like, optional
+            values of the parameters appearing in measurement angles,
+            given as arrays of length `batch_size` (one value per member).
+        kwargs :
+            see :class:`graphix.sim.base_backend.Backend`.
+        """
+        super().__init__(BatchedStatevec(batch_size), **kwargs)
+        if self.symbolic:
+            raise ValueError("Batched simulation does not support symbolic computation.")
+        if parameters is None:
+            parameters = {}
+        self.__parameters = {key: _batched_values(value, batch_size) for key, value in parameters.items()}
+
+    @property
+    def batch_size(self) -> int:
+        """Return the number of simulations run at once."""
+        return self.state.batch_size
+
+    @property
+    def parameters(self) -> dict[Parameter, npt.NDArray[np.float64]]:
+        """Return the values of the parameters for each member of the batch."""
+        return self.__parameters
+
+    def entangle_edges(self, edges: Iterable[tuple[int, int]]) -> None:
+        """Apply CZ gates along several edges in a single sweep over the state.
+
+        Parameters
+        ----------
+        edges : iterable of tuple (i, j)
+            pairs of node indices
+        """
+        self.state.entangle_edges((self.node_index.index(edge[0]), self.node_index.index(edge[1])) for edge in edges)
+
+    def measure(self, node: int, measurement: Measurement) -> npt.NDArray[np.bool_]:
+        """Perform measurement of a node in all the members of the batch and trace out the qubit.
+
+        Parameters
+        ----------
+        node: int
+        measurement: Measurement
+            the angle is either a float or an array with one angle per member
+
+        Returns
+        -------
+        numpy.ndarray : boolean array of the outcomes
+        """
+        loc = self.node_index.index(node)
+        result = self.state.measure_and_remove(
+            loc, measurement.plane, measurement.angle, rng=self.rng, pr_calc=self.pr_calc
+        )
+        self.node_index.remove(node)
+        return result
+
+    def correct_byproduct(self, cmd: command.X | command.Z, measure_method: MeasureMethod) -> None:
+        """Apply the X or Z byproduct correction to the members of the batch where its signal is set."""
+        signal = sum(np.asarray(measure_method.get_measure_result(j), dtype=np.int64) for j in cmd.domain) % 2 == 1
+        mask = np.broadcast_to(signal, (self.batch_size,))
+        if not mask.any():
+            return
+        op = Ops.X if cmd.kind == CommandKind.X else Ops.Z
+        self.state.evolve_single(op, self.node_index.index(cmd.node), mask=mask)
+
+    def apply_clifford(self, node: int, clifford: Clifford) -> None:
+        """Apply single-qubit Clifford gate to all the members of the batch."""
+        self.state.evolve_single(clifford.matrix, self.node_index.index(node))
+
+
+class BatchedStatevec(State):
+    """Batch of state vectors of the same number of qubits.
+
+    The amplitudes are stored in `psi`, an array of shape `(batch_size, 2, ..., 2)`:
+    the first axis indexes the members of the batch and qubit `i` is axis `i + 1`.
+    Qubit indices given to the methods do not count the batch axis.
+    """
+
+    def __init__(self, batch_size: int, data: Data = BasicStates.PLUS, nqubit: int = 0) -> None:
+        """Initialize a batch where all the members are in the same state.
+
+        Parameters
+        ----------
+        batch_size : int
+            number of members
+        data : Data
+            initial state of each member, see :class:`graphix.sim.statevec.Statevec`
+        nqubit : int
+            number of qubits
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer.")
+        psi = Statevec(data=data, nqubit=nqubit).psi
+        self.psi = np.array(np.broadcast_to(psi, (batch_size, *psi.shape)), dtype=np.complex128)
+
+    def __len__(self) -> int:
+        """Return the number of members of the batch."""
+        return self.batch_size
+
+    def __getitem__(self, index: int) -> Statevec:
+        """Return a copy of the state of a member of the batch."""
+        result = Statevec(nqubit=0)
+        result.psi = self.psi[index].copy()
+        return result
+
+    @property
+    def batch_size(self) -> int:
+        """Return the number of members of the batch."""
+        return self.psi.shape[0]
+
+    @property
+    def nqubit(self) -> int:
+        """Return the number of qubits."""
+        return self.psi.ndim - 1
+
+    def flatten(self) -> npt.NDArray:
+        """Return the state vectors as a 2D array, one row per member."""
+        return self.psi.reshape(self.batch_size, -1)
+
+    def add_nodes(self, nqubit: int, data: Data) -> None:
+        """Add qubits in the same state to all the members."""
+        vec = Statevec(nqubit=nqubit, data=data).flatten()
+        psi = self.flatten()[:, :, np.newaxis] * vec
+        self.psi = psi.reshape((self.batch_size,) + (2,) * (self.nqubit + nqubit))
+
+    def evolve_single(self, op: npt.ArrayLike, i: int, mask: npt.ArrayLike | None = None) -> None:
+        """Apply a single-qubit operation.
+
+        Parameters
+        ----------
+        op : array_like
+            2*2 matrix, or array of shape `(batch_size, 2, 2)` of per-member matrices
+        i : int
+            qubit index
+        mask : array_like of bool, optional
+            if given, the operation is only applied to the members where `mask` is `True`.
+        """
+        op = np.asarray(op)
+        if mask is not None:
+            op = np.where(np.asarray(mask)[:, np.newaxis, np.newaxis], op, np.eye(2))
+        view = self._inplace_psi(np.result_type(self.psi, op)).reshape(self.batch_size, 2**i, 2, -1)
+        x = view[:, :, 0]
+        y = view[:, :, 1]
+        if op.ndim == 2:
+            (a, b), (c, d) = op
+        else:
+            a, b, c, d = (op[:, j, k, np.newaxis, np.newaxis] for j, k in ((0, 0), (0, 1), (1, 0), (1, 1)))
+        x_new = a * x + b * y
+        y *= d
+        y += c * x
+        x[...] = x_new
+
+    def _inplace_psi(self, dtype: npt.DTypeLike) -> npt.NDArray:
+        """Return `self.psi` as a writeable C-contiguous array of the given dtype, copying only if needed.
+
+        After :meth:`permute`, `self.psi` is a transposed view: reshaping it would then silently copy it.
+        """
+        psi = self.psi
+        if psi.dtype != dtype or not psi.flags.c_contiguous or not psi.flags.writeable:
+            psi = np.array(psi, dtype=dtype, order="C")
+            self.psi = psi
+        return psi
+
+    def entangle(self, edge: tuple[int, int]) -> None:
+        """Apply CZ between two qubits of all the members."""
+        view = self.psi[(slice(None), *_cz_slice(self.nqubit, edge))]
+        np.negative(view, out=view)
+
+    def entangle_edges(self, edges: Iterable[tuple[int, int]]) -> None:
+        """Apply CZ along several edges in all the members, in a single sweep over the state."""
+        parity = np.zeros((2,) * self.nqubit, dtype=np.bool_)
+        for edge in edges:
+            view = parity[_cz_slice(self.nqubit, edge)]
+            np.logical_not(view, out=view)
+        np.negative(self.psi, out=self.psi, where=parity)
+
+    def swap(self, qubits: tuple[int, int]) -> None:
+        """Swap two qubits in all the members."""
+        self.psi = np.ascontiguousarray(np.swapaxes(self.psi, qubits[0] + 1, qubits[1] + 1))
+
+    def permute(self, order: Sequence[int]) -> None:
+        """Permute the qubits in all the members, see :meth:`graphix.sim.statevec.Statevec.permute`."""
+        self.psi = np.transpose(self.psi, (0, *(i + 1 for i in order)))
+
+    def measure_and_remove(
+        self,
+        qubit: int,
+        plane: Plane,
+        angle: npt.ArrayLike,
+        rng: Generator | None = None,
+        pr_calc: bool = True,
+    ) -> npt.NDArray[np.bool_]:
+        """Measure a qubit in all the members and remove it from the state.
+
+        Parameters
+        ----------
+        qubit : int
+            qubit index
+        plane : Plane
+            measurement plane
+        angle : array_like
+            measurement angle in radian, or array of per-member angles
+        rng : :class:`np.random.Generator`, optional
+            random number generator used to choose the outcomes
+        pr_calc : bool
+            whether to draw the outcomes according to their probability (`True`, default)
+            or with 50% probability for each outcome (`False`).
+
+        Returns
+        -------
+        numpy.ndarray : boolean array of the outcomes
+        """
+        rng = ensure_rng(rng)
+        batch = np.arange(self.batch_size)
+        angle = np.broadcast_to(np.asarray(angle, dtype=np.float64), (self.batch_size,))
+        # observable measured on each member, with eigenvalue 1 for outcome 0
+        observable = (
+            np.cos(angle)[:, np.newaxis, np.newaxis] * plane.cos.matrix
+            + np.sin(angle)[:, np.newaxis, np.newaxis] * plane.sin.matrix
+        )
+        projector_0 = (np.eye(2) + observable) / 2
+        projector_1 = (np.eye(2) - observable) / 2
+        view = self._inplace_psi(self.psi.dtype).reshape(self.batch_size, 2**qubit, 2, -1)
+        x = view[:, :, 0]
+        y = view[:, :, 1]
+        rho = np.empty((self.batch_size, 2, 2), dtype=np.complex128)
+        rho[:, 0, 0] = np.einsum("bij,bij->b", x.conj(), x)
+        rho[:, 0, 1] = np.einsum("bij,bij->b", y.conj(), x)
+        rho[:, 1, 0] = rho[:, 0, 1].conj()
+        rho[:, 1, 1] = np.einsum("bij,bij->b", y.conj(), y)
+        norm2 = (rho[:, 0, 0] + rho[:, 1, 1]).real
+        prob_0 = np.einsum("bij,bji->b", projector_0, rho).real / norm2
+        result = rng.random(self.batch_size) > prob_0 if pr_calc else rng.integers(2, size=self.batch_size) == 1
+        op_mat = np.where(result[:, np.newaxis, np.newaxis], projector_1, projector_0)
+        prob = np.where(result, 1 - prob_0, prob_0)
+        if np.any(np.isclose(prob, 0)):
+            raise ValueError(f"The measurement of qubit {qubit} has an outcome of zero probability.")
+        # See `Statevec.measure_and_remove`: row k of the projector is used as the bra.
+        k = np.isclose(op_mat[:, 0, 0], 0).astype(np.intp)
+        coef = op_mat[batch, k] / np.sqrt(op_mat[batch, k, k].real * prob * norm2)[:, np.newaxis]
+        psi = coef[:, 0, np.newaxis, np.newaxis] * x + coef[:, 1, np.newaxis, np.newaxis] * y
+        self.psi = psi.reshape((self.batch_size,) + (2,) * (self.nqubit - 1))
+        return result
+
+
+def _batched_values(value: npt.ArrayLike, batch_size: int) -> npt.NDArray[np.float64]:
+    """Return the values of a parameter as an array with one value per member of the batch."""
+    values = np.asarray(value, dtype=np.float64)
+    if values.shape not in {(), (batch_size,)}:
+        raise ValueError(f"Expected a scalar or {batch_size} values per parameter, got shape {values.shape}.")
+    return np.broadcast_to(values, (batch_size,))
@@ -6,6 +6,7 @@ Simulate MBQC with density matrix representation.
 from __future__ import annotations
 
 import copy
+import itertools
 import sys
 from collections.abc import Collection, Iterable
 from typing import TYPE_CHECKING, SupportsComplex, SupportsFloat
@@ -17,14 +18,30 @@ from graphix import parameter, states
 from graphix.channels import KrausChannel
 from graphix.parameter import Expression, ExpressionOrSupportsComplex
 from graphix.sim.base_backend import Backend, State
-from graphix.sim.statevec import CNOT_TENSOR, CZ_TENSOR, SWAP_TENSOR, Statevec
+from graphix.sim.statevec import (
+    CNOT_TENSOR,
+    CZ_TENSOR,
+    SWAP_TENSOR,
+    Statevec,
+    _apply_pair_inplace,
+    _cast_operator,
+    _chunk_slices,
+    _cz_slice,
+    _draw_measurement,
+    _map_chunks,
+    _split_axis,
+)
 from graphix.states import BasicStates
 
 if TYPE_CHECKING:
-    from collections.abc import Mapping
+    from collections.abc import Mapping, Sequence
 
     import numpy.typing as npt
+    from numpy.random import Generator
 
+    from graphix.clifford import Clifford
+    from graphix.fundamentals import Plane
+    from graphix.measurements import Measurement
     from graphix.parameter import ExpressionOrSupportsFloat, Parameter
 
 
@@ -35,6 +52,7 @@ class DensityMatrix(State):
         self,
         data: Data = BasicStates.PLUS,
         nqubit: int | None = None,
+        dtype: npt.DTypeLike | None = None,
     ):
         """Initialize density matrix objects.
 
@@ -57,10 +75,14 @@ class DensityMatrix(State):
         :type data: Data
         :param nqubit: number of qubits to prepare, defaults to `None`
         :type nqubit: int, optional
+        :param dtype: dtype of numerical entries, defaults to `np.complex128` (or the dtype of `data` for copies)
+        :type dtype: numpy dtype, optional
         """
         if nqubit is not None and nqubit < 0:
             raise ValueError("nqubit must be a non-negative integer.")
 
+        self.__buffer: npt.NDArray | None = None
+
         def check_size_consistency(mat) -> None:
             if nqubit is not None and mat.shape != (2**nqubit, 2**nqubit):
                 raise ValueError(
@@ -71,6 +93,7 @@ class DensityMatrix(State):
             check_size_consistency(data)
             # safe: https://numpy.org/doc/stable/reference/generated/numpy.ndarray.copy.html
             self.rho = data.rho.copy()
+            self.__cast(dtype)
             return
         if isinstance(data, Iterable):
             input_list = list(data)
@@ -89,12 +112,19 @@ class DensityMatrix(State):
                                 raise ValueError("Density matrix must have unit trace.")
                             if not lv.is_psd(self.rho):
                                 raise ValueError("Density matrix must be positive semi-definite.")
+                        self.__cast(dtype)
                         return
                 except TypeError:
                     pass
         statevec = Statevec(data, nqubit)
         # NOTE this works since np.outer flattens the inputs!
         self.rho = np.outer(statevec.psi, statevec.psi.conj())
+        self.__cast(dtype)
+
+    def __cast(self, dtype: npt.DTypeLike | None) -> None:
+        """Convert numerical entries to `dtype`, if given."""
+        if dtype is not None and self.rho.dtype != np.object_:
+            self.rho = self.rho.astype(dtype, copy=False)
 
     @property
     def nqubit(self) -> int:
@@ -105,13 +135,89 @@ class DensityMatrix(State):
         """Return a string description."""
         return f"DensityMatrix object, with density matrix {self.rho} and shape {self.dims()}."
 
+    def __copy__(self) -> DensityMatrix:
+        """Return a copy of the density matrix.
+
+        The entries are copied, since they are updated in place, and the copy has no reserved buffer.
+        """
+        result = self.__class__.__new__(self.__class__)
+        result.__dict__.update(self.__dict__)
+        result.rho = np.array(self.rho)
+        result.__buffer = None
+        return result
+
     def add_nodes(self, nqubit, data) -> None:
         """Add nodes to the density matrix."""
-        dm_to_add = DensityMatrix(nqubit=nqubit, data=data)
+        # new qubits are prepared in the precision of the state
+        dtype = self.rho.dtype if np.issubdtype(self.rho.dtype, np.complexfloating) else None
+        dm_to_add = DensityMatrix(nqubit=nqubit, data=data, dtype=dtype)
         self.tensor(dm_to_add)
 
+    def reserve(self, nqubit: int) -> None:
+        """Reserve a buffer large enough to hold a density matrix of `nqubit` qubits.
+
+        Once reserved, :meth:`tensor` (and therefore :meth:`add_nodes`) and
+        :meth:`remove_qubit` store the density matrix as a view on the front of the
+        buffer instead of allocating a new matrix each time, as long as it fits.
+        Larger density matrices are allocated as usual.
+
+        Parameters
+        ----------
+        nqubit : int
+            number of qubits, typically given by :meth:`graphix.pattern.Pattern.max_space`
+        """
+        if nqubit < 0:
+            raise ValueError("nqubit must be a non-negative integer.")
+        if self.rho.dtype == np.object_:
+            return
+        if self.__buffer is not None and len(self.__buffer) >= 4**nqubit:
+            return
+        dtype = self.rho.dtype if np.issubdtype(self.rho.dtype, np.complexfloating) else np.complex128
+        buffer = np.empty(4**nqubit, dtype=dtype)
+        rho = buffer[: self.rho.size].reshape(self.rho.shape)
+        rho[...] = self.rho
+        self.__buffer = buffer
+        self.rho = rho
+
+    def _reserved(self, size: int, dtype: npt.DTypeLike) -> npt.NDArray | None:
+        """Return the first `size` elements of the reserved buffer, or `None` if they cannot be used.
+
+        The buffer can be used if it is large enough and of the given dtype, and
+        if it does not hold the current density matrix elsewhere than at its front.
+        """
+        buffer = self.__buffer
+        if buffer is None or len(buffer) < size or buffer.dtype != dtype:
+            return None
+        if np.may_share_memory(self.rho, buffer) and not self._in_buffer():
+            return None
+        return buffer[:size]
+
+    def _in_buffer(self) -> bool:
+        """Return whether the density matrix is stored contiguously at the front of the reserved buffer."""
+        buffer = self.__buffer
+        return (
+            buffer is not None
+            and self.rho.base is buffer
+            and self.rho.flags.c_contiguous
+            and self.rho.ctypes.data == buffer.ctypes.data
+        )
+
+    def _inplace_rho(self, dtype: npt.DTypeLike) -> npt.NDArray:
+        """Return `self.rho` as a writeable C-contiguous array of the given dtype, copying only if needed."""
+        rho = self.rho
+        if rho.dtype != dtype or not rho.flags.c_contiguous or not rho.flags.writeable:
+            rho = np.array(rho, dtype=dtype, order="C")
+            self.rho = rho
+        return rho
+
     def evolve_single(self, op, i) -> None:
-        """Single-qubit operation.
+        r"""Single-qubit operation.
+
+        Numerical density matrices are updated in place: :math:`\rho` is handled as
+        a state of `2 * nqubit` qubits, to which `op` is applied on qubit `i` and its
+        conjugate on qubit `nqubit + i`, since :math:`U \rho U^\dagger` is
+        :math:`(U \otimes U^*)` applied to the flattened :math:`\rho`.
+        Symbolic density matrices (or operators) with `dtype=object` are evolved by tensor contraction.
 
         Parameters
         ----------
@@ -123,11 +229,23 @@ class DensityMatrix(State):
         assert i >= 0 and i < self.nqubit
         if op.shape != (2, 2):
             raise ValueError("op must be 2*2 matrix.")
-
-        rho_tensor = self.rho.reshape((2,) * self.nqubit * 2)
-        rho_tensor = np.tensordot(np.tensordot(op, rho_tensor, axes=(1, i)), op.conj().T, axes=(i + self.nqubit, 0))
-        rho_tensor = np.moveaxis(rho_tensor, (0, -1), (i, i + self.nqubit))
-        self.rho = rho_tensor.reshape((2**self.nqubit, 2**self.nqubit))
+        self._evolve_single(op, i)
+
+    def _evolve_single(self, op: npt.NDArray, i: int) -> None:
+        """Apply the single-qubit operation `op` to qubit `i`, without checking the arguments (see :meth:`evolve_single`)."""
+        nqubit = self.nqubit
+        if op.dtype != self.rho.dtype:
+            # only in single precision or for symbolic matrices: operators are stored in double precision
+            op = _cast_operator(op, self.rho.dtype)
+        if np.object_ in (self.rho.dtype, op.dtype):
+            rho_tensor = self.rho.reshape((2,) * nqubit * 2)
+            rho_tensor = np.tensordot(np.tensordot(op, rho_tensor, axes=(1, i)), op.conj().T, axes=(i + nqubit, 0))
+            rho_tensor = np.moveaxis(rho_tensor, (0, -1), (i, i + nqubit))
+            self.rho = rho_tensor.reshape((2**nqubit, 2**nqubit))
+            return
+        rho_tensor = self._inplace_rho(np.result_type(self.rho, op)).reshape((2,) * nqubit * 2)
+        _apply_pair_inplace(*_split_axis(rho_tensor, i), op)
+        _apply_pair_inplace(*_split_axis(rho_tensor, nqubit + i), op.conj())
 
     def evolve(self, op: npt.NDArray, qargs: Collection[int]) -> None:
         """Multi-qubit operation.
@@ -160,6 +278,12 @@ class DensityMatrix(State):
         if len(set(qargs)) != nqb_op:
             raise ValueError("A repeated target qubit index is not possible.")
 
+        self._evolve(op, qargs)
+
+    def _evolve(self, op: npt.NDArray, qargs: Collection[int]) -> None:
+        """Apply the multi-qubit operation `op` to the qubits `qargs`, without checking the arguments (see :meth:`evolve`)."""
+        nqb_op = len(qargs)
+        op = _cast_operator(op, self.rho.dtype)
         op_tensor = op.reshape((2,) * 2 * nqb_op)
 
         rho_tensor = self.rho.reshape((2,) * self.nqubit * 2)
@@ -218,7 +342,15 @@ class DensityMatrix(State):
         """
         if not isinstance(other, DensityMatrix):
             other = DensityMatrix(other)
-        self.rho = np.kron(self.rho, other.rho)
+        dim, dim_other = len(self.rho), len(other.rho)
+        buffer = self._reserved((dim * dim_other) ** 2, np.result_type(self.rho, other.rho))
+        if buffer is None:
+            self.rho = np.kron(self.rho, other.rho)
+            return
+        if not self._in_buffer():
+            buffer[: self.rho.size].reshape(self.rho.shape)[...] = self.rho
+        _kron_matrix_inplace(buffer, dim, other.rho)
+        self.rho = buffer.reshape(dim * dim_other, dim * dim_other)
 
     def cnot(self, edge: tuple[int, int]) -> None:
         """Apply CNOT gate to density matrix.
@@ -240,6 +372,19 @@ class DensityMatrix(State):
         """
         self.evolve(SWAP_TENSOR.reshape(4, 4), edge)
 
+    def permute(self, order: Sequence[int]) -> None:
+        """Permute the qubits: qubit `i` of the new state is qubit `order[i]` of the current one.
+
+        Parameters
+        ----------
+            order : sequence of int
+                permutation of the qubit indices.
+        """
+        nqubit = self.nqubit
+        rho_tensor = self.rho.reshape((2,) * nqubit * 2)
+        rho_tensor = np.transpose(rho_tensor, (*order, *(nqubit + i for i in order)))
+        self.rho = rho_tensor.reshape((2**nqubit, 2**nqubit))
+
     def entangle(self, edge: tuple[int, int]) -> None:
         """Connect graph nodes.
 
@@ -247,17 +392,41 @@ class DensityMatrix(State):
         ----------
             edge : (int, int) or [int, int]
                 (control, target) qubit indices.
+
+        Notes
+        -----
+        CZ is real and diagonal: numerical density matrices are updated in place,
+        by flipping the sign of the entries where both qubits are in state 1 on
+        the row side, then on the column side.
         """
-        self.evolve(CZ_TENSOR.reshape(4, 4), edge)
+        nqubit = self.nqubit
+        if len(edge) != 2 or edge[0] == edge[1] or not all(0 <= i < nqubit for i in edge):
+            raise ValueError(f"Incorrect edge {edge} for a density matrix of {nqubit} qubits.")
+        if self.rho.dtype == np.object_:
+            self._evolve(CZ_TENSOR.reshape(4, 4), edge)
+            return
+        rho_tensor = self._inplace_rho(self.rho.dtype).reshape((2,) * nqubit * 2)
+        for qubits in (edge, tuple(nqubit + i for i in edge)):
+            view = rho_tensor[_cz_slice(2 * nqubit, qubits)]
+            np.negative(view, out=view)
 
     def normalize(self) -> None:
         """Normalize density matrix."""
         self.rho = self.rho / np.trace(self.rho)
 
     def remove_qubit(self, loc) -> None:
-        """Remove a qubit."""
+        """Remove a qubit.
+
+        If a buffer has been reserved with :meth:`reserve`, the normalized
+        density matrix is stored at its front.
+        """
         self.ptrace(loc)
-        self.normalize()
+        rho = self.rho
+        buffer = self._reserved(rho.size, rho.dtype)
+        if buffer is None:
+            self.normalize()
+            return
+        self.rho = np.divide(rho, np.trace(rho), out=buffer.reshape(rho.shape))
 
     def ptrace(self, qargs: Collection[int] | int) -> None:
         """Partial trace.
@@ -277,14 +446,91 @@ class DensityMatrix(State):
         assert all(qarg >= 0 and qarg < n for qarg in qargs)
 
         rho_res = self.rho.reshape((2,) * n * 2)
-        # ket, bra indices to trace out
-        trace_axes = list(qargs) + [n + qarg for qarg in qargs]
-        rho_res = np.tensordot(
-            np.eye(2**qargs_num).reshape((2,) * qargs_num * 2), rho_res, axes=(list(range(2 * qargs_num)), trace_axes)
-        )
+        if self.rho.dtype == np.object_:
+            # ket, bra indices to trace out
+            trace_axes = list(qargs) + [n + qarg for qarg in qargs]
+            rho_res = np.tensordot(
+                _cast_operator(np.eye(2**qargs_num), self.rho.dtype).reshape((2,) * qargs_num * 2),
+                rho_res,
+                axes=(list(range(2 * qargs_num)), trace_axes),
+            )
+        else:
+            # the bra indices to trace out are labelled as the ket ones: einsum sums over the diagonal
+            labels = [i - n if i - n in qargs else i for i in range(2 * n)]
+            rho_res = np.einsum(rho_res, labels, [i for i in range(2 * n) if i not in qargs and i - n not in qargs])
 
         self.rho = rho_res.reshape((2**nqubit_after, 2**nqubit_after))
 
+    def reduced_density_single(self, loc: int) -> npt.NDArray:
+        """Return the 2*2 reduced density matrix of the qubit `loc`, with the other qubits traced out.
+
+        The matrix is not normalized: its trace is the trace of the density matrix.
+        """
+        n = self.nqubit
+        labels = [i if i < n or i - n == loc else i - n for i in range(2 * n)]
+        return np.einsum(self.rho.reshape((2,) * n * 2), labels, [loc, n + loc])
+
+    def measure_and_remove(
+        self,
+        qubit: int,
+        plane: Plane,
+        angle: float,
+        rng: Generator | None = None,
+        pr_calc: bool = True,
+    ) -> bool:
+        """Measure a qubit and remove it from the density matrix.
+
+        The outcome is drawn from :meth:`reduced_density_single`. Then, the block
+        of the density matrix projected on the measured basis state is computed,
+        already normalized, from the four blocks where the qubit has a fixed value
+        on the row and column sides: this replaces the successive projection,
+        partial trace and normalization of :meth:`evolve_single` and :meth:`remove_qubit`.
+        If a buffer has been reserved with :meth:`reserve`, the result is stored at its front.
+
+        Parameters
+        ----------
+        qubit : int
+            qubit index
+        plane : Plane
+            measurement plane
+        angle : float
+            measurement angle in radian
+        rng : :class:`np.random.Generator`, optional
+            random number generator used to choose the outcome
+        pr_calc : bool
+            whether to draw the outcome according to its probability (`True`, default)
+            or with 50% probability for each outcome (`False`).
+
+        Returns
+        -------
+        bool : measurement outcome
+        """
+        result, coef = _draw_measurement(qubit, self.reduced_density_single(qubit), plane, angle, rng, pr_calc)
+        weights = _cast_operator(np.outer(coef, coef.conj()), self.rho.dtype)
+        n = self.nqubit
+        rho_tensor = self._inplace_rho(self.rho.dtype).reshape((2,) * n * 2)
+        blocks = []
+        for row, col in itertools.product((0, 1), repeat=2):
+            if weights[row, col] != 0:
+                index = [slice(None)] * n * 2
+                index[qubit], index[n + qubit] = row, col
+                blocks.append((weights[row, col], rho_tensor[tuple(index)]))
+        dtype = np.result_type(self.rho, weights)
+        size = self.rho.size // 4
+        buffer = self._reserved(size, dtype)
+        # Writing into the buffer holding the matrix is safe: the chunks are
+        # visited in increasing order, and the entries written at any point
+        # are stored before the ones that remain to be read.
+        rho = np.empty(size, dtype=dtype) if buffer is None else buffer
+        view = rho.reshape(blocks[0][1].shape)
+
+        def project(index: tuple[int | slice, ...]) -> None:
+            view[index] = sum(weight * block[index] for weight, block in blocks)
+
+        _map_chunks(project, view.shape, 1)
+        self.rho = rho.reshape(2 ** (n - 1), 2 ** (n - 1))
+        return result
+
     def fidelity(self, statevec: Statevec) -> float:
         """Calculate the fidelity against reference statevector.
 
@@ -316,25 +562,47 @@ class DensityMatrix(State):
         Raises
         ------
         ValueError
-            If the final density matrix is not normalized after application of the channel.
+            If the channel does not preserve the trace, in which case the density matrix is left untouched.
             This shouldn't happen since :class:`graphix.channel.KrausChannel` objects are normalized by construction.
         ....
-        """
-        result_array = np.zeros((2**self.nqubit, 2**self.nqubit), dtype=np.complex128)
 
+        Notes
+        -----
+        The density matrix is updated in place, block by block, with the superoperator of the
+        channel (see :attr:`graphix.channels.KrausChannel.superoperator`): the entries
+        of the density matrix are grouped by the values `(a, b)` of the target qubits
+        on both sides, and the groups are mixed by the superoperator.
+        Pauli channels (and more generally channels whose Kraus operators each map a basis
+        state to a single basis state, such as amplitude damping) only mix the groups with the
+        same `a ^ b` among themselves: the diagonal groups are mixed together and, for depolarising
+        or dephasing channels, each off-diagonal group is simply rescaled.
+        """
         if not isinstance(channel, KrausChannel):
             raise TypeError("Can't apply a channel that is not a Channel object.")
+        qargs = list(qargs)
+        if channel.nqubit != len(qargs):
+            raise ValueError("The dimension of the channel doesn't match the number of targets.")
+        if not all(0 <= i < self.nqubit for i in qargs):
+            raise ValueError("Incorrect target indices.")
+        if len(set(qargs)) != len(qargs):
+            raise ValueError("A repeated target qubit index is not possible.")
 
-        for k_op in channel:
-            dm = copy.copy(self)
-            dm.evolve(k_op.operator, qargs)
-            result_array += k_op.coef * np.conj(k_op.coef) * dm.rho
-            # reinitialize to input density matrix
-
-        if not np.allclose(result_array.trace(), 1.0):
-            raise ValueError("The output density matrix is not normalized, check the channel definition.")
-
-        self.rho = result_array
+        dim = 2 ** len(qargs)
+        # checked before the update in place: the trace of the result is the sum of the diagonal rows
+        diagonal = [a * dim + a for a in range(dim)]
+        if not np.allclose(channel.superoperator[diagonal].sum(axis=0), np.eye(dim).flatten()):
+            raise ValueError("The channel does not preserve the trace, check the channel definition.")
+        dtype = np.result_type(self.rho, np.complex64)
+        superop = _cast_operator(channel.superoperator, dtype)
+        rho = self._inplace_rho(dtype)
+        views = _channel_views(rho, qargs)
+        if _preserves_differences(superop, dim):
+            # the views (a, a ^ d) only mix among themselves, for each d
+            for difference in range(dim):
+                indices = [a * dim + (a ^ difference) for a in range(dim)]
+                _mix_views([views[i] for i in indices], superop[np.ix_(indices, indices)])
+        else:
+            _mix_views(views, superop)
 
     def subs(self, variable: Parameter, substitute: ExpressionOrSupportsFloat) -> DensityMatrix:
         """Return a copy of the density matrix where all occurrences of the given variable in measurement angles are substituted by the given value."""
@@ -349,12 +617,104 @@ class DensityMatrix(State):
         return result
 
 
+def _kron_matrix_inplace(buffer: npt.NDArray, dim: int, other: npt.NDArray) -> None:
+    """Overwrite the front of `buffer` with the Kronecker product of its first `dim * dim` elements, as a matrix, and `other`."""
+    dim_other = len(other)
+    out = buffer[: (dim * dim_other) ** 2].reshape(dim, dim_other, dim, dim_other)
+    # Rows are processed from the end: the entries of a row of the original matrix are
+    # read before the row of the product is written, and only overwrite rows already processed.
+    for row in range(dim - 1, -1, -1):
+        rho_row = buffer[row * dim : (row + 1) * dim].copy()
+        np.multiply(other[:, None, :], rho_row[None, :, None], out=out[row])
+
+
+def _preserves_differences(superop: npt.NDArray, dim: int) -> bool:
+    """Return whether the superoperator only maps the entries `(a, b)` to entries `(a2, b2)` with `a ^ b == a2 ^ b2`."""
+    indices = np.arange(dim * dim)
+    differences = (indices // dim) ^ (indices % dim)
+    mask = differences[:, None] != differences[None, :]
+    return not np.any(superop[mask])
+
+
+def _mix_views(views: list[npt.NDArray], matrix: npt.NDArray) -> None:
+    """Replace in place the views by their linear combinations given by the rows of `matrix`."""
+    diagonal = np.diagonal(matrix)
+    if np.array_equal(matrix, np.diag(diagonal)):
+        for view, factor in zip(views, diagonal):
+            if factor != 1:
+                np.multiply(view, factor, out=view)
+        return
+    for index in _chunk_slices(views[0].shape):
+        block = np.stack([view[index] for view in views])
+        for view, value in zip(views, np.tensordot(matrix, block, axes=(1, 0))):
+            view[index] = value
+
+
+def _channel_views(rho: npt.NDArray, qargs: list[int]) -> list[npt.NDArray]:
+    """Return the views on `rho` for each pair `(a, b)` of values of the qubits `qargs` on the row and column sides.
+
+    The views are listed in the row-major order of `(a, b)`, as the entries of a
+    flattened density matrix of the qubits `qargs`.
+    """
+    nqubit = rho.shape[0].bit_length() - 1
+    rho_tensor = rho.reshape((2,) * nqubit * 2)
+    views = []
+    for bits in itertools.product((0, 1), repeat=2 * len(qargs)):
+        index = [slice(None)] * nqubit * 2
+        for axis, bit in zip(qargs + [nqubit + i for i in qargs], bits):
+            # a slice rather than an integer, so that the result is always a view
+            index[axis] = slice(bit, bit + 1)
+        views.append(rho_tensor[tuple(index)])
+    return views
+
+
 class DensityMatrixBackend(Backend):
     """MBQC simulator with density matrix method."""
 
-    def __init__(self, **kwargs) -> None:
-        """Construct a density matrix backend."""
-        super().__init__(DensityMatrix(nqubit=0), **kwargs)
+    def __init__(self, max_space: int | None = None, dtype: npt.DTypeLike = np.complex128, **kwargs) -> None:
+        """Construct a density matrix backend.
+
+        Parameters
+        ----------
+        max_space : int, optional
+            maximal number of qubits simultaneously alive during the simulation,
+            as given by :meth:`graphix.pattern.Pattern.max_space`. If given, a buffer
+            of this size is reserved up front (see :meth:`DensityMatrix.reserve`).
+        dtype : numpy dtype, optional
+            precision of the entries of the density matrix: `np.complex128` (default) or `np.complex64`.
+        kwargs :
+            see :class:`graphix.sim.base_backend.Backend`.
+        """
+        super().__init__(DensityMatrix(nqubit=0, dtype=dtype), **kwargs)
+        if max_space is not None and not self.symbolic:
+            self.state.reserve(max_space)
+
+    def measure(self, node: int, measurement: Measurement) -> bool:
+        """Perform measurement of a node and trace out the qubit.
+
+        Numerical density matrices are measured with the fused :meth:`DensityMatrix.measure_and_remove`.
+
+        Parameters
+        ----------
+        node: int
+        measurement: Measurement
+        """
+        if self.symbolic:
+            return super().measure(node, measurement)
+        loc = self.node_index.index(node)
+        result = self.state.measure_and_remove(
+            loc, measurement.plane, measurement.angle, rng=self.rng, pr_calc=self.pr_calc
+        )
+        self.node_index.remove(node)
+        return result
+
+    def apply_single(self, node: int, op: npt.NDArray) -> None:
+        """Apply a single gate to the state, without checking the operator (see :meth:`DensityMatrix.evolve_single`)."""
+        self.state._evolve_single(op, self.node_index.index(node))
+
+    def apply_clifford(self, node: int, clifford: Clifford) -> None:
+        """Apply single-qubit Clifford gate, without checking the operator (see :meth:`DensityMatrix.evolve_single`)."""
+        self.state._evolve_single(clifford.matrix, self.node_index.index(node))
 
     def apply_channel(self, channel: KrausChannel, qargs: Collection[int]) -> None:
         """Apply channel to the state.
@@ -366,6 +726,15 @@ class DensityMatrixBackend(Backend):
         indices = [self.node_index.index(i) for i in qargs]
         self.state.apply_channel(channel, indices)
 
+    def finalize(self, output_nodes: Iterable[int]) -> None:
+        """To be run at the end of pattern simulation.
+
+        In single precision, the density matrix is renormalized before being returned.
+        """
+        super().finalize(output_nodes)
+        if self.state.rho.dtype == np.complex64:
+            self.state.normalize()
+
 
 if sys.version_info >= (3, 10):
     Data = (
@@ -0,0 +1,433 @@
+"""MBQC simulator storing the state as a matrix product state."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+import numpy as np
+import numpy.typing as npt
+
+from graphix import states
+from graphix.sim.base_backend import Backend, State
+from graphix.sim.statevec import Statevec, _draw_measurement
+from graphix.states import BasicStates
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from numpy.random import Generator
+
+    from graphix.fundamentals import Plane
+    from graphix.measurements import Measurement
+    from graphix.sim.statevec import Data
+
+
+class MPSBackend(Backend):
+    """MBQC simulator with a matrix-product-state method.
+
+    The qubits of the state are the sites of a chain (see :class:`MPS`), in the
+    order in which they are prepared: new nodes are appended at the end of the
+    chain, and measured nodes are removed from it. When the preparations follow
+    the measurement order, as in patterns processed by
+    :meth:`graphix.pattern.Pattern.minimize_space`, the nodes entangled by
+    the pattern are close to each other on the chain, and patterns whose graph
+    is close to one-dimensional are simulated with small bond dimensions,
+    whatever their number of qubits.
+
+    With `max_bond` or `cutoff`, the bonds are truncated: the total weight of
+    the discarded singular values, reported by :attr:`discarded_weight`, bounds
+    the error on the state.
+    """
+
+    def __init__(self, max_bond: int | None = None, cutoff: float = 1e-14, **kwargs) -> None:
+        """Construct a matrix product state backend.
+
+        Parameters
+        ----------
+        max_bond : int, optional
+            maximal bond dimension, defaults to unbounded.
+        cutoff : float, optional
+            the smallest singular values are discarded as long as the sum of
+            their squares stays below `cutoff` times the squared norm of the state,
+            defaults to 1e-14.
+        kwargs :
+            see :class:`graphix.sim.base_backend.Backend`.
+        """
+        super().__init__(MPS(nqubit=0, max_bond=max_bond, cutoff=cutoff), **kwargs)
+        if self.symbolic:
+            raise ValueError("Matrix product state simulation does not support symbolic computation.")
+
+    @property
+    def discarded_weight(self) -> float:
+        """Return the total weight of the singular values discarded by the truncations, see :attr:`MPS.discarded_weight`."""
+        return self.state.discarded_weight
+
+    def measure(self, node: int, measurement: Measurement) -> bool:
+        """Perform measurement of a node and remove the site from the chain.
+
+        Parameters
+        ----------
+        node: int
+        measurement: Measurement
+        """
+        loc = self.node_index.index(node)
+        result = self.state.measure_and_remove(
+            loc, measurement.plane, measurement.angle, rng=self.rng, pr_calc=self.pr_calc
+        )
+        self.node_index.remove(node)
+        return result
+
+
+class MPS(State):
+    """Matrix product state of qubits.
+
+    The site `i` of the chain is the tensor :attr:`tensors[i] <tensors>` of
+    shape `(D_l, 2, D_r)`, where the physical index of qubit `i` is in the
+    middle and the bond indices `D_l`, `D_r` connect it to its neighbours
+    (the first and last bonds have dimension 1).
+
+    The chain is kept in mixed canonical form around a single site, the
+    center: the sites on its left are left-orthonormal, the ones on its right
+    are right-orthonormal, so that local quantities (reduced density matrices,
+    truncations of a bond next to the center) only involve the center.
+    """
+
+    def __init__(
+        self,
+        data: Data = BasicStates.PLUS,
+        nqubit: int | None = None,
+        max_bond: int | None = None,
+        cutoff: float = 1e-14,
+    ) -> None:
+        """Initialize a matrix product state.
+
+        Parameters
+        ----------
+        data : Data
+            initial state, see :class:`graphix.sim.statevec.Statevec`
+        nqubit : int, optional
+            number of qubits
+        max_bond : int, optional
+            maximal bond dimension, defaults to unbounded.
+        cutoff : float, optional
+            relative weight of the singular values that can be discarded at each truncation,
+            see :class:`MPSBackend`.
+        """
+        if max_bond is not None and max_bond < 1:
+            raise ValueError("max_bond must be a positive integer.")
+        self.max_bond = max_bond
+        self.cutoff = cutoff
+        self.tensors: list[npt.NDArray[np.complex128]] = []
+        self.discarded_weight = 0.0
+        self.__center = 0
+        self.add_nodes(nqubit, data)
+
+    @property
+    def nqubit(self) -> int:
+        """Return the number of qubits."""
+        return len(self.tensors)
+
+    @property
+    def bond_dims(self) -> list[int]:
+        """Return the dimensions of the bonds between consecutive sites."""
+        return [tensor.shape[2] for tensor in self.tensors[:-1]]
+
+    def flatten(self) -> npt.NDArray:
+        """Return the dense flattened state vector."""
+        psi = np.ones((1, 1), dtype=np.complex128)
+        for tensor in self.tensors:
+            psi = np.tensordot(psi, tensor, axes=(-1, 0)).reshape(-1, tensor.shape[2])
+        return psi.reshape(-1)
+
+    def to_statevec(self) -> Statevec:
+        """Return the state as a dense :class:`graphix.sim.statevec.Statevec`."""
+        result = Statevec(nqubit=0)
+        result.psi = self.flatten().reshape((2,) * self.nqubit)
+        return result
+
+    def add_nodes(self, nqubit: int | None, data: Data) -> None:
+        """Append qubits at the end of the chain.
+
+        Qubits given as :class:`graphix.states.State` objects are added as
+        sites of bond dimension 1; other data are converted to a dense state
+        vector first, which is then decomposed into sites.
+        """
+        if isinstance(data, states.State):
+            data = [data] * (1 if nqubit is None else nqubit)
+        if isinstance(data, Iterable):
+            data = list(data)
+        if isinstance(data, list) and all(isinstance(state, states.State) for state in data):
+            if nqubit is not None and nqubit != len(data):
+                raise ValueError("Mismatch between nqubit and length of input state.")
+            for state in data:
+                vec = np.asarray(state.get_statevector(), dtype=np.complex128)
+                self.__append([vec.reshape(1, 2, 1)], np.linalg.norm(vec))
+        else:
+            psi = np.asarray(Statevec(data=data, nqubit=nqubit).flatten(), dtype=np.complex128)
+            self.__append(*_decompose(psi))
+
+    def __append(self, tensors: list[npt.NDArray], norm: float) -> None:
+        """Append right-orthonormal sites, and multiply the state by `norm`."""
+        if not tensors:
+            return
+        if not self.tensors:
+            self.__center = 0
+        self.tensors.extend(tensor / norm if i == 0 else tensor for i, tensor in enumerate(tensors))
+        self.tensors[self.__center] = self.tensors[self.__center] * norm
+
+    def __move_center(self, loc: int) -> None:
+        """Move the center of the canonical form to site `loc`, by QR decompositions."""
+        while self.__center < loc:
+            i = self.__center
+            tensor = self.tensors[i]
+            q, r = np.linalg.qr(tensor.reshape(-1, tensor.shape[2]))
+            self.tensors[i] = q.reshape(tensor.shape[0], 2, -1)
+            self.tensors[i + 1] = np.tensordot(r, self.tensors[i + 1], axes=(1, 0))
+            self.__center += 1
+        while self.__center > loc:
+            i = self.__center
+            self.__orthonormalize_right(i)
+            self.__center -= 1
+
+    def __orthonormalize_right(self, i: int) -> None:
+        """Make site `i` right-orthonormal, by moving the non-orthonormal factor to site `i - 1`."""
+        tensor = self.tensors[i]
+        q, r = np.linalg.qr(tensor.reshape(tensor.shape[0], -1).T)
+        self.tensors[i] = q.T.reshape(-1, 2, tensor.shape[2])
+        self.tensors[i - 1] = np.tensordot(self.tensors[i - 1], r.T, axes=(2, 0))
+
+    def __truncated_svd(self, matrix: npt.NDArray) -> tuple[npt.NDArray, npt.NDArray, npt.NDArray]:
+        """Return the singular value decomposition of `matrix`, truncated according to `max_bond` and `cutoff`.
+
+        The kept singular values are rescaled to preserve the norm, and the
+        relative weight of the discarded ones is added to :attr:`discarded_weight`.
+        """
+        u, s, vh = np.linalg.svd(matrix, full_matrices=False)
+        weights = s**2
+        total = weights.sum()
+        if total == 0:
+            return u[:, :1], s[:1], vh[:1]
+        # number of singular values whose cumulated weight, from the smallest one, stays below the cutoff
+        tail = np.cumsum(weights[::-1]) / total
+        rank = len(s) - int(np.searchsorted(tail, self.cutoff, side="right"))
+        rank = max(1, rank if self.max_bond is None else min(rank, self.max_bond))
+        if rank < len(s):
+            discarded = weights[rank:].sum() / total
+            self.discarded_weight += discarded
+            s = s[:rank] / np.sqrt(1 - discarded)
+        return u[:, :rank], s, vh[:rank]
+
+    def __split_right(self, i: int) -> None:
+        """Truncate the bond between the center `i` and site `i + 1`, and move the center to `i + 1`."""
+        tensor = self.tensors[i]
+        u, s, vh = self.__truncated_svd(tensor.reshape(-1, tensor.shape[2]))
+        self.tensors[i] = u.reshape(tensor.shape[0], 2, -1)
+        self.tensors[i + 1] = np.tensordot(s[:, np.newaxis] * vh, self.tensors[i + 1], axes=(1, 0))
+        self.__center = i + 1
+
+    def evolve_single(self, op: npt.NDArray, i: int) -> None:
+        """Apply a single-qubit operation.
+
+        Parameters
+        ----------
+        op : numpy.ndarray
+            2*2 matrix
+        i : int
+            qubit index
+        """
+        op = np.asarray(op, dtype=np.complex128)
+        if not np.allclose(op @ op.conj().T, np.eye(2)):
+            # only unitary operators preserve the orthonormality of the sites
+            self.__move_center(i)
+        self.tensors[i] = np.einsum("st,ltr->lsr", op, self.tensors[i])
+
+    def entangle(self, edge: tuple[int, int]) -> None:
+        """Apply CZ to two qubits, as a matrix product operator.
+
+        The operator `CZ = |0><0| ⊗ I + |1><1| ⊗ Z` has bond dimension 2:
+        the bonds between the two qubits are doubled, then truncated again by
+        a sweep of singular value decompositions.
+
+        Parameters
+        ----------
+        edge : tuple of int
+            (control, target) qubit indices
+        """
+        i, j = sorted(edge)
+        self.__move_center(i)
+        tensor = self.tensors[i]
+        # the bond of the operator is carried, as the last factor, by the bonds from site i to site j
+        projected = np.zeros((*tensor.shape, 2), dtype=tensor.dtype)
+        projected[:, 0, :, 0] = tensor[:, 0]
+        projected[:, 1, :, 1] = tensor[:, 1]
+        self.tensors[i] = projected.reshape(tensor.shape[0], 2, -1)
+        for k in range(i + 1, j):
+            tensor = self.tensors[k]
+            self.tensors[k] = np.einsum("lsr,cd->lcsrd", tensor, np.eye(2)).reshape(
+                2 * tensor.shape[0], 2, 2 * tensor.shape[2]
+            )
+        tensor = self.tensors[j]
+        self.tensors[j] = np.stack((tensor, tensor * np.array([1, -1])[:, np.newaxis]), axis=1).reshape(
+            2 * tensor.shape[0], 2, tensor.shape[2]
+        )
+        for k in range(j, i, -1):
+            self.__orthonormalize_right(k)
+        for k in range(i, j):
+            self.__split_right(k)
+
+    def swap(self, qubits: tuple[int, int]) -> None:
+        """Swap qubits.
+
+        Parameters
+        ----------
+        qubits : tuple of int
+            (control, target) qubit indices
+        """
+        i, j = qubits
+        order = list(range(self.nqubit))
+        order[i], order[j] = j, i
+        self.permute(order)
+
+    def permute(self, order: Sequence[int]) -> None:
+        """Permute the qubits: qubit `i` of the new state is qubit `order[i]` of the current one.
+
+        The sites are moved by exchanging neighbours, which may increase the bond dimensions.
+
+        Parameters
+        ----------
+        order : sequence of int
+            permutation of the qubit indices
+        """
+        current = list(range(self.nqubit))
+        for i, qubit in enumerate(order):
+            for k in range(current.index(qubit) - 1, i - 1, -1):
+                self.__exchange(k)
+                current[k], current[k + 1] = current[k + 1], current[k]
+
+    def __exchange(self, i: int) -> None:
+        """Exchange the qubits of the sites `i` and `i + 1`."""
+        self.__move_center(i)
+        left, right = self.tensors[i], self.tensors[i + 1]
+        theta = np.einsum("lsr,rtm->ltsm", left, right)
+        u, s, vh = self.__truncated_svd(theta.reshape(2 * left.shape[0], -1))
+        self.tensors[i] = u.reshape(left.shape[0], 2, -1)
+        self.tensors[i + 1] = (s[:, np.newaxis] * vh).reshape(-1, 2, right.shape[2])
+        self.__center = i + 1
+
+    def reduced_density_single(self, loc: int) -> npt.NDArray:
+        """Return the (unnormalized) reduced density matrix of a single qubit.
+
+        Parameters
+        ----------
+        loc : int
+            target qubit index
+
+        Returns
+        -------
+        numpy.ndarray : 2*2 matrix
+        """
+        self.__move_center(loc)
+        tensor = self.tensors[loc]
+        return np.einsum("lsr,ltr->st", tensor, tensor.conj())
+
+    def expectation_single(self, op: npt.NDArray, loc: int) -> complex:
+        """Return the expectation value of single-qubit operator.
+
+        Parameters
+        ----------
+        op : numpy.ndarray
+            2*2 operator
+        loc : int
+            target qubit index
+
+        Returns
+        -------
+        complex : expectation value.
+        """
+        rho = self.reduced_density_single(loc)
+        return np.sum(np.asarray(op) * rho.T) / np.trace(rho)
+
+    def measure_and_remove(
+        self,
+        qubit: int,
+        plane: Plane,
+        angle: float,
+        rng: Generator | None = None,
+        pr_calc: bool = True,
+    ) -> bool:
+        """Measure a qubit, remove its site from the chain and normalize the result.
+
+        See :meth:`graphix.sim.statevec.Statevec.measure_and_remove`.
+
+        Parameters
+        ----------
+        qubit : int
+            qubit index
+        plane : Plane
+            measurement plane
+        angle : float
+            measurement angle in radian
+        rng : :class:`np.random.Generator`, optional
+            random number generator used to choose the outcome
+        pr_calc : bool
+            whether to draw the outcome according to its probability (`True`, default)
+            or with 50% probability for each outcome (`False`).
+
+        Returns
+        -------
+        bool : measurement outcome
+        """
+        rho = self.reduced_density_single(qubit)
+        result, coef = _draw_measurement(qubit, rho, plane, angle, rng, pr_calc)
+        self.__project(qubit, coef)
+        return result
+
+    def remove_qubit(self, qarg: int) -> None:
+        """Remove a separable qubit from the system, see :meth:`graphix.sim.statevec.Statevec.remove_qubit`.
+
+        Parameters
+        ----------
+        qarg : int
+            qubit index
+        """
+        rho = self.reduced_density_single(qarg)
+        # the reduced density matrix of a separable qubit is the projector onto its state
+        _, vecs = np.linalg.eigh(rho)
+        self.__project(qarg, vecs[:, -1].conj())
+        self.normalize()
+
+    def __project(self, qubit: int, bra: npt.NDArray) -> None:
+        """Contract the center site `qubit` with `bra` and merge the result into a neighbour, which becomes the center."""
+        matrix = np.tensordot(bra, self.tensors.pop(qubit), axes=(0, 1))
+        if qubit > 0:
+            self.tensors[qubit - 1] = np.tensordot(self.tensors[qubit - 1], matrix, axes=(2, 0))
+            self.__center = qubit - 1
+        elif self.tensors:
+            self.tensors[0] = np.tensordot(matrix, self.tensors[0], axes=(1, 0))
+
+    def normalize(self) -> None:
+        """Normalize the state in-place."""
+        if self.tensors:
+            center = self.tensors[self.__center]
+            self.tensors[self.__center] = center / np.linalg.norm(center)
+
+
+def _decompose(psi: npt.NDArray) -> tuple[list[npt.NDArray], float]:
+    """Decompose the state vector `psi` into right-orthonormal sites, and return them with the norm of `psi`."""
+    nqubit = len(psi).bit_length() - 1
+    tensors = []
+    rest = psi.reshape(-1, 1)
+    for _ in range(nqubit):
+        # split the last qubit of `rest`: rest = (left, 2 * bond)
+        rest = rest.reshape(-1, 2 * rest.shape[1])
+        u, s, vh = np.linalg.svd(rest, full_matrices=False)
+        tensors.append(vh.reshape(-1, 2, vh.shape[1] // 2))
+        rest = u * s
+    tensors.reverse()
+    if not tensors:
+        return tensors, 1
+    norm = abs(rest[0, 0])
+    # the remaining 1*1 factor is the norm, up to a phase which is kept in the first site
+    tensors[0] = tensors[0] * rest[0, 0]
+    return tensors, norm
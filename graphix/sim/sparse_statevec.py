@@ -0,0 +1,383 @@
+"""MBQC state vector backend storing only the nonzero amplitudes."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+import numpy as np
+import numpy.typing as npt
+
+from graphix import states
+from graphix.sim.base_backend import Backend, State
+from graphix.sim.statevec import Statevec, _draw_measurement
+from graphix.states import BasicStates
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from numpy.random import Generator
+
+    from graphix.fundamentals import Plane
+    from graphix.measurements import Measurement
+    from graphix.sim.statevec import Data
+
+
+# Amplitudes whose modulus falls below this value after an operation are
+# considered to be rounding errors of cancellations, and are dropped.
+_PRUNE_TOL = 1e-15
+
+# Basis states are indexed by 64-bit integers.
+_MAX_QUBITS = 62
+
+# States with fewer nonzero amplitudes are kept sparse whatever their fill
+# ratio: converting them to dense storage would not save anything noticeable.
+_DENSE_MIN_SIZE = 1 << 12
+
+
+class SparseStatevectorBackend(Backend):
+    """MBQC simulator with a sparse statevector method.
+
+    The state is stored as the list of its nonzero amplitudes (see
+    :class:`SparseStatevec`), which suits patterns whose states have few
+    nonzero amplitudes, such as circuits of classical reversible gates
+    applied to computational basis states: the memory footprint then
+    depends on the number of nonzero amplitudes instead of the number of qubits.
+    Once the fraction of nonzero amplitudes exceeds `fill_threshold`, the
+    state falls back to a dense :class:`graphix.sim.statevec.Statevec`.
+    """
+
+    def __init__(self, fill_threshold: float = 0.1, **kwargs) -> None:
+        """Construct a sparse state vector backend.
+
+        Parameters
+        ----------
+        fill_threshold : float, optional
+            fraction of nonzero amplitudes above which the state is converted
+            to a dense state vector, defaults to 0.1.
+        kwargs :
+            see :class:`graphix.sim.base_backend.Backend`.
+        """
+        super().__init__(SparseStatevec(nqubit=0, fill_threshold=fill_threshold), **kwargs)
+        if self.symbolic:
+            raise ValueError("Sparse simulation does not support symbolic computation.")
+
+    def entangle_edges(self, edges: Iterable[tuple[int, int]]) -> None:
+        """Apply CZ gates to several pairs of connected nodes at once.
+
+        Parameters
+        ----------
+        edges : iterable of tuple (i, j)
+            pairs of node indices
+        """
+        self.state.entangle_edges((self.node_index.index(edge[0]), self.node_index.index(edge[1])) for edge in edges)
+
+    def measure(self, node: int, measurement: Measurement) -> bool:
+        """Perform measurement of a node and trace out the qubit.
+
+        Parameters
+        ----------
+        node: int
+        measurement: Measurement
+        """
+        loc = self.node_index.index(node)
+        result = self.state.measure_and_remove(
+            loc, measurement.plane, measurement.angle, rng=self.rng, pr_calc=self.pr_calc
+        )
+        self.node_index.remove(node)
+        return result
+
+
+class SparseStatevec(State):
+    """State vector storing only its nonzero amplitudes.
+
+    The nonzero amplitudes are stored in :attr:`values`, and the integers
+    labelling the corresponding basis states, with qubit 0 as the most
+    significant bit, in :attr:`indices`, sorted in increasing order.
+
+    Once the fraction of nonzero amplitudes exceeds `fill_threshold` (and
+    their number is large enough for the choice to matter), the amplitudes
+    are moved to the dense state vector :attr:`dense`, to which the
+    operations are then delegated.
+    """
+
+    def __init__(self, data: Data = BasicStates.PLUS, nqubit: int | None = None, fill_threshold: float = 1) -> None:
+        """Initialize a sparse state vector.
+
+        Parameters
+        ----------
+        data : Data
+            initial state, see :class:`graphix.sim.statevec.Statevec`
+        nqubit : int, optional
+            number of qubits
+        fill_threshold : float, optional
+            fraction of nonzero amplitudes above which the state is converted
+            to a dense state vector, defaults to 1 (never converted).
+        """
+        self.fill_threshold = fill_threshold
+        self.__nqubit = 0
+        self.indices = np.zeros(1, dtype=np.int64)
+        self.values = np.ones(1, dtype=np.complex128)
+        self.dense: Statevec | None = None
+        self.add_nodes(nqubit, data)
+
+    @property
+    def nqubit(self) -> int:
+        """Return the number of qubits."""
+        if self.dense is not None:
+            return self.dense.psi.ndim
+        return self.__nqubit
+
+    @property
+    def fill_ratio(self) -> float:
+        """Return the fraction of nonzero amplitudes."""
+        if self.dense is not None:
+            return 1
+        return len(self.values) / 2**self.nqubit
+
+    def flatten(self) -> npt.NDArray:
+        """Return the dense flattened state vector."""
+        return self.to_statevec().flatten()
+
+    def to_statevec(self) -> Statevec:
+        """Return the state as a dense :class:`graphix.sim.statevec.Statevec`."""
+        if self.dense is not None:
+            return Statevec(self.dense)
+        psi = np.zeros(2**self.nqubit, dtype=np.complex128)
+        psi[self.indices] = self.values
+        result = Statevec(nqubit=0)
+        result.psi = psi.reshape((2,) * self.nqubit)
+        return result
+
+    def add_nodes(self, nqubit: int | None, data: Data) -> None:
+        """Add qubits to the state vector.
+
+        Qubits given as :class:`graphix.states.State` objects are added one at a time,
+        so that only their nonzero amplitudes are ever stored.
+        """
+        if self.dense is not None:
+            self.dense.add_nodes(nqubit, data)
+            return
+        if isinstance(data, states.State):
+            data = [data] * (1 if nqubit is None else nqubit)
+        if isinstance(data, Iterable):
+            data = list(data)
+        if isinstance(data, list) and all(isinstance(state, states.State) for state in data):
+            if nqubit is not None and nqubit != len(data):
+                raise ValueError("Mismatch between nqubit and length of input state.")
+            vectors = [state.get_statevector() for state in data]
+        else:
+            vectors = [Statevec(data=data, nqubit=nqubit).flatten()]
+        for vec in vectors:
+            self.__tensor(np.asarray(vec, dtype=np.complex128))
+        self.__check_fill()
+
+    def __tensor(self, vec: npt.NDArray) -> None:
+        """Tensor the state with the dense vector `vec`."""
+        nqubit = len(vec).bit_length() - 1
+        if self.nqubit + nqubit > _MAX_QUBITS:
+            raise ValueError(f"Sparse state vectors are limited to {_MAX_QUBITS} qubits.")
+        (nonzero,) = np.nonzero(np.abs(vec) > _PRUNE_TOL)
+        self.indices = ((self.indices[:, np.newaxis] << nqubit) | nonzero).ravel()
+        self.values = (self.values[:, np.newaxis] * vec[nonzero]).ravel()
+        self.__nqubit += nqubit
+
+    def __check_fill(self) -> None:
+        """Convert the state to a dense state vector if the fill ratio exceeds the threshold."""
+        if self.dense is None and len(self.values) >= _DENSE_MIN_SIZE and self.fill_ratio > self.fill_threshold:
+            self.dense = self.to_statevec()
+            self.indices = self.values = None
+
+    def __lookup(self, keys: npt.NDArray[np.int64]) -> npt.NDArray[np.complex128]:
+        """Return the amplitudes of the given basis states (zero for the ones that are not stored)."""
+        pos = np.searchsorted(self.indices, keys)
+        np.minimum(pos, len(self.indices) - 1, out=pos)
+        return np.where(self.indices[pos] == keys, self.values[pos], 0)
+
+    def __pairs(self, i: int) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.complex128], npt.NDArray[np.complex128]]:
+        """Return the basis states with qubit `i` in state 0 whose pair has a nonzero amplitude.
+
+        The amplitudes of these basis states, and of the ones with qubit `i` flipped to 1, are returned as well.
+        """
+        mask = np.int64(1) << (self.nqubit - 1 - i)
+        keys = np.unique(self.indices & ~mask)
+        return keys, self.__lookup(keys), self.__lookup(keys | mask)
+
+    def __store(
+        self, indices: npt.NDArray[np.int64], values: npt.NDArray[np.complex128], is_sorted: bool = True
+    ) -> None:
+        """Store the given amplitudes, dropping the ones that vanish.
+
+        If `is_sorted` is `False`, the amplitudes are sorted by their indices first.
+        """
+        nonzero = np.abs(values) > _PRUNE_TOL
+        indices = indices[nonzero]
+        values = values[nonzero]
+        if not is_sorted:
+            perm = np.argsort(indices)
+            indices = indices[perm]
+            values = values[perm]
+        self.indices = indices
+        self.values = values
+
+    def evolve_single(self, op: npt.NDArray, i: int) -> None:
+        """Apply a single-qubit operation.
+
+        Parameters
+        ----------
+        op : numpy.ndarray
+            2*2 matrix
+        i : int
+            qubit index
+        """
+        if self.dense is not None:
+            self.dense.evolve_single(op, i)
+            return
+        (a, b), (c, d) = op
+        mask = np.int64(1) << (self.nqubit - 1 - i)
+        keys, x, y = self.__pairs(i)
+        indices = np.concatenate((keys, keys | mask))
+        values = np.concatenate((a * x + b * y, c * x + d * y))
+        self.__store(indices, values, is_sorted=False)
+        self.__check_fill()
+
+    def entangle(self, edge: tuple[int, int]) -> None:
+        """Connect graph nodes.
+
+        Parameters
+        ----------
+        edge : tuple of int
+            (control, target) qubit indices
+        """
+        self.entangle_edges([edge])
+
+    def entangle_edges(self, edges: Iterable[tuple[int, int]]) -> None:
+        """Apply CZ along several edges at once, by flipping the sign of the amplitudes of odd parity.
+
+        Parameters
+        ----------
+        edges : iterable of tuple of int
+            pairs of qubit indices
+        """
+        if self.dense is not None:
+            self.dense.entangle_edges(edges)
+            return
+        parity = np.zeros(len(self.indices), dtype=np.int64)
+        for i, j in edges:
+            parity ^= (self.indices >> (self.nqubit - 1 - i)) & (self.indices >> (self.nqubit - 1 - j))
+        np.negative(self.values, out=self.values, where=(parity & 1).astype(np.bool_))
+
+    def swap(self, qubits: tuple[int, int]) -> None:
+        """Swap qubits.
+
+        Parameters
+        ----------
+        qubits : tuple of int
+            (control, target) qubit indices
+        """
+        i, j = qubits
+        order = list(range(self.nqubit))
+        order[i], order[j] = j, i
+        self.permute(order)
+
+    def permute(self, order: Sequence[int]) -> None:
+        """Permute the qubits: qubit `i` of the new state is qubit `order[i]` of the current one.
+
+        Parameters
+        ----------
+        order : sequence of int
+            permutation of the qubit indices
+        """
+        if self.dense is not None:
+            self.dense.permute(order)
+            return
+        indices = np.zeros_like(self.indices)
+        for i, source in enumerate(order):
+            indices |= ((self.indices >> (self.nqubit - 1 - source)) & 1) << (self.nqubit - 1 - i)
+        self.__store(indices, self.values, is_sorted=False)
+
+    def reduced_density_single(self, loc: int) -> npt.NDArray:
+        """Return the (unnormalized) reduced density matrix of a single qubit.
+
+        Parameters
+        ----------
+        loc : int
+            target qubit index
+
+        Returns
+        -------
+        numpy.ndarray : 2*2 matrix
+        """
+        if self.dense is not None:
+            return self.dense.reduced_density_single(loc)
+        _, x, y = self.__pairs(loc)
+        rho_01 = np.vdot(y, x)
+        return np.array([[np.vdot(x, x), rho_01], [rho_01.conjugate(), np.vdot(y, y)]])
+
+    def measure_and_remove(
+        self,
+        qubit: int,
+        plane: Plane,
+        angle: float,
+        rng: Generator | None = None,
+        pr_calc: bool = True,
+    ) -> bool:
+        """Measure a qubit, remove it from the state and normalize the result.
+
+        See :meth:`graphix.sim.statevec.Statevec.measure_and_remove`.
+
+        Parameters
+        ----------
+        qubit : int
+            qubit index
+        plane : Plane
+            measurement plane
+        angle : float
+            measurement angle in radian
+        rng : :class:`np.random.Generator`, optional
+            random number generator used to choose the outcome
+        pr_calc : bool
+            whether to draw the outcome according to its probability (`True`, default)
+            or with 50% probability for each outcome (`False`).
+
+        Returns
+        -------
+        bool : measurement outcome
+        """
+        if self.dense is not None:
+            return self.dense.measure_and_remove(qubit, plane, angle, rng=rng, pr_calc=pr_calc)
+        keys, x, y = self.__pairs(qubit)
+        rho_01 = np.vdot(y, x)
+        rho = np.array([[np.vdot(x, x), rho_01], [rho_01.conjugate(), np.vdot(y, y)]])
+        result, coef = _draw_measurement(qubit, rho, plane, angle, rng, pr_calc)
+        # removing the (zero) bit of the qubit preserves the order of the keys
+        shift = self.nqubit - 1 - qubit
+        low = keys & ((np.int64(1) << shift) - 1)
+        self.__store(((keys >> (shift + 1)) << shift) | low, coef[0] * x + coef[1] * y)
+        self.__nqubit -= 1
+        return result
+
+    def remove_qubit(self, qarg: int) -> None:
+        """Remove a separable qubit from the system, see :meth:`graphix.sim.statevec.Statevec.remove_qubit`.
+
+        Parameters
+        ----------
+        qarg : int
+            qubit index
+        """
+        if self.dense is not None:
+            self.dense.remove_qubit(qarg)
+            return
+        keys, x, y = self.__pairs(qarg)
+        values = y if np.allclose(x, 0) else x
+        shift = self.nqubit - 1 - qarg
+        low = keys & ((np.int64(1) << shift) - 1)
+        self.__store(((keys >> (shift + 1)) << shift) | low, values / np.linalg.norm(values))
+        self.__nqubit -= 1
+
+    def normalize(self) -> None:
+        """Normalize the state in-place."""
+        if self.dense is not None:
+            self.dense.normalize()
+            return
+        self.values = self.values / np.linalg.norm(self.values)
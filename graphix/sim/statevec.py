@@ -4,30 +4,335 @@ from __future__ import annotations
 
 import copy
 import functools
+import tempfile
 from collections.abc import Iterable
-from typing import TYPE_CHECKING, SupportsComplex, SupportsFloat
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Literal, SupportsComplex, SupportsFloat, TypeVar
 
 import numpy as np
 import numpy.typing as npt
 
 from graphix import parameter, states, utils
 from graphix.parameter import Expression, ExpressionOrSupportsComplex
-from graphix.sim.base_backend import Backend, State
+from graphix.rng import ensure_rng
+from graphix.sim.base_backend import Backend, State, _op_mat_from_result
 from graphix.states import BasicStates
 
 if TYPE_CHECKING:
     import collections
-    from collections.abc import Mapping
+    import os
+    from collections.abc import Callable, Iterator, Mapping, Sequence
+    from typing import IO
 
+    from numpy.random import Generator
+
+    from graphix.clifford import Clifford
+    from graphix.fundamentals import Plane
+    from graphix.measurements import Measurement
     from graphix.parameter import ExpressionOrSupportsFloat, Parameter
 
+_T = TypeVar("_T")
+
 
 class StatevectorBackend(Backend):
-    """MBQC simulator with statevector method."""
+    """MBQC simulator with statevector method.
+
+    Single-qubit operators (Clifford gates and byproduct corrections) are not
+    applied right away: they are multiplied into a pending 2*2 matrix per node,
+    which is applied to the state only when the node is entangled (unless the
+    matrix is diagonal, since it then commutes with CZ), folded into the
+    measurement of the node, or applied when :attr:`state` is accessed.
+    """
+
+    def __init__(
+        self,
+        max_space: int | None = None,
+        dtype: npt.DTypeLike = np.complex128,
+        num_threads: int = 1,
+        storage: Literal["memory", "mmap"] = "memory",
+        path: str | os.PathLike | None = None,
+        **kwargs,
+    ) -> None:
+        """Construct a state vector backend.
+
+        Parameters
+        ----------
+        max_space : int, optional
+            maximal number of qubits simultaneously alive during the simulation,
+            as given by :meth:`graphix.pattern.Pattern.max_space`. If given, a buffer
+            of this size is reserved up front (see :meth:`Statevec.reserve`).
+        dtype : numpy dtype, optional
+            precision of the amplitudes: `np.complex128` (default) or `np.complex64`,
+            which halves the memory footprint at the price of a relative accuracy of about 1e-6.
+        num_threads : int, optional
+            number of threads sharing the sweeps over the amplitudes of the state (see :class:`Statevec`),
+            defaults to 1.
+        storage : {"memory", "mmap"}, optional
+            where the amplitudes are stored. With `"mmap"`, the buffer of `max_space`
+            qubits is a memory-mapped file on disk (see :meth:`Statevec.reserve`),
+            so that states larger than the available memory can be simulated, slowly.
+            Defaults to `"memory"`.
+        path : str or os.PathLike, optional
+            file backing the state with `storage="mmap"`. If not given, an anonymous
+            temporary file is created in the default temporary directory.
+        kwargs :
+            see :class:`graphix.sim.base_backend.Backend`.
+        """
+        super().__init__(Statevec(nqubit=0, dtype=dtype, num_threads=num_threads), **kwargs)
+        self.__pending: dict[int, npt.NDArray] = {}
+        if storage == "mmap":
+            if max_space is None:
+                raise ValueError("Memory-mapped storage requires max_space.")
+            if self.symbolic:
+                raise ValueError("Memory-mapped storage does not support symbolic computation.")
+            if path is None:
+                # the mapping outlives the file object: the file is deleted once the buffer is released
+                with tempfile.TemporaryFile() as file:
+                    super().state.reserve(max_space, path=file)
+            else:
+                super().state.reserve(max_space, path=path)
+        elif storage != "memory":
+            raise ValueError(f"Unknown storage: {storage}.")
+        elif max_space is not None and not self.symbolic:
+            super().state.reserve(max_space)
+
+    @property
+    def state(self) -> Statevec:
+        """Return the state of the backend, once the pending single-qubit operators are applied."""
+        self.__flush(list(self.__pending))
+        return super().state
+
+    def reset(self, rng: Generator | None = None) -> None:
+        """Return to the empty state, to run another simulation with the given random-number generator.
+
+        The pending operators are dropped, and the buffer reserved for the state
+        (see :meth:`Statevec.reserve`) is kept, to be reused by the next simulation.
+        """
+        self.__pending.clear()
+        state = super().state
+        state.psi = np.ones((), dtype=state.psi.dtype)
+        super().reset(rng)
+
+    def __flush(self, nodes: Iterable[int], keep_diagonal: bool = False) -> None:
+        """Apply the pending operators of the given nodes to the state.
+
+        If `keep_diagonal` is `True`, diagonal operators are left pending.
+        """
+        for node in nodes:
+            op = self.__pending.get(node)
+            if op is None or (keep_diagonal and op[0, 1] == 0 and op[1, 0] == 0):
+                continue
+            del self.__pending[node]
+            super().state.evolve_single(op, self.node_index.index(node))
+
+    def add_nodes(self, nodes, data=BasicStates.PLUS) -> None:
+        """Add new qubit(s) to statevector in argument and assign the corresponding node number to list self.node_index.
+
+        Parameters
+        ----------
+        nodes : list of node indices
+        """
+        nodes = list(nodes)
+        super().state.add_nodes(nqubit=len(nodes), data=data)
+        self.node_index.extend(nodes)
+
+    def entangle_nodes(self, edge: tuple[int, int]) -> None:
+        """Apply CZ gate to two connected nodes.
+
+        Parameters
+        ----------
+        edge : tuple (i, j)
+            a pair of node indices
+        """
+        self.__flush(edge, keep_diagonal=True)
+        super().state.entangle((self.node_index.index(edge[0]), self.node_index.index(edge[1])))
+
+    def entangle_edges(self, edges: Iterable[tuple[int, int]]) -> None:
+        """Apply CZ gates along several edges in a single sweep over the state.
+
+        Parameters
+        ----------
+        edges : iterable of tuple (i, j)
+            pairs of node indices
+        """
+        edges = list(edges)
+        self.__flush({node for edge in edges for node in edge}, keep_diagonal=True)
+        super().state.entangle_edges((self.node_index.index(edge[0]), self.node_index.index(edge[1])) for edge in edges)
+
+    def apply_single(self, node: int, op: npt.NDArray) -> None:
+        """Multiply a single-qubit gate into the pending operator of the node."""
+        pending = self.__pending.get(node)
+        self.__pending[node] = op if pending is None else op @ pending
+
+    def apply_clifford(self, node: int, clifford: Clifford) -> None:
+        """Multiply a single-qubit Clifford gate into the pending operator of the node."""
+        self.apply_single(node, clifford.matrix)
+
+    def measure(self, node: int, measurement: Measurement) -> bool:
+        """Perform measurement of a node and trace out the qubit.
+
+        Numerical states are measured with the fused :meth:`Statevec.measure_and_remove`.
+
+        Parameters
+        ----------
+        node: int
+        measurement: Measurement
+        """
+        if self.symbolic:
+            return super().measure(node, measurement)
+        loc = self.node_index.index(node)
+        result = super().state.measure_and_remove(
+            loc,
+            measurement.plane,
+            measurement.angle,
+            rng=self.rng,
+            pr_calc=self.pr_calc,
+            op=self.__pending.pop(node, None),
+        )
+        self.node_index.remove(node)
+        return result
+
+    def finalize(self, output_nodes: Iterable[int]) -> None:
+        """To be run at the end of pattern simulation.
+
+        Measurements renormalize the state, but gates applied after the last
+        one accumulate rounding errors: in single precision, the state is
+        renormalized before being returned.
+        """
+        # normalized before the qubits are permuted, while the state is still contiguous
+        if self.state.psi.dtype == np.complex64:
+            self.state.normalize()
+        super().finalize(output_nodes)
+
+
+class FactorizedStatevectorBackend(StatevectorBackend):
+    """MBQC simulator with statevector method, keeping unentangled qubits in separate blocks.
+
+    The state is tracked as a product of independent state vectors (blocks),
+    each one with its own :class:`NodeIndex`. Each new qubit starts in its own
+    block; two blocks are tensored together only when a CZ connects them.
+    Gates and measurements only touch the block of their qubit, and
+    disconnected components of the graph are never combined until
+    :meth:`finalize` assembles the output state in :attr:`state`.
+
+    Before :meth:`finalize`, :attr:`state` and :attr:`node_index` are empty:
+    the qubits live in :attr:`blocks`. The buffer of :attr:`state` is therefore
+    only reserved by :meth:`finalize`, for the output qubits: `max_space` is not
+    needed, and is better left unset.
+    """
 
     def __init__(self, **kwargs) -> None:
-        """Construct a state vector backend."""
-        super().__init__(Statevec(nqubit=0), **kwargs)
+        """Construct a factorized state vector backend.
+
+        Parameters
+        ----------
+        kwargs :
+            see :class:`StatevectorBackend`.
+        """
+        super().__init__(**kwargs)
+        self.__blocks: dict[int, StatevectorBackend] = {}
+
+    @property
+    def blocks(self) -> list[StatevectorBackend]:
+        """Return the independent blocks of the state, as backends holding their own qubits."""
+        return list({id(block): block for block in self.__blocks.values()}.values())
+
+    def reset(self, rng: Generator | None = None) -> None:
+        """Drop the blocks and return to the empty state, see :meth:`StatevectorBackend.reset`."""
+        self.__blocks.clear()
+        super().reset(rng)
+
+    def __new_block(self) -> StatevectorBackend:
+        return StatevectorBackend(
+            dtype=self.state.psi.dtype,
+            num_threads=self.state.num_threads,
+            pr_calc=self.pr_calc,
+            rng=self.rng,
+            symbolic=self.symbolic,
+        )
+
+    def add_nodes(self, nodes, data=BasicStates.PLUS) -> None:
+        """Add new qubits, each one in its own block when `data` describes a product state.
+
+        Parameters
+        ----------
+        nodes : list of node indices
+        data : Data
+            see :meth:`graphix.sim.base_backend.Backend.add_nodes`
+        """
+        nodes = list(nodes)
+        if isinstance(data, states.State):
+            data = [data] * len(nodes)
+        if isinstance(data, Iterable) and not isinstance(data, Statevec):
+            data = list(data)
+            if len(data) == len(nodes) and all(isinstance(state, states.State) for state in data):
+                for node, state in zip(nodes, data):
+                    block = self.__new_block()
+                    block.add_nodes([node], state)
+                    self.__blocks[node] = block
+                return
+        # arbitrary (possibly entangled) input: all the nodes share a block
+        block = self.__new_block()
+        block.add_nodes(nodes, data)
+        for node in nodes:
+            self.__blocks[node] = block
+
+    def __merge(self, node_a: int, node_b: int) -> StatevectorBackend:
+        """Return the block containing both nodes, tensoring their blocks together if needed."""
+        block_a = self.__blocks[node_a]
+        block_b = self.__blocks[node_b]
+        if block_a is block_b:
+            return block_a
+        if len(block_a.node_index) < len(block_b.node_index):
+            block_a, block_b = block_b, block_a
+        block_a.state.tensor(block_b.state)
+        block_a.node_index.extend(block_b.node_index)
+        for node in block_b.node_index:
+            self.__blocks[node] = block_a
+        return block_a
+
+    def entangle_nodes(self, edge: tuple[int, int]) -> None:
+        """Apply CZ gate to two connected nodes, merging their blocks if needed."""
+        self.__merge(*edge).entangle_nodes(edge)
+
+    def entangle_edges(self, edges: Iterable[tuple[int, int]]) -> None:
+        """Apply CZ gates along several edges, merging the blocks they connect first."""
+        edges = list(edges)
+        for edge in edges:
+            self.__merge(*edge)
+        edges_by_block: dict[int, tuple[StatevectorBackend, list[tuple[int, int]]]] = {}
+        for edge in edges:
+            block = self.__blocks[edge[0]]
+            edges_by_block.setdefault(id(block), (block, []))[1].append(edge)
+        for block, block_edges in edges_by_block.values():
+            block.entangle_edges(block_edges)
+
+    def measure(self, node: int, measurement: Measurement) -> bool:
+        """Perform measurement of a node in its block and trace out the qubit."""
+        return self.__blocks.pop(node).measure(node, measurement)
+
+    def apply_single(self, node: int, op: npt.NDArray) -> None:
+        """Apply a single gate to the block of the node."""
+        self.__blocks[node].apply_single(node, op)
+
+    def apply_clifford(self, node: int, clifford: Clifford) -> None:
+        """Apply single-qubit Clifford gate to the block of the node."""
+        self.__blocks[node].apply_clifford(node, clifford)
+
+    def finalize(self, output_nodes: Iterable[int]) -> None:
+        """Tensor the remaining blocks together into :attr:`state`, then sort the qubits."""
+        output_nodes = list(output_nodes)
+        if not self.symbolic:
+            self.state.reserve(len(output_nodes))
+        for node in output_nodes:
+            block = self.__blocks.get(node)
+            if block is None:
+                continue
+            self.state.tensor(block.state)
+            self.node_index.extend(block.node_index)
+            for block_node in block.node_index:
+                del self.__blocks[block_node]
+        super().finalize(output_nodes)
 
 
 CZ_TENSOR = np.array(
@@ -51,6 +356,8 @@ class Statevec(State):
         self,
         data: Data = BasicStates.PLUS,
         nqubit: int | None = None,
+        dtype: npt.DTypeLike | None = None,
+        num_threads: int = 1,
     ):
         """Initialize statevector objects.
 
@@ -71,9 +378,18 @@ class Statevec(State):
         :type data: Data, optional
         :param nqubit: number of qubits to prepare, defaults to None
         :type nqubit: int, optional
+        :param dtype: dtype of numerical amplitudes, defaults to `np.complex128` (or the dtype of `data` for copies)
+        :type dtype: numpy dtype, optional
+        :param num_threads: number of threads sharing the sweeps over the amplitudes, defaults to 1
+        :type num_threads: int, optional
         """
         if nqubit is not None and nqubit < 0:
             raise ValueError("nqubit must be a non-negative integer.")
+        if num_threads < 1:
+            raise ValueError("num_threads must be a positive integer.")
+
+        self.__buffer: npt.NDArray | None = None
+        self.num_threads = num_threads
 
         if isinstance(data, Statevec):
             # assert nqubit is None or len(state.flatten()) == 2**nqubit
@@ -82,6 +398,8 @@ class Statevec(State):
                     f"Inconsistent parameters between nqubit = {nqubit} and the inferred number of qubit = {len(data.flatten())}."
                 )
             self.psi = data.psi.copy()
+            if dtype is not None and self.psi.dtype != np.object_:
+                self.psi = self.psi.astype(dtype, copy=False)
             return
 
         if isinstance(data, states.State):
@@ -106,7 +424,8 @@ class Statevec(State):
             elif nqubit != len(input_list):
                 raise ValueError("Mismatch between nqubit and length of input state.")
             list_of_sv = [s.get_statevector() for s in input_list]
-            tmp_psi = functools.reduce(np.kron, list_of_sv)
+            # the initial value guarantees that `psi` owns its data, so that it can be updated in place
+            tmp_psi = functools.reduce(np.kron, list_of_sv, np.ones(1))
             # reshape
             self.psi = tmp_psi.reshape((2,) * nqubit)
         # `SupportsFloat` is needed because `numpy.float64` is not an instance of `SupportsComplex`!
@@ -126,19 +445,102 @@ class Statevec(State):
             self.psi = psi.reshape((2,) * nqubit)
         else:
             raise TypeError(f"First element of data has type {type(input_list[0])} whereas Number or State is expected")
+        if dtype is not None and self.psi.dtype != np.object_:
+            self.psi = self.psi.astype(dtype, copy=False)
 
     def __str__(self) -> str:
         """Return a string description."""
         return f"Statevec object with statevector {self.psi} and length {self.dims()}."
 
+    def __copy__(self) -> Statevec:
+        """Return a copy of the state vector.
+
+        The amplitudes are copied, since they are updated in place, and the copy has no reserved buffer.
+        """
+        result = self.__class__.__new__(self.__class__)
+        result.__dict__.update(self.__dict__)
+        result.psi = np.array(self.psi)
+        result.__buffer = None
+        return result
+
     def add_nodes(self, nqubit, data) -> None:
         """Add nodes to the state vector."""
-        sv_to_add = Statevec(nqubit=nqubit, data=data)
+        # new qubits are prepared in the precision of the state
+        dtype = self.psi.dtype if np.issubdtype(self.psi.dtype, np.complexfloating) else None
+        sv_to_add = Statevec(nqubit=nqubit, data=data, dtype=dtype)
         self.tensor(sv_to_add)
 
+    def reserve(self, nqubit: int, path: str | os.PathLike | IO[bytes] | None = None) -> None:
+        """Reserve a buffer large enough to hold a state of `nqubit` qubits.
+
+        Once reserved, :meth:`tensor` (and therefore :meth:`add_nodes`) and
+        :meth:`measure_and_remove` store the state as a view on the front of the
+        buffer instead of allocating a new array each time, as long as the state
+        fits. Larger states are allocated as usual.
+
+        If `path` is given, the buffer is a :class:`numpy.memmap` on this file: the
+        operating system then pages the amplitudes in and out of memory. The
+        kernels stream over the state by chunks, and the ones that would allocate
+        an array of the size of the state (:meth:`swap`, :meth:`entangle_edges`
+        and :meth:`normalize`) work in place instead.
+
+        Parameters
+        ----------
+        nqubit : int
+            number of qubits, typically given by :meth:`graphix.pattern.Pattern.max_space`
+        path : str, os.PathLike or file object, optional
+            file backing the buffer, which is overwritten.
+        """
+        if nqubit < 0:
+            raise ValueError("nqubit must be a non-negative integer.")
+        if self.psi.dtype == np.object_:
+            return
+        if path is None and self.__buffer is not None and len(self.__buffer) >= 2**nqubit:
+            return
+        dtype = self.psi.dtype if np.issubdtype(self.psi.dtype, np.complexfloating) else np.complex128
+        if path is None:
+            buffer = np.empty(2**nqubit, dtype=dtype)
+        else:
+            buffer = np.memmap(path, dtype=dtype, mode="w+", shape=(2**nqubit,))
+        psi = buffer[: self.psi.size].reshape(self.psi.shape)
+        psi[...] = self.psi
+        self.__buffer = buffer
+        self.psi = psi
+
+    def _reserved(self, size: int, dtype: npt.DTypeLike) -> npt.NDArray | None:
+        """Return the first `size` elements of the reserved buffer, or `None` if they cannot be used.
+
+        The buffer can be used if it is large enough and of the given dtype, and
+        if it does not hold the current state elsewhere than at its front.
+        """
+        buffer = self.__buffer
+        if buffer is None or len(buffer) < size or buffer.dtype != dtype:
+            return None
+        if np.may_share_memory(self.psi, buffer) and not self._in_buffer():
+            return None
+        return buffer[:size]
+
+    def _in_buffer(self) -> bool:
+        """Return whether the state is stored contiguously at the front of the reserved buffer."""
+        buffer = self.__buffer
+        return (
+            buffer is not None
+            and self.psi.base is buffer
+            and self.psi.flags.c_contiguous
+            and self.psi.ctypes.data == buffer.ctypes.data
+        )
+
+    def _mapped(self) -> bool:
+        """Return whether the state is stored in a memory-mapped buffer."""
+        return isinstance(self.__buffer, np.memmap) and self._in_buffer()
+
     def evolve_single(self, op: npt.NDArray, i: int) -> None:
         """Apply a single-qubit operation.
 
+        Numerical states are updated in place, by pairing the amplitudes along
+        the axis of the target qubit: no copy of the state is made.
+        Symbolic states (or operators) with `dtype=object` are evolved by tensor contraction.
+
         Parameters
         ----------
         op : numpy.ndarray
@@ -146,8 +548,24 @@ class Statevec(State):
         i : int
             qubit index
         """
-        psi = np.tensordot(op, self.psi, (1, i))
-        self.psi = np.moveaxis(psi, 0, i)
+        op = _cast_operator(op, self.psi.dtype)
+        if np.object_ in (self.psi.dtype, op.dtype):
+            psi = np.tensordot(op, self.psi, (1, i))
+            self.psi = np.moveaxis(psi, 0, i)
+            return
+        if isinstance(i, Iterable):
+            # single-element sequences are accepted as well, as with `np.tensordot`
+            (i,) = i
+        psi = self._inplace_psi(np.result_type(self.psi, op))
+        _apply_pair_inplace(*_split_axis(psi, i), op, self.num_threads)
+
+    def _inplace_psi(self, dtype: npt.DTypeLike) -> npt.NDArray:
+        """Return `self.psi` as a writeable C-contiguous array of the given dtype, copying only if needed."""
+        psi = self.psi
+        if psi.dtype != dtype or not psi.flags.c_contiguous or not psi.flags.writeable:
+            psi = np.array(psi, dtype=dtype, order="C")
+            self.psi = psi
+        return psi
 
     def evolve(self, op: np.ndarray, qargs: list[int]) -> None:
         """Apply a multi-qubit operation.
@@ -159,6 +577,7 @@ class Statevec(State):
         qargs : list of int
             target qubits' indices
         """
+        op = _cast_operator(op, self.psi.dtype)
         op_dim = int(np.log2(len(op)))
         # TODO shape = (2,)* 2 * op_dim
         shape = [2 for _ in range(2 * op_dim)]
@@ -252,6 +671,64 @@ class Statevec(State):
         )
         self.normalize()
 
+    def measure_and_remove(
+        self,
+        qubit: int,
+        plane: Plane,
+        angle: float,
+        rng: Generator | None = None,
+        pr_calc: bool = True,
+        op: npt.NDArray | None = None,
+    ) -> bool:
+        """Measure a qubit and remove it from the state.
+
+        The measured axis is contracted with the bra of the measurement basis
+        state, and the result is written, already normalized, into a half-size
+        array: this replaces the successive projection, removal and
+        normalization of :meth:`evolve_single` and :meth:`remove_qubit`.
+
+        Parameters
+        ----------
+        qubit : int
+            qubit index
+        plane : Plane
+            measurement plane
+        angle : float
+            measurement angle in radian
+        rng : :class:`np.random.Generator`, optional
+            random number generator used to choose the outcome
+        pr_calc : bool
+            whether to draw the outcome according to its probability (`True`, default)
+            or with 50% probability for each outcome (`False`).
+        op : numpy.ndarray, optional
+            2*2 matrix applied to the qubit just before the measurement:
+            it is folded into the measurement rather than applied to the state.
+
+        Returns
+        -------
+        bool : measurement outcome
+        """
+        rho = self.reduced_density_single(qubit)
+        result, coef = _draw_measurement(qubit, rho, plane, angle, rng, pr_calc, op)
+        coef = _cast_operator(coef, self.psi.dtype)
+        v0, v1 = _split_axis(self.psi, qubit)
+        shape = (2,) * (self.psi.ndim - 1)
+        dtype = np.result_type(self.psi, coef)
+        buffer = self._reserved(self.psi.size // 2, dtype)
+        # Writing into the buffer holding the state is safe: the chunks are
+        # visited in increasing order, and the amplitudes written at any point
+        # are stored before the ones that remain to be read.
+        psi = np.empty(shape, dtype=dtype) if buffer is None else buffer.reshape(shape)
+        view = psi.reshape(v0.shape)
+
+        def project(index: tuple[int | slice, ...]) -> None:
+            view[index] = coef[0] * v0[index] + coef[1] * v1[index]
+
+        # the chunks cannot be shared between threads when they overwrite the state
+        _map_chunks(project, v0.shape, 1 if np.may_share_memory(psi, self.psi) else self.num_threads)
+        self.psi = psi
+        return result
+
     def entangle(self, edge: tuple[int, int]) -> None:
         """Connect graph nodes.
 
@@ -259,27 +736,78 @@ class Statevec(State):
         ----------
         edge : tuple of int
             (control, target) qubit indices
+
+        Notes
+        -----
+        CZ is diagonal: it is applied in place by flipping the sign of the
+        amplitudes where both qubits are in state 1.
         """
-        # contraction: 2nd index - control index, and 3rd index - target index.
-        psi = np.tensordot(CZ_TENSOR, self.psi, ((2, 3), edge))
-        # sort back axes
-        self.psi = np.moveaxis(psi, (0, 1), edge)
+        psi = self._inplace_psi(self.psi.dtype)
+        view = psi[_cz_slice(psi.ndim, edge)]
+
+        def negate(index: tuple[int | slice, ...]) -> None:
+            chunk = view[index]
+            np.negative(chunk, out=chunk)
+
+        _map_chunks(negate, view.shape, self.num_threads)
+
+    def entangle_edges(self, edges: Iterable[tuple[int, int]]) -> None:
+        """Connect graph nodes along several edges at once.
+
+        The parity of the number of edges whose both ends are in state 1 is
+        first accumulated into a boolean mask, then the sign of the state is
+        flipped in a single sweep.
+
+        Parameters
+        ----------
+        edges : iterable of tuple of int
+            pairs of qubit indices
+        """
+        edges = list(edges)
+        if len(edges) < _ENTANGLE_EDGES_THRESHOLD:
+            for edge in edges:
+                self.entangle(edge)
+            return
+        psi = self._inplace_psi(self.psi.dtype)
+        if self._mapped():
+            _negate_parity_inplace(psi, edges, self.num_threads)
+            return
+        parity = np.zeros(psi.shape, dtype=np.bool_)
+        for edge in edges:
+            view = parity[_cz_slice(psi.ndim, edge)]
+            np.logical_not(view, out=view)
+
+        def negate(index: tuple[int | slice, ...]) -> None:
+            chunk = psi[index]
+            np.negative(chunk, out=chunk, where=parity[index])
+
+        _map_chunks(negate, psi.shape, self.num_threads)
 
     def tensor(self, other: Statevec) -> None:
         r"""Tensor product state with other qubits.
 
         Results in self :math:`\otimes` other.
 
+        If a buffer has been reserved with :meth:`reserve` and is large enough,
+        the product is computed in place in the buffer.
+
         Parameters
         ----------
         other : :class:`graphix.sim.statevec.Statevec`
             statevector to be tensored with self
         """
-        psi_self = self.psi.flatten()
-        psi_other = other.psi.flatten()
-
         total_num = len(self.dims()) + len(other.dims())
-        self.psi = np.kron(psi_self, psi_other).reshape((2,) * total_num)
+        size = self.psi.size
+        psi_other = other.psi.flatten()
+        buffer = self._reserved(size * len(psi_other), np.result_type(self.psi, psi_other))
+        if buffer is None:
+            psi_self = self.psi.flatten()
+            self.psi = np.kron(psi_self, psi_other).reshape((2,) * total_num)
+            return
+        if not self._in_buffer():
+            buffer[:size].reshape(self.psi.shape)[...] = self.psi
+        _kron_inplace(buffer, size, psi_other)
+        self.psi = buffer.reshape((2,) * total_num)
 
     def cnot(self, qubits):
         """Apply CNOT.
@@ -290,7 +818,7 @@ class Statevec(State):
             (control, target) qubit indices
         """
         # contraction: 2nd index - control index, and 3rd index - target index.
-        psi = np.tensordot(CNOT_TENSOR, self.psi, ((2, 3), qubits))
+        psi = np.tensordot(_cast_operator(CNOT_TENSOR, self.psi.dtype), self.psi, ((2, 3), qubits))
         # sort back axes
         self.psi = np.moveaxis(psi, (0, 1), qubits)
 
@@ -302,14 +830,66 @@ class Statevec(State):
         qubits : tuple of int
             (control, target) qubit indices
         """
-        # contraction: 2nd index - control index, and 3rd index - target index.
-        psi = np.tensordot(SWAP_TENSOR, self.psi, ((2, 3), qubits))
-        # sort back axes
-        self.psi = np.moveaxis(psi, (0, 1), qubits)
+        if self.psi.dtype == np.object_:
+            # contraction: 2nd index - control index, and 3rd index - target index.
+            psi = np.tensordot(_cast_operator(SWAP_TENSOR, self.psi.dtype), self.psi, ((2, 3), qubits))
+            # sort back axes
+            self.psi = np.moveaxis(psi, (0, 1), qubits)
+            return
+        i, j = qubits
+        if i == j:
+            return
+        # numerical states are updated in place, by exchanging the amplitudes where the two qubits differ
+        psi = self._inplace_psi(self.psi.dtype)
+        index_01 = [slice(None)] * psi.ndim
+        index_10 = [slice(None)] * psi.ndim
+        index_01[i], index_01[j] = slice(0, 1), slice(1, 2)
+        index_10[i], index_10[j] = slice(1, 2), slice(0, 1)
+        x = psi[tuple(index_01)]
+        y = psi[tuple(index_10)]
+
+        def exchange(index: tuple[int | slice, ...]) -> None:
+            tmp = x[index].copy()
+            x[index] = y[index]
+            y[index] = tmp
+
+        _map_chunks(exchange, x.shape, self.num_threads)
+
+    def permute(self, order: Sequence[int]) -> None:
+        """Permute the qubits: qubit `i` of the new state is qubit `order[i]` of the current one.
+
+        The amplitudes are not moved: :attr:`psi` becomes a transposed view,
+        which is only made contiguous when an operation needs it.
+
+        Parameters
+        ----------
+        order : sequence of int
+            permutation of the qubit indices
+        """
+        self.psi = np.transpose(self.psi, order)
 
     def normalize(self) -> None:
-        """Normalize the state in-place."""
-        norm = _get_statevec_norm(self.psi)
+        """Normalize the state in-place.
+
+        The amplitudes are only overwritten if the state is memory-mapped (see
+        :meth:`reserve`): otherwise, a new array is allocated, so that shallow
+        copies of the state are left untouched.
+        """
+        if self.psi.dtype == np.object_:
+            norm = _get_statevec_norm(self.psi)
+        else:
+            norm2 = np.trace(self.reduced_density_single(0)).real if self.psi.ndim else abs(self.psi) ** 2
+            # kept in the precision of the state
+            norm = np.sqrt(norm2).astype(self.psi.real.dtype)
+        if self._mapped():
+            psi = self.psi
+
+            def divide(index: tuple[int | slice, ...]) -> None:
+                chunk = psi[index]
+                chunk /= norm
+
+            _map_chunks(divide, psi.shape, self.num_threads)
+            return
         self.psi = self.psi / norm
 
     def flatten(self) -> npt.NDArray:
@@ -329,12 +909,87 @@ class Statevec(State):
         Returns
         -------
         complex : expectation value.
+
+        Notes
+        -----
+        For numerical states, the expectation value is computed from the
+        reduced density matrix of the target qubit, without copying the state.
         """
-        st1 = copy.copy(self)
-        st1.normalize()
-        st2 = copy.copy(st1)
-        st1.evolve_single(op, loc)
-        return np.dot(st2.psi.flatten().conjugate(), st1.psi.flatten())
+        op = np.asarray(op)
+        if np.object_ in (self.psi.dtype, op.dtype):
+            st1 = copy.copy(self)
+            st1.normalize()
+            st2 = copy.copy(st1)
+            st1.evolve_single(op, loc)
+            return np.dot(st2.psi.flatten().conjugate(), st1.psi.flatten())
+        rho = self.reduced_density_single(loc)
+        return np.sum(op * rho.T) / np.trace(rho)
+
+    def reduced_density_single(self, loc: int) -> npt.NDArray:
+        """Return the reduced density matrix of a single qubit, computed directly from the amplitudes.
+
+        The result is not normalized: its trace is the squared norm of the state.
+
+        Parameters
+        ----------
+        loc : int
+            target qubit index
+
+        Returns
+        -------
+        numpy.ndarray : 2*2 matrix
+        """
+        v0, v1 = _split_axis(self.psi, loc)
+
+        def partial_rho(index: tuple[int | slice, ...]) -> npt.NDArray:
+            x = v0[index]
+            y = v1[index]
+            # accumulated in double precision, whatever the precision of the state
+            return np.array([np.vdot(x, x), np.vdot(y, x), np.vdot(y, y)], dtype=np.complex128)
+
+        rho_00, rho_01, rho_11 = sum(_map_chunks(partial_rho, v0.shape, self.num_threads))
+        return np.array([[rho_00, rho_01], [rho_01.conjugate(), rho_11]])
+
+    def sample(
+        self, shots: int, qubits: Iterable[int] | None = None, rng: Generator | None = None
+    ) -> npt.NDArray[np.uint8]:
+        """Draw samples of the measurement of qubits in the computational basis.
+
+        The marginal distribution of the sampled qubits is computed once, and all
+        the samples are drawn from it by a binary search on its cumulative sum:
+        the state is left unchanged.
+
+        Parameters
+        ----------
+        shots : int
+            number of samples
+        qubits : iterable of int, optional
+            indices of the sampled qubits, defaults to all the qubits in order.
+        rng : :class:`np.random.Generator`, optional
+            random number generator used to draw the samples
+
+        Returns
+        -------
+        numpy.ndarray : array of shape `(shots, len(qubits))` and dtype `uint8`,
+            where row `s` holds the outcomes of sample `s`, in the order of `qubits`.
+            It can be packed further with :func:`numpy.packbits` along axis 1.
+        """
+        if shots < 0:
+            raise ValueError("shots must be a non-negative integer.")
+        rng = ensure_rng(rng)
+        qubits = list(range(self.psi.ndim)) if qubits is None else list(qubits)
+        if len(set(qubits)) != len(qubits):
+            raise ValueError("Sampled qubits must be distinct.")
+        probs = np.abs(self.psi)
+        np.square(probs, out=probs)
+        others = tuple(axis for axis in range(self.psi.ndim) if axis not in qubits)
+        marginal = np.transpose(probs.sum(axis=others), np.argsort(np.argsort(qubits)))
+        cumulative = np.cumsum(marginal, axis=None)
+        outcomes = np.searchsorted(cumulative, rng.random(shots) * cumulative[-1], side="right")
+        # guards against rounding errors at the upper end of the cumulative sum
+        np.minimum(outcomes, cumulative.size - 1, out=outcomes)
+        shifts = np.arange(len(qubits) - 1, -1, -1)
+        return ((outcomes[:, np.newaxis] >> shifts) & 1).astype(np.uint8)
 
     def expectation_value(self, op: np.NDArray, qargs: collections.abc.Iterable[int]) -> complex:
         """Return the expectation value of multi-qubit operator.
@@ -369,11 +1024,195 @@ class Statevec(State):
         return result
 
 
+def _cast_operator(op: npt.ArrayLike, dtype: npt.DTypeLike) -> npt.NDArray:
+    """Return `op` converted to `dtype` when it can be done without changing the kind of its values.
+
+    Operators (:class:`graphix.ops.Ops`, :attr:`graphix.clifford.Clifford.matrix`...) are
+    stored in double precision: casting them to the dtype of the state before applying
+    them preserves the precision chosen for the state.
+    """
+    op = np.asarray(op)
+    if op.dtype != dtype and np.can_cast(op.dtype, dtype, "same_kind"):
+        return op.astype(dtype)
+    return op
+
+
 def _get_statevec_norm(psi):
     """Return norm of the state."""
     return np.sqrt(np.sum(psi.flatten().conj() * psi.flatten()))
 
 
+# Minimal number of edges for which `Statevec.entangle_edges` builds a phase mask
+# instead of applying CZ gates one at a time: each gate sweeps over a quarter of the
+# state, whereas the mask is 16 times smaller than the state and is applied only once.
+_ENTANGLE_EDGES_THRESHOLD = 5
+
+
+def _cz_slice(ndim: int, edge: tuple[int, int]) -> tuple[slice, ...]:
+    """Return the index selecting the amplitudes where both qubits of `edge` are in state 1."""
+    index = [slice(None)] * ndim
+    for qubit in edge:
+        # a slice rather than an integer, so that the result is always a view, even for a 2-qubit state
+        index[qubit] = slice(1, None)
+    return tuple(index)
+
+
+# Maximum number of elements processed at once by the in-place kernels:
+# bounds the size of the temporary arrays allocated by NumPy.
+_CHUNK_SIZE = 1 << 16
+
+
+def _chunk_slices(shape: tuple[int, ...]) -> Iterator[tuple[int | slice, ...]]:
+    """Yield indices splitting an array of the given shape into blocks of at most `_CHUNK_SIZE` elements."""
+    inner = 1
+    split = len(shape)
+    while split > 0 and inner * shape[split - 1] <= _CHUNK_SIZE:
+        split -= 1
+        inner *= shape[split]
+    if split == 0:
+        yield ()
+        return
+    step = max(1, _CHUNK_SIZE // inner)
+    for outer in np.ndindex(*shape[: split - 1]):
+        for start in range(0, shape[split - 1], step):
+            yield (*outer, slice(start, start + step))
+
+
+def _draw_measurement(
+    qubit: int,
+    rho: npt.NDArray,
+    plane: Plane,
+    angle: float,
+    rng: Generator | None,
+    pr_calc: bool,
+    op: npt.NDArray | None = None,
+) -> tuple[bool, npt.NDArray]:
+    """Draw the outcome of the measurement of a qubit, given its unnormalized reduced density matrix `rho`.
+
+    See :meth:`Statevec.measure_and_remove` for the parameters.
+
+    Returns
+    -------
+    bool : measurement outcome
+    numpy.ndarray : coefficients `(c_0, c_1)` such that the normalized state after the measurement,
+        with the qubit removed, is `c_0 * psi_0 + c_1 * psi_1`, where `psi_b` is the state
+        restricted to the amplitudes where the qubit is in state `b`.
+    """
+    rng = ensure_rng(rng)
+    vec = plane.polar(angle)
+    op_mat = _op_mat_from_result(vec, False)
+    if op is not None:
+        rho = op @ rho @ op.conj().T
+    norm2 = np.trace(rho).real
+    prob_0 = np.sum(op_mat * rho.T).real / norm2
+    result = rng.random() > prob_0 if pr_calc else rng.choice([0, 1])
+    if result:
+        op_mat = _op_mat_from_result(vec, True)
+        prob = 1 - prob_0
+    else:
+        prob = prob_0
+    if np.isclose(prob, 0):
+        raise ValueError(f"Outcome {int(result)} of the measurement of qubit {qubit} has zero probability.")
+    # The projector is |v><v|: its row k is v_k <v|. As in `remove_qubit`,
+    # the row 0 is taken unless it vanishes, which fixes the global phase.
+    k = 1 if np.isclose(op_mat[0, 0], 0) else 0
+    bra = op_mat[k] if op is None else op_mat[k] @ op
+    return result, bra / np.sqrt(op_mat[k, k].real * prob * norm2)
+
+
+@functools.cache
+def _thread_pool(num_threads: int) -> ThreadPoolExecutor:
+    """Return the thread pool shared by the kernels run with `num_threads` threads."""
+    return ThreadPoolExecutor(max_workers=num_threads, thread_name_prefix="graphix-statevec")
+
+
+def _map_chunks(func: Callable[[tuple[int | slice, ...]], _T], shape: tuple[int, ...], num_threads: int) -> list[_T]:
+    """Call `func` on each index of :func:`_chunk_slices` and return the results in order.
+
+    With `num_threads > 1`, the chunks are processed concurrently by a thread pool:
+    NumPy releases the GIL in its arithmetic loops, so that the threads run in parallel.
+    `func` must then only write to the chunk it is given.
+    """
+    chunks = list(_chunk_slices(shape))
+    if num_threads <= 1 or len(chunks) == 1:
+        return [func(index) for index in chunks]
+    return list(_thread_pool(num_threads).map(func, chunks))
+
+
+def _negate_parity_inplace(psi: npt.NDArray, edges: list[tuple[int, int]], num_threads: int) -> None:
+    """Flip the sign of the amplitudes of the C-contiguous `psi` where an odd number of `edges` have both ends in state 1.
+
+    Unlike the mask used by :meth:`Statevec.entangle_edges`, the parity is
+    computed chunk by chunk from the positions of the amplitudes, so that no
+    array of the size of the state is allocated.
+    """
+    flat = psi.reshape(-1)
+    shifts = [(psi.ndim - 1 - i, psi.ndim - 1 - j) for i, j in edges]
+
+    def negate(index: tuple[int | slice, ...]) -> None:
+        (chunk_slice,) = index or (slice(None),)
+        start, stop, _ = chunk_slice.indices(flat.size)
+        positions = np.arange(start, stop)
+        parity = np.zeros(stop - start, dtype=positions.dtype)
+        for shift_i, shift_j in shifts:
+            parity ^= (positions >> shift_i) & (positions >> shift_j)
+        chunk = flat[start:stop]
+        np.negative(chunk, out=chunk, where=(parity & 1).astype(np.bool_))
+
+    _map_chunks(negate, flat.shape, num_threads)
+
+
+def _kron_inplace(buffer: npt.NDArray, size: int, vec: npt.NDArray) -> None:
+    """Overwrite the front of `buffer` with the Kronecker product of its first `size` elements and `vec`."""
+    out = buffer[: size * len(vec)].reshape(size, len(vec))
+    step = max(1, _CHUNK_SIZE // len(vec))
+    # Blocks are processed from the end: the amplitudes of the original state
+    # are all read before the positions where they are stored get overwritten.
+    for stop in range(size, 0, -step):
+        start = max(0, stop - step)
+        out[start:stop] = buffer[start:stop, None] * vec
+
+
+def _split_axis(psi: npt.NDArray, axis: int) -> tuple[npt.NDArray, npt.NDArray]:
+    """Return the views on `psi` where the qubit `axis` is respectively in state 0 and 1."""
+    axis %= psi.ndim
+    if psi.flags.c_contiguous:
+        # merging the other axes reduces the number of chunks to iterate over
+        view = psi.reshape(2**axis, 2, -1)
+        return view[:, 0], view[:, 1]
+    index = (slice(None),) * axis
+    return psi[(*index, 0)], psi[(*index, 1)]
+
+
+def _apply_pair_inplace(v0: npt.NDArray, v1: npt.NDArray, op: npt.NDArray, num_threads: int = 1) -> None:
+    """Apply the 2*2 matrix `op` in place to the pairs of amplitudes `(v0, v1)`.
+
+    `v0` and `v1` are views of the same shape on the state, for which the
+    target qubit is respectively in state 0 and 1.
+    """
+    (a, b), (c, d) = op
+    diagonal = b == 0 and c == 0
+
+    def apply(index: tuple[int | slice, ...]) -> None:
+        x = v0[index]
+        y = v1[index]
+        if diagonal:
+            # diagonal operators (Z, S, projectors on computational basis...) are just rescaling
+            if a != 1:
+                x *= a
+            if d != 1:
+                y *= d
+            return
+        x_new = a * x + b * y
+        y *= d
+        y += c * x
+        x[...] = x_new
+
+    if diagonal and a == 1 and d == 1:
+        return
+    _map_chunks(apply, v0.shape, num_threads)
+
+
 if TYPE_CHECKING:
     from collections.abc import Iterable
 
@@ -2,7 +2,12 @@
 
 from __future__ import annotations
 
+import hashlib
+import itertools
+import json
+import os
 import string
+from collections import OrderedDict
 from copy import deepcopy
 from typing import TYPE_CHECKING
 
@@ -14,6 +19,7 @@ from graphix import command
 from graphix.ops import Ops
 from graphix.rng import ensure_rng
 from graphix.sim.base_backend import Backend, State
+from graphix.sim.statevec import _draw_measurement
 from graphix.states import BasicStates, PlanarState
 
 if TYPE_CHECKING:
@@ -32,7 +38,14 @@ class TensorNetworkBackend(Backend):
     """
 
     def __init__(
-        self, pattern, graph_prep="auto", input_state=BasicStates.PLUS, rng: Generator | None = None, **kwargs
+        self,
+        pattern,
+        graph_prep="auto",
+        input_state=BasicStates.PLUS,
+        rng: Generator | None = None,
+        path_cache: ContractionPathCache | None = None,
+        pr_calc: bool = False,
+        **kwargs,
     ):
         """
         Construct a tensor network backend.
@@ -54,6 +67,15 @@ class TensorNetworkBackend(Backend):
         input_state : preparation for input states (only BasicStates.PLUS is supported for tensor networks yet),
         rng: :class:`np.random.Generator` (default: `None`)
             random number generator to use for measurements
+        path_cache: :class:`ContractionPathCache` (default: `None`)
+            cache of contraction paths used by the state (see :class:`MBQCTensorNet`).
+            Sharing a cache between the simulations of patterns of the same structure
+            saves the contraction path search of all but the first one.
+        pr_calc: bool (default: `False`)
+            whether to draw the outcomes of the measurements according to their probabilities,
+            computed from the network (see :meth:`MBQCTensorNet.reduced_density_single`),
+            or with 50% probability for each outcome. Drawing the outcomes with their
+            probabilities requires contractions of the network at each measurement.
         **kwargs : Additional keyword args to be passed to quimb.tensor.TensorNetwork.
         """
         self.pattern = pattern
@@ -84,13 +106,14 @@ class TensorNetworkBackend(Backend):
                 graph_edges=edges,
                 default_output_nodes=pattern.output_nodes,
                 rng=rng,
+                path_cache=path_cache,
                 **kwargs,
             )
         elif self.graph_prep == "sequential":
-            state = MBQCTensorNet(default_output_nodes=pattern.output_nodes, rng=rng, **kwargs)
+            state = MBQCTensorNet(default_output_nodes=pattern.output_nodes, rng=rng, path_cache=path_cache, **kwargs)
             self._decomposed_cz = _get_decomposed_cz()
         self._isolated_nodes = pattern.get_isolated_nodes()
-        super().__init__(state)
+        super().__init__(state, pr_calc=pr_calc)
 
     def add_nodes(self, nodes, data=BasicStates.PLUS) -> None:
         """Add nodes to the network.
@@ -150,6 +173,8 @@ class TensorNetworkBackend(Backend):
 
         In the context of tensornetwork, performing measurement equals to
         applying measurement operator to the tensor. Here, directly contracted with the projected state.
+        With `pr_calc`, the outcome is drawn with its probability, computed from the reduced
+        density matrix of the node; otherwise, both outcomes have probability 1/2.
 
         Parameters
         ----------
@@ -165,6 +190,13 @@ class TensorNetworkBackend(Backend):
             result = self.__rng.choice([0, 1], p=probs)
             self.results[node] = result
             buffer = 1 / probs[result] ** 0.5
+        elif self.pr_calc:
+            rho = self.state.reduced_density_single(node)
+            result, coef = _draw_measurement(node, rho, measurement.plane, measurement.angle, self.__rng, True)
+            self.results[node] = result
+            # `coef` is the normalized projection bra, whereas `measure_single` expects a ket
+            self.state.measure_single(node, basis=coef.conj())
+            return result
         else:
             # choose the measurement result randomly
             result = self.__rng.choice([0, 1])
@@ -217,6 +249,7 @@ class MBQCTensorNet(State, TensorNetwork):
         graph_edges=None,
         default_output_nodes=None,
         ts=None,
+        path_cache: ContractionPathCache | None = None,
         **kwargs,
     ) -> None:
         """
@@ -232,13 +265,28 @@ class MBQCTensorNet(State, TensorNetwork):
             output node indices at the end of MBQC operations, if known in advance.
         ts (optional): quimb.tensor.core.TensorNetwork or empty list
             optional initial state.
+        path_cache (optional): :class:`ContractionPathCache`
+            cache of the contraction paths of the full contractions
+            (:meth:`to_statevector`, :meth:`get_basis_coefficient`, :meth:`get_norm`
+            and :meth:`expectation_value`). Default is to search a path for each contraction.
+            Copies of a network with a cache share it.
+
+        The norm of the state and the simplified networks used by :meth:`get_basis_coefficient`
+        are computed on first use and kept until a tensor is added to or removed from the
+        network (e.g. by :meth:`evolve`, :meth:`evolve_single` or :meth:`measure_single`).
         """
         if ts is None:
             ts = []
+        self._path_cache = path_cache
+        self._norm = None
+        self._simplified = {}
+        self._environments = _Environments()
         if isinstance(ts, MBQCTensorNet):
             super().__init__(ts=ts, **kwargs)
             self._dangling = ts._dangling
             self.default_output_nodes = default_output_nodes
+            if path_cache is None:
+                self._path_cache = ts._path_cache
         else:
             super().__init__(ts=ts, **kwargs)
             self._dangling = {}
@@ -361,7 +409,9 @@ class MBQCTensorNet(State, TensorNetwork):
             default True.
             if True, skip the calculation of the probability of the measurement
             result and use equal probability for each result.
-            if False, calculate the probability of the measurement result from the state.
+            if False, calculate the probability of the measurement result from the state
+            (see :meth:`reduced_density_single`), and normalize the projected state.
+            Only Pauli bases are supported in that case.
         outcome : int (0 or 1)
             User-chosen measurement result, giving the outcome of (-1)^{outcome}.
 
@@ -377,22 +427,18 @@ class MBQCTensorNet(State, TensorNetwork):
                 if outcome is not None:
                     raise Warning("Measurement outcome is chosen but the basis state was given.")
                 proj_vec = basis
-            elif basis == "Z" and result == 0:
-                proj_vec = BasicStates.ZERO.get_statevector()
-            elif basis == "Z" and result == 1:
-                proj_vec = BasicStates.ONE.get_statevector()
-            elif basis == "X" and result == 0:
-                proj_vec = BasicStates.PLUS.get_statevector()
-            elif basis == "X" and result == 1:
-                proj_vec = BasicStates.MINUS.get_statevector()
-            elif basis == "Y" and result == 0:
-                proj_vec = BasicStates.PLUS_I.get_statevector()
-            elif basis == "Y" and result == 1:
-                proj_vec = BasicStates.MINUS_I.get_statevector()
             else:
-                raise ValueError("Invalid measurement basis.")
+                proj_vec = _pauli_basis(basis)[result]
         else:
-            raise NotImplementedError("Measurement probability calculation not implemented.")
+            if isinstance(basis, np.ndarray):
+                raise ValueError("The probability calculation requires a Pauli measurement basis.")
+            vectors = _pauli_basis(basis)
+            rho = self.reduced_density_single(index)
+            probs = [np.vdot(vec, rho @ vec).real / np.trace(rho).real for vec in vectors]
+            result = outcome if outcome is not None else int(self.__rng.random() > probs[0])
+            if np.isclose(probs[result], 0):
+                raise ValueError(f"Outcome {result} of the measurement of node {index} has zero probability.")
+            proj_vec = vectors[result] / np.sqrt(probs[result])
         old_ind = self._dangling[str(index)]
         proj_ts = Tensor(proj_vec, [old_ind], [str(index), "M", "Close", "ancilla"]).H
         # add the tensor to the network
@@ -402,6 +448,34 @@ class MBQCTensorNet(State, TensorNetwork):
         self.add_tensor(proj_ts)
         return result
 
+    def reduced_density_single(self, index) -> npt.NDArray:
+        """Return the reduced density matrix of a node that has not been measured.
+
+        The matrix is obtained by contracting the network with its conjugate,
+        leaving open the dangling index of the node on both sides. The
+        contractions are made node by node along the sequence of the nodes
+        of the network, and the environments, that is the contractions of
+        the nodes before and after each node of the sequence, are kept until
+        the tensors of the nodes they contain change: when the nodes are
+        measured in the order of the sequence, each reduced density matrix
+        costs a few pairwise contractions instead of a contraction of the
+        whole network.
+
+        Parameters
+        ----------
+        index : int
+            node index.
+
+        Returns
+        -------
+        numpy.ndarray :
+            2*2 matrix, whose trace is the squared norm of the state.
+        """
+        ind = self._dangling[str(index)]
+        if len(self.ind_map.get(ind, ())) != 1:
+            raise ValueError(f"Node {index} has no open index: it has been measured.")
+        return self._environments.reduced_density(self, ind)
+
     def set_graph_state(self, nodes, edges):
         """Prepare the graph state without directly applying CZ gates.
 
@@ -471,26 +545,12 @@ class MBQCTensorNet(State, TensorNetwork):
             indices = self.default_output_nodes
         if isinstance(basis, str):
             basis = int(basis, 2)
-        tn = self.copy()
-        # prepare projected state
-        for i in range(len(indices)):
-            node = str(indices[i])
-            exp = len(indices) - i - 1
-            if (basis // 2**exp) == 1:
-                state_out = BasicStates.ONE.get_statevector()  # project onto |1>
-                basis -= 2**exp
-            else:
-                state_out = BasicStates.ZERO.get_statevector()  # project onto |0>
-            tensor = Tensor(state_out, [tn._dangling[node]], [node, f"qubit {i}", "Close"])
-            # retag
-            old_ind = tn._dangling[node]
-            tid = next(iter(tn._get_tids_from_inds(old_ind)))
-            tn.tensor_map[tid].retag({"Open": "Close"})
-            tn.add_tensor(tensor)
-
-        # contraction
-        tn_simplified = tn.full_simplify("ADCR")
-        coef = tn_simplified.contract(output_inds=[], **kwagrs)
+        output_inds = [self._dangling[str(node)] for node in indices]
+        # the first index is the most significant bit
+        bits = [(basis >> (len(indices) - i - 1)) & 1 for i in range(len(indices))]
+        # project the simplified network onto the basis state
+        tn = self._simplified_network(output_inds).isel(dict(zip(output_inds, bits)))
+        coef = self._contract(tn, [], **kwagrs)
         if normalize:
             norm = self.get_norm()
             return coef / norm
@@ -514,25 +574,39 @@ class MBQCTensorNet(State, TensorNetwork):
         coef = self.get_basis_coefficient(basis, **kwagrs)
         return abs(coef) ** 2
 
-    def to_statevector(self, indices=None, **kwagrs) -> npt.NDArray:
+    def to_statevector(self, indices=None, max_open=None, **kwagrs) -> npt.NDArray:
         """Retrieve the statevector from the tensornetwork.
 
-        This method tends to be slow however we plan to parallelize this.
+        The network is simplified once, then contracted with the dangling indices
+        of the target qubits left open, which gives all the amplitudes at once.
 
         Parameters
         ----------
         indices (optional): list of int
             target qubit indices. Default is the MBQC output nodes (self.default_output_nodes).
+        max_open (optional): int
+            maximal number of indices left open in a contraction. If there are more
+            target qubits, the leading ones are fixed to each of their values in turn
+            (the network is sliced), so that the intermediate tensors of each
+            contraction stay small; the amplitudes are still returned at once.
+            Default is to contract the whole network once.
 
         Returns
         -------
         numpy.ndarray :
             statevector
         """
-        n_qubit = len(self.default_output_nodes) if indices is None else len(indices)
-        statevec = np.zeros(2**n_qubit, np.complex128)
-        for i in range(len(statevec)):
-            statevec[i] = self.get_basis_coefficient(i, normalize=False, indices=indices, **kwagrs)
+        if indices is None:
+            indices = self.default_output_nodes
+        output_inds = [self._dangling[str(node)] for node in indices]
+        tn = self._simplified_network(output_inds)
+        n_sliced = 0 if max_open is None else max(0, len(output_inds) - max_open)
+        sliced_inds, open_inds = output_inds[:n_sliced], output_inds[n_sliced:]
+        statevec = np.zeros((2,) * len(output_inds), np.complex128)
+        for bits in itertools.product((0, 1), repeat=n_sliced):
+            tn_slice = tn.isel(dict(zip(sliced_inds, bits))) if n_sliced else tn
+            statevec[bits] = self._contract(tn_slice, open_inds, **kwagrs)
+        statevec = statevec.flatten()
         return statevec / np.linalg.norm(statevec)
 
     def flatten(self) -> npt.NDArray:
@@ -542,16 +616,20 @@ class MBQCTensorNet(State, TensorNetwork):
     def get_norm(self, **kwagrs):
         """Calculate the norm of the state.
 
+        The norm is computed once and reused until the network is modified.
+
         Returns
         -------
         float :
             norm of the state
         """
-        tn_cp1 = self.copy()
-        tn_cp2 = tn_cp1.conj()
-        tn = TensorNetwork([tn_cp1, tn_cp2])
-        tn_simplified = tn.full_simplify("ADCR")
-        return abs(tn_simplified.contract(output_inds=[], **kwagrs)) ** 0.5
+        if self._norm is None:
+            tn_cp1 = self.copy()
+            tn_cp2 = tn_cp1.conj()
+            tn = TensorNetwork([tn_cp1, tn_cp2])
+            tn_simplified = tn.full_simplify("ADCR")
+            self._norm = abs(self._contract(tn_simplified, [], **kwagrs)) ** 0.5
+        return self._norm
 
     def expectation_value(self, op, qubit_indices, output_node_indices=None, **kwagrs):
         """Calculate expectation value of the given operator.
@@ -603,10 +681,48 @@ class MBQCTensorNet(State, TensorNetwork):
 
         # contraction
         tn_cp_left = tn_cp_left.full_simplify("ADCR")
-        exp_val = tn_cp_left.contract(output_inds=[], **kwagrs)
+        exp_val = self._contract(tn_cp_left, [], **kwagrs)
         norm = self.get_norm(**kwagrs)
         return exp_val / norm**2
 
+    def _simplified_network(self, output_inds: list[str]) -> TensorNetwork:
+        """Return the network simplified with the indices `output_inds` kept open, computed once until it is modified."""
+        key = tuple(output_inds)
+        tn = self._simplified.get(key)
+        if tn is None:
+            tn = self.full_simplify("ADCR", output_inds=output_inds)
+            self._simplified[key] = tn
+        return tn
+
+    def add_tensor(self, tensor, tid=None, virtual=False):
+        """Add a single tensor to the network, and discard the norm and the simplified networks computed so far."""
+        self._reset_cache()
+        super().add_tensor(tensor, tid=tid, virtual=virtual)
+
+    def pop_tensor(self, tid_or_tags, which="all"):
+        """Remove a tensor from the network and return it, and discard the norm and the simplified networks computed so far."""
+        self._reset_cache()
+        return super().pop_tensor(tid_or_tags, which=which)
+
+    def _reset_cache(self) -> None:
+        self._norm = None
+        self._simplified = {}
+
+    def _contract(self, tn: TensorNetwork, output_inds: list[str], **kwagrs) -> npt.NDArray:
+        """Contract `tn`, leaving open the indices `output_inds`, and return the resulting array in their order.
+
+        The contraction path is taken from the path cache of the network, if any.
+        """
+        if self._path_cache is not None and "optimize" not in kwagrs:
+            contraction_path = self._path_cache.get_path(tn, output_inds)
+            # the path of a single tensor is empty, which is not accepted as a path
+            if contraction_path:
+                kwagrs["optimize"] = contraction_path
+        result = tn.contract(output_inds=output_inds, **kwagrs)
+        if not output_inds:
+            return np.asarray(result)
+        return result.transpose(*output_inds).data
+
     def evolve(self, operator, qubit_indices, decompose=True, **kwagrs):
         """Apply an arbitrary operator to the state.
 
@@ -671,6 +787,224 @@ class MBQCTensorNet(State, TensorNetwork):
         return self.__class__(rng=self.__rng, ts=self)
 
 
+class ContractionPathCache:
+    """Bounded cache of contraction paths, keyed by the structure of the contracted network.
+
+    Simulating patterns with the same graph, outputs and measurement order, but
+    different angles, yields networks of the same structure: the path found by
+    the optimizer for the first one is reused for the others. The key is a hash
+    of the shapes of the tensors and of the pattern of shared indices, up to the
+    renaming of the indices, so that a path is only reused on a network to which
+    it applies (the simplification of the network may depend on the angles).
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        maximal number of paths kept in memory, the least recently used ones
+        being discarded first. Defaults to 128.
+    path : str or os.PathLike, optional
+        JSON file where the paths are persisted: paths found in a previous
+        session are loaded from it, and it is rewritten when a new path is found.
+    """
+
+    def __init__(self, maxsize: int = 128, path: str | os.PathLike | None = None) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be a positive integer.")
+        self.__maxsize = maxsize
+        self.__file = path
+        self.__paths: OrderedDict[str, list[tuple[int, ...]]] = OrderedDict()
+        if path is not None and os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                for key, contraction_path in json.load(file).items():
+                    self.__store(key, [tuple(step) for step in contraction_path])
+
+    def __len__(self) -> int:
+        """Return the number of cached paths."""
+        return len(self.__paths)
+
+    def get_path(self, tn: TensorNetwork, output_inds: list[str]) -> list[tuple[int, ...]]:
+        """Return the contraction path of `tn` with the indices `output_inds` left open, searching it only if needed."""
+        key = _structure_key(tn, output_inds)
+        contraction_path = self.__paths.get(key)
+        if contraction_path is not None:
+            self.__paths.move_to_end(key)
+            return contraction_path
+        contraction_path = [tuple(step) for step in tn.contract(output_inds=output_inds, get="path")]
+        self.__store(key, contraction_path)
+        if self.__file is not None:
+            with open(self.__file, "w", encoding="utf-8") as file:
+                json.dump(self.__paths, file)
+        return contraction_path
+
+    def __store(self, key: str, contraction_path: list[tuple[int, ...]]) -> None:
+        self.__paths[key] = contraction_path
+        if len(self.__paths) > self.__maxsize:
+            self.__paths.popitem(last=False)
+
+
+# Maximal number of entries of the environments cached by `_Environments`.
+_MAX_ENVIRONMENT_SIZE = 1 << 16
+
+
+class _Environments:
+    """Contractions of the double-layer network <psi|psi>, grouped by node, from both ends of a sequence of nodes.
+
+    Each node contributes a leaf: the contraction of its tensors (the tensors
+    tagged by the node) with their conjugates, where the dangling indices are
+    traced out. A leaf is recomputed only when the tensors of its node change,
+    in which case the left environments (contractions of the leaves before a
+    position of the sequence) and the right environments (contractions of the
+    leaves after a position) that contain it are discarded.
+
+    The size of an environment grows exponentially with the number of bonds
+    between the nodes it contains and the other ones. Environments are not
+    computed beyond `_MAX_ENVIRONMENT_SIZE` entries: the network of the leaves
+    is then contracted as a whole, along an optimized path.
+    """
+
+    def __init__(self) -> None:
+        self.__keys: list[str] = []
+        self.__blocks: dict[str, tuple[tuple[int, ...], frozenset[str]]] = {}
+        self.__kets: dict[str, Tensor] = {}
+        self.__leaves: dict[str, Tensor] = {}
+        self.__left: list[Tensor | None] = [None]
+        self.__right: list[Tensor | None] = [None]
+
+    def reduced_density(self, tn: MBQCTensorNet, ind: str) -> npt.NDArray:
+        """Return the reduced density matrix of the dangling index `ind` of `tn`."""
+        key = self.__update(tn)[next(iter(tn.ind_map[ind]))]
+        pos = self.__keys.index(key)
+        ket = self.__kets[key]
+        _, dangling = self.__blocks[key]
+        leaf = _pair(ket, _bra(ket, dangling, ind))
+        if self.__extend_left(pos) and self.__extend_right(pos + 1):
+            rho = _pair(_pair(self.__left[pos], leaf), self.__right[len(self.__keys) - pos - 1])
+            return rho.transpose(ind, ind + "*").data
+        leaves = [leaf if other == key else self.__leaves[other] for other in self.__keys]
+        return tn._contract(TensorNetwork(leaves, virtual=True), [ind, ind + "*"])
+
+    def __update(self, tn: MBQCTensorNet) -> dict[int, str]:
+        """Recompute the leaves of the nodes whose tensors changed, and return the node of each tensor."""
+        node_tags = set(tn._dangling)
+        groups: dict[str, list[int]] = {}
+        key_of_tid = {}
+        for tid, tensor in tn.tensor_map.items():
+            tags = [tag for tag in tensor.tags if tag in node_tags]
+            key = min(tags, key=int) if tags else f"#{tid}"
+            groups.setdefault(key, []).append(tid)
+            key_of_tid[tid] = key
+        outer = {ind for ind, tids in tn.ind_map.items() if len(tids) == 1}
+        blocks = {
+            key: (tuple(tids), frozenset(ind for tid in tids for ind in tn.tensor_map[tid].inds if ind in outer))
+            for key, tids in groups.items()
+        }
+        removed = [pos for pos, key in enumerate(self.__keys) if key not in blocks]
+        if removed:
+            self.__keys = [key for key in self.__keys if key in blocks]
+            del self.__left[removed[0] + 1 :]
+            del self.__right[1:]
+            for key in set(self.__blocks) - set(blocks):
+                del self.__blocks[key], self.__kets[key], self.__leaves[key]
+        for pos, key in enumerate(self.__keys):
+            if blocks[key] != self.__blocks[key]:
+                self.__set_leaf(tn, key, blocks[key])
+                self.__invalidate(pos)
+        added = sorted((key for key in blocks if key not in self.__blocks), key=_sequence_order)
+        if added:
+            for key in added:
+                self.__set_leaf(tn, key, blocks[key])
+            self.__keys.extend(added)
+            # the right environments are indexed from the end of the sequence
+            del self.__right[1:]
+        return key_of_tid
+
+    def __set_leaf(self, tn: MBQCTensorNet, key: str, block: tuple[tuple[int, ...], frozenset[str]]) -> None:
+        tids, dangling = block
+        tensors = [tn.tensor_map[tid] for tid in tids]
+        ket = tensors[0] if len(tensors) == 1 else qtn.tensor_contract(*tensors, preserve_tensor=True)
+        self.__blocks[key] = block
+        self.__kets[key] = ket
+        self.__leaves[key] = _pair(ket, _bra(ket, dangling))
+
+    def __invalidate(self, pos: int) -> None:
+        """Discard the environments containing the leaf at position `pos`."""
+        del self.__left[pos + 1 :]
+        del self.__right[len(self.__keys) - pos :]
+
+    def __extend_left(self, pos: int) -> bool:
+        """Compute the contraction of the leaves before position `pos`, and return whether it is small enough."""
+        while len(self.__left) <= pos:
+            k = len(self.__left)
+            leaf = self.__leaves[self.__keys[k - 1]]
+            if _pair_size(self.__left[k - 1], leaf) > _MAX_ENVIRONMENT_SIZE:
+                return False
+            self.__left.append(_pair(self.__left[k - 1], leaf))
+        return True
+
+    def __extend_right(self, pos: int) -> bool:
+        """Compute the contraction of the leaves from position `pos`, and return whether it is small enough."""
+        n = len(self.__keys)
+        while len(self.__right) <= n - pos:
+            k = len(self.__right)
+            leaf = self.__leaves[self.__keys[n - k]]
+            if _pair_size(leaf, self.__right[k - 1]) > _MAX_ENVIRONMENT_SIZE:
+                return False
+            self.__right.append(_pair(leaf, self.__right[k - 1]))
+        return True
+
+
+def _bra(ket: Tensor, dangling: frozenset[str], open_ind: str | None = None) -> Tensor:
+    """Return the conjugate of `ket`, with its indices renamed except the dangling ones to be traced out."""
+    return ket.conj().reindex({ind: ind + "*" for ind in ket.inds if ind not in dangling or ind == open_ind})
+
+
+def _pair(a: Tensor | None, b: Tensor | None) -> Tensor | None:
+    """Contract two tensors over their shared indices; `None` stands for an empty contraction."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return qtn.tensor_contract(a, b, preserve_tensor=True)
+
+
+def _pair_size(a: Tensor | None, b: Tensor | None) -> int:
+    """Return the number of entries of the contraction of two tensors."""
+    if a is None or b is None:
+        return 0
+    shared = set(a.inds) & set(b.inds)
+    dims = {**dict(zip(a.inds, a.shape)), **dict(zip(b.inds, b.shape))}
+    return int(np.prod([dim for ind, dim in dims.items() if ind not in shared], dtype=np.int64))
+
+
+def _sequence_order(key: str) -> tuple[int, int]:
+    """Order the nodes by number, followed by the groups of tensors without node."""
+    if key.startswith("#"):
+        return (1, int(key[1:]))
+    return (0, int(key))
+
+
+def _pauli_basis(basis: str) -> tuple[npt.NDArray, npt.NDArray]:
+    """Return the states of outcomes 0 and 1 of the measurement of a Pauli operator."""
+    if basis == "Z":
+        return BasicStates.ZERO.get_statevector(), BasicStates.ONE.get_statevector()
+    if basis == "X":
+        return BasicStates.PLUS.get_statevector(), BasicStates.MINUS.get_statevector()
+    if basis == "Y":
+        return BasicStates.PLUS_I.get_statevector(), BasicStates.MINUS_I.get_statevector()
+    raise ValueError("Invalid measurement basis.")
+
+
+def _structure_key(tn: TensorNetwork, output_inds: list[str]) -> str:
+    """Return a hash of the structure of the network, invariant under the renaming of the indices."""
+    labels: dict[str, int] = {}
+    tensors = [
+        tuple((labels.setdefault(ind, len(labels)), size) for ind, size in zip(tensor.inds, tensor.shape))
+        for tensor in tn.tensors
+    ]
+    outputs = [labels.setdefault(ind, len(labels)) for ind in output_inds]
+    return hashlib.sha256(repr((tensors, outputs)).encode()).hexdigest()
+
+
 def _get_decomposed_cz():
     """Return the decomposed cz tensors.
 
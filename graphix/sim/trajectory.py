@@ -0,0 +1,220 @@
+"""Noisy MBQC simulation by Monte-Carlo sampling of quantum trajectories.
+
+Instead of evolving a density matrix of `4**n` entries, each run evolves a
+state vector of `2**n` amplitudes, on which every Kraus channel of the noise
+model is replaced by one of its Kraus operators, drawn with the probability of
+the corresponding branch. Averaging a quantity over many runs estimates its
+value on the noisy density matrix.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import itertools
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from graphix.sim.statevec import StatevectorBackend, _chunk_slices
+from graphix.states import BasicStates
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Collection, Sequence
+
+    import numpy.typing as npt
+
+    from graphix.channels import KrausChannel
+    from graphix.noise_models.noise_model import NoiseModel
+    from graphix.pattern import Pattern
+    from graphix.sim.statevec import Data, Statevec
+
+
+class TrajectoryBackend(StatevectorBackend):
+    """MBQC simulator with noise, by sampling one trajectory of a noisy state vector.
+
+    :meth:`apply_channel` applies a single Kraus operator of the channel, drawn
+    with the probability of its branch, and renormalizes the state: the state
+    is then the one of a single trajectory, and the density matrix simulated by
+    :class:`graphix.sim.density_matrix.DensityMatrixBackend` is the average over
+    trajectories of its projector. See :func:`simulate_trajectories` to run and
+    aggregate many trajectories.
+
+    The constructor takes the same arguments as :class:`graphix.sim.statevec.StatevectorBackend`.
+    """
+
+    def apply_channel(self, channel: KrausChannel, qargs: Collection[int]) -> None:
+        r"""Apply a Kraus operator of the channel, drawn with the probability of its branch.
+
+        The branch of the Kraus operator :math:`c_i K_i` has probability
+        :math:`|c_i|^2 \| K_i \psi \|^2`. When all the operators are unitary
+        (as for Pauli channels such as depolarising and dephasing), this is
+        :math:`|c_i|^2` and the state is not read; otherwise, it is computed from
+        the reduced density matrix of the target qubits. Identity operators are
+        not applied.
+
+        Parameters
+        ----------
+        channel : :class:`graphix.channels.KrausChannel`
+            channel to sample
+        qargs : collection of int
+            target nodes
+        """
+        nodes = list(qargs)
+        indices = [self.node_index.index(node) for node in nodes]
+        ops = [data.operator for data in channel]
+        probs = np.array([abs(data.coef) ** 2 for data in channel])
+        dim = 2 ** len(indices)
+        if not channel.is_mixed_unitary:
+            state = self.state
+            if len(indices) == 1:
+                rho = state.reduced_density_single(indices[0])
+            else:
+                rho = _reduced_density(state.psi, indices)
+            probs *= [np.trace(op @ rho @ op.conj().T).real for op in ops]
+        # the probabilities sum to one up to rounding, since the channel is normalized
+        branch = self.rng.choice(len(ops), p=probs / probs.sum())
+        op = channel[branch].coef * ops[branch] / np.sqrt(probs[branch])
+        if np.allclose(op, op[0, 0] * np.eye(dim)):
+            # identity, up to a global phase
+            return
+        if len(indices) == 1:
+            self.apply_single(nodes[0], op)
+        else:
+            self.state.evolve(op, indices)
+
+
+def _reduced_density(psi: npt.NDArray, qargs: Sequence[int]) -> npt.NDArray:
+    """Return the reduced density matrix of the qubits `qargs` of the state vector `psi`, in the order of `qargs`.
+
+    The amplitudes are read by chunks on the views where the qubits `qargs` have
+    given values: the state is not copied.
+    """
+    views = []
+    for bits in itertools.product((0, 1), repeat=len(qargs)):
+        index: list[int | slice] = [slice(None)] * psi.ndim
+        for axis, bit in zip(qargs, bits):
+            index[axis] = bit
+        views.append(psi[tuple(index)])
+    rho = np.zeros((len(views), len(views)), dtype=np.complex128)
+    for index in _chunk_slices(views[0].shape):
+        block = np.stack([np.ravel(view[index]) for view in views])
+        rho += block @ block.conj().T
+    return rho
+
+
+@dataclasses.dataclass(frozen=True)
+class TrajectoryEstimate:
+    """Estimate of a quantity averaged over trajectories, as returned by :func:`simulate_trajectories`."""
+
+    mean: float
+    "Mean of the quantity over the trajectories."
+
+    std_error: float
+    "Standard error of the mean."
+
+    interval: tuple[float, float]
+    "Confidence interval of the mean, in the normal approximation."
+
+    values: npt.NDArray[np.float64]
+    "Value of the quantity for each trajectory."
+
+
+def simulate_trajectories(
+    pattern: Pattern,
+    noise_model: NoiseModel,
+    shots: int,
+    func: Callable[[Statevec], float],
+    seed: int | np.random.SeedSequence | None = None,
+    max_workers: int = 1,
+    confidence: float = 0.95,
+    input_state: Data = BasicStates.PLUS,
+    **kwargs,
+) -> TrajectoryEstimate:
+    """Estimate the average of `func` on the output state of a noisy pattern, by sampling trajectories.
+
+    Each trajectory is a run of :class:`graphix.simulator.PatternSimulator`
+    with :class:`TrajectoryBackend`, with its own random-number generator
+    spawned from `seed`: the values do not depend on `max_workers`.
+
+    Parameters
+    ----------
+    pattern : :class:`graphix.pattern.Pattern`
+        pattern to simulate
+    noise_model : :class:`graphix.noise_models.noise_model.NoiseModel`
+        noise model
+    shots : int
+        number of trajectories
+    func : callable
+        real quantity computed on the output state of each trajectory, such as
+        the fidelity with a reference state or the expectation value of an observable.
+        With `max_workers > 1`, `func`, `pattern` and `noise_model` must be picklable.
+    seed : int or :class:`numpy.random.SeedSequence`, optional
+        seed of the trajectories. If not given, fresh entropy is used.
+    max_workers : int, optional
+        number of processes running the trajectories. With 1 (default), the
+        trajectories are run in the current process.
+    confidence : float, optional
+        confidence level of the interval, defaults to 0.95.
+    input_state : optional
+        input state of the pattern, defaults to :attr:`graphix.states.BasicStates.PLUS`.
+    kwargs :
+        keyword arguments of :class:`TrajectoryBackend`.
+
+    Returns
+    -------
+    :class:`TrajectoryEstimate` : mean of `func` over the trajectories, with its standard error and confidence interval.
+    """
+    if shots < 1:
+        raise ValueError("shots must be a positive integer.")
+    if max_workers < 1:
+        raise ValueError("max_workers must be a positive integer.")
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1.")
+    seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    seeds = seed_seq.spawn(shots)
+    # the buffer reserved by each worker is sized after the peak number of qubits, computed once
+    kwargs.setdefault("max_space", pattern.max_space())
+    if max_workers == 1:
+        values = _run_trajectories(pattern, noise_model, func, seeds, input_state, kwargs)
+    else:
+        batches = [seeds[i::max_workers] for i in range(max_workers)]
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_run_trajectories, pattern, noise_model, func, batch, input_state, kwargs)
+                for batch in batches
+            ]
+            results = [future.result() for future in futures]
+        # trajectory `i` is the `i // max_workers`-th of batch `i % max_workers`
+        values = [results[i % max_workers][i // max_workers] for i in range(shots)]
+    values = np.asarray(values, dtype=np.float64)
+    mean = float(np.mean(values))
+    std_error = float(np.std(values, ddof=1) / np.sqrt(shots)) if shots > 1 else 0.0
+    half_width = statistics.NormalDist().inv_cdf((1 + confidence) / 2) * std_error
+    return TrajectoryEstimate(mean, std_error, (mean - half_width, mean + half_width), values)
+
+
+def _run_trajectories(
+    pattern: Pattern,
+    noise_model: NoiseModel,
+    func: Callable[[Statevec], float],
+    seeds: list[np.random.SeedSequence],
+    input_state: Data,
+    kwargs: dict,
+) -> list[float]:
+    """Run a trajectory for each seed and return the values of `func` on the output states.
+
+    The trajectories share a single backend, and therefore a single buffer for the state.
+    """
+    # imported here: `graphix.simulator` depends on this module
+    from graphix.simulator import PatternSimulator
+
+    backend = TrajectoryBackend(**kwargs)
+    values = []
+    for seed in seeds:
+        backend.reset(np.random.default_rng(seed))
+        sim = PatternSimulator(pattern, backend, noise_model=noise_model)
+        sim.run(input_state)
+        values.append(func(backend.state))
+    return values
@@ -7,6 +7,7 @@ Simulates MBQC by executing the pattern.
 from __future__ import annotations
 
 import abc
+import itertools
 import warnings
 from typing import TYPE_CHECKING
 
@@ -15,13 +16,26 @@ import numpy as np
 from graphix.clifford import Clifford
 from graphix.command import BaseM, CommandKind, M, MeasureUpdate
 from graphix.measurements import Measurement
+from graphix.parameter import AffineExpression, Expression
 from graphix.sim.base_backend import Backend
+from graphix.sim.batched_statevec import BatchedStatevectorBackend
 from graphix.sim.density_matrix import DensityMatrixBackend
-from graphix.sim.statevec import StatevectorBackend
+from graphix.sim.mps import MPSBackend
+from graphix.sim.sparse_statevec import SparseStatevectorBackend
+from graphix.sim.statevec import FactorizedStatevectorBackend, StatevectorBackend
 from graphix.sim.tensornet import TensorNetworkBackend
+from graphix.sim.trajectory import TrajectoryBackend
 from graphix.states import BasicStates
 
 if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    import numpy.typing as npt
+    from numpy.random import Generator
+
+    from graphix.channels import KrausChannel
+    from graphix.noise_models.noise_model import NoiseModel
+    from graphix.parameter import ExpressionOrFloat, Parameter
     from graphix.pattern import Pattern
 
 
@@ -85,6 +99,110 @@ class DefaultMeasureMethod(MeasureMethod):
         self.results[node] = result
 
 
+class BatchedMeasureMethod(DefaultMeasureMethod):
+    """Measurement method for :class:`graphix.sim.batched_statevec.BatchedStatevectorBackend`.
+
+    Measurement results are boolean arrays with one value per member of the batch,
+    and so are the signals and the measurement angles computed from them.
+    """
+
+    def __init__(self, results=None, parameters: Mapping[Parameter, npt.NDArray[np.float64]] | None = None):
+        super().__init__(results)
+        if parameters is None:
+            parameters = {}
+        self.parameters = parameters
+
+    def get_measurement_description(self, cmd: BaseM) -> Measurement:
+        """Return the description of the measurement, with one angle per member of the batch."""
+        assert isinstance(cmd, M)
+        angle = self.evaluate_angle(cmd.angle) * np.pi
+        s_signal = np.asarray(sum(self.results[j] for j in cmd.s_domain)) % 2 == 1
+        t_signal = np.asarray(sum(self.results[j] for j in cmd.t_domain)) % 2 == 1
+        new_angle = np.empty(np.broadcast_shapes(np.shape(angle), s_signal.shape, t_signal.shape))
+        for s, t in itertools.product((False, True), repeat=2):
+            measure_update = MeasureUpdate.compute(cmd.plane, s, t, Clifford.I)
+            # Pauli byproducts preserve the measurement plane: only the angle depends on the signals.
+            assert measure_update.new_plane == cmd.plane
+            where = (s_signal == s) & (t_signal == t)
+            np.copyto(new_angle, angle * measure_update.coeff + measure_update.add_term, where=where)
+        return Measurement(new_angle, cmd.plane)
+
+    def evaluate_angle(self, angle: ExpressionOrFloat) -> float | npt.NDArray[np.float64]:
+        """Return the value of a measurement angle for each member of the batch."""
+        if not isinstance(angle, Expression):
+            return angle
+        if isinstance(angle, AffineExpression) and angle.x in self.parameters:
+            return angle.a * self.parameters[angle.x] + angle.b
+        raise ValueError(f"Measurement angle {angle} cannot be evaluated with the given parameters.")
+
+
+class CompiledMeasureMethod(DefaultMeasureMethod):
+    """Measurement method for parameterized patterns compiled with :meth:`graphix.pattern.Pattern.compile`.
+
+    The measurement angles are given numerically, and the updates of the
+    measurements by the signals are precomputed for each node.
+    """
+
+    def __init__(
+        self,
+        angles: Mapping[int, float],
+        updates: Mapping[int, tuple[MeasureUpdate, MeasureUpdate, MeasureUpdate, MeasureUpdate]],
+        results=None,
+    ):
+        """Construct a measurement method with precomputed angles.
+
+        Parameters
+        ----------
+        angles : mapping from int to float
+            measurement angle of each node, in radian.
+        updates : mapping from int to tuple of :class:`graphix.command.MeasureUpdate`
+            updates of the measurement of each node for the signals `(s, t)`
+            equal to `(0, 0)`, `(0, 1)`, `(1, 0)` and `(1, 1)`.
+        results : dict, optional
+            results of the measurements already performed.
+        """
+        super().__init__(results)
+        self.angles = angles
+        self.updates = updates
+
+    def get_measurement_description(self, cmd: BaseM) -> Measurement:
+        """Return the description of the measurement, from the precomputed angle and updates."""
+        s_signal = sum(self.results[j] for j in cmd.s_domain) % 2
+        t_signal = sum(self.results[j] for j in cmd.t_domain) % 2
+        measure_update = self.updates[cmd.node][2 * s_signal + t_signal]
+        angle = self.angles[cmd.node] * measure_update.coeff + measure_update.add_term
+        return Measurement(angle, measure_update.new_plane)
+
+
+class _NoiseChannelCache:
+    """Channels returned by the methods of a noise model, reused until the next clock tick.
+
+    Building a :class:`graphix.channels.KrausChannel` validates its operators, and
+    the backends cache the products they compute on it (such as
+    :attr:`graphix.channels.KrausChannel.superoperator`): reusing the channel
+    saves both for every command after the first one of each kind.
+    See :attr:`graphix.noise_models.noise_model.NoiseModel.cache_channels`.
+    """
+
+    def __init__(self, noise_model: NoiseModel) -> None:
+        self.__noise_model = noise_model
+        self.__channels: dict[str, KrausChannel] = {}
+
+    def get(self, method: str) -> KrausChannel:
+        """Return the channel returned by the given method of the noise model, calling it only if needed."""
+        channel = self.__channels.get(method)
+        if channel is None:
+            channel = getattr(self.__noise_model, method)()
+            if self.__noise_model.cache_channels:
+                self.__channels[method] = channel
+        return channel
+
+    def tick_clock(self) -> None:
+        """Advance the clock of the noise model and forget the channels."""
+        self.__noise_model.tick_clock()
+        self.__channels.clear()
+
+
 class PatternSimulator:
     """MBQC simulator.
 
@@ -102,21 +220,36 @@ class PatternSimulator:
         pattern: :class:`graphix.pattern.Pattern` object
             MBQC pattern to be simulated.
         backend: :class:`graphix.sim.backend.Backend` object,
-            or 'statevector', or 'densitymatrix', or 'tensornetwork'
+            or 'statevector', or 'densitymatrix', or 'tensornetwork', or 'mps', or 'batched', or 'sparse', or 'trajectory'
             simulation backend (optional), default is 'statevector'.
         noise_model:
         kwargs: keyword args for specified backend.
+            With 'statevector', `factorize=True` selects
+            :class:`graphix.sim.statevec.FactorizedStatevectorBackend`.
+            With 'statevector', `storage="mmap"` (and optionally `path=...`)
+            stores the state in a memory-mapped file.
 
         .. seealso:: :class:`graphix.sim.statevec.StatevectorBackend`\
             :class:`graphix.sim.tensornet.TensorNetworkBackend`\
+            :class:`graphix.sim.mps.MPSBackend`\
             :class:`graphix.sim.density_matrix.DensityMatrixBackend`\
+            :class:`graphix.sim.batched_statevec.BatchedStatevectorBackend`\
+            :class:`graphix.sim.sparse_statevec.SparseStatevectorBackend`\
+            :class:`graphix.sim.trajectory.TrajectoryBackend`\
         """
         if isinstance(backend, Backend):
             assert kwargs == {}
             self.backend = backend
         elif backend == "statevector":
-            self.backend = StatevectorBackend(**kwargs)
+            if kwargs.pop("factorize", False):
+                # the blocks grow as needed: no buffer is reserved for the peak number of qubits
+                self.backend = FactorizedStatevectorBackend(**kwargs)
+            else:
+                # the buffer reserved for the state is sized after the peak number of qubits
+                kwargs.setdefault("max_space", pattern.max_space())
+                self.backend = StatevectorBackend(**kwargs)
         elif backend == "densitymatrix":
+            kwargs.setdefault("max_space", pattern.max_space())
             if noise_model is None:
                 self.noise_model = None
                 self.backend = DensityMatrixBackend(**kwargs)
@@ -127,7 +260,16 @@ class PatternSimulator:
             else:
                 self.backend = DensityMatrixBackend(pr_calc=True, **kwargs)
                 self.set_noise_model(noise_model)
-        elif backend in {"tensornetwork", "mps"} and noise_model is None:
+        elif backend == "batched":
+            self.backend = BatchedStatevectorBackend(**kwargs)
+        elif backend == "sparse":
+            self.backend = SparseStatevectorBackend(**kwargs)
+        elif backend == "trajectory":
+            kwargs.setdefault("max_space", pattern.max_space())
+            self.backend = TrajectoryBackend(**kwargs)
+        elif backend == "mps":
+            self.backend = MPSBackend(**kwargs)
+        elif backend == "tensornetwork" and noise_model is None:
             self.noise_model = None
             self.backend = TensorNetworkBackend(pattern, **kwargs)
         else:
@@ -135,7 +277,10 @@ class PatternSimulator:
         self.set_noise_model(noise_model)
         self.__pattern = pattern
         if measure_method is None:
-            measure_method = DefaultMeasureMethod(pattern.results)
+            if isinstance(self.backend, BatchedStatevectorBackend):
+                measure_method = BatchedMeasureMethod(pattern.results, self.backend.parameters)
+            else:
+                measure_method = DefaultMeasureMethod(pattern.results)
         self.__measure_method = measure_method
 
     @property
@@ -148,9 +293,38 @@ class PatternSimulator:
         """Return the measure method."""
         return self.__measure_method
 
+    def sample(self, shots: int, rng: Generator | None = None) -> npt.NDArray[np.uint8]:
+        """Sample the output qubits of the final state in the computational basis.
+
+        All the samples are drawn from the state obtained by a single call to :meth:`run`,
+        which should be performed first. The state vector backends are supported, except
+        :class:`graphix.sim.trajectory.TrajectoryBackend`, whose state is a single trajectory.
+
+        Parameters
+        ----------
+        shots : int
+            number of samples
+        rng : :class:`np.random.Generator`, optional
+            random number generator used to draw the samples, defaults to the one of the backend.
+
+        Returns
+        -------
+        numpy.ndarray : array of shape `(shots, len(output_nodes))` and dtype `uint8`,
+            where row `s` holds the outcomes of sample `s`, in the order of the output nodes
+            of the pattern (see :meth:`graphix.sim.statevec.Statevec.sample`).
+        """
+        if isinstance(self.backend, TrajectoryBackend):
+            raise ValueError(
+                "The state of the trajectory backend is a single trajectory, not the noisy output state: "
+                "use `graphix.sim.trajectory.simulate_trajectories` to estimate quantities over trajectories."
+            )
+        if not isinstance(self.backend, StatevectorBackend):
+            raise ValueError(f"The backend {self.backend} doesn't support sampling.")
+        return self.backend.state.sample(shots, rng=self.backend.rng if rng is None else rng)
+
     def set_noise_model(self, model):
         """Set a noise model."""
-        if not isinstance(self.backend, DensityMatrixBackend) and model is not None:
+        if not isinstance(self.backend, (DensityMatrixBackend, TrajectoryBackend)) and model is not None:
             self.noise_model = None  # if not initialized yet
             raise ValueError(f"The backend {self.backend} doesn't support noise but noisemodel was provided.")
         self.noise_model = model
@@ -167,49 +341,53 @@ class PatternSimulator:
         if input_state is not None:
             self.backend.add_nodes(self.pattern.input_nodes, input_state)
         if self.noise_model is None:
-            for cmd in self.pattern:
-                if cmd.kind == CommandKind.N:
-                    self.backend.add_nodes(nodes=[cmd.node], data=cmd.state)
-                elif cmd.kind == CommandKind.E:
-                    self.backend.entangle_nodes(edge=cmd.nodes)
-                elif cmd.kind == CommandKind.M:
-                    self.__measure_method.measure(self.backend, cmd)
-                elif cmd.kind in {CommandKind.X, CommandKind.Z}:
-                    self.backend.correct_byproduct(cmd, self.__measure_method)
-                elif cmd.kind == CommandKind.C:
-                    self.backend.apply_clifford(cmd.node, cmd.clifford)
-                else:
-                    raise ValueError("invalid commands")
+            # consecutive E commands commute and are given to the backend at once
+            for is_entangle, cmds in itertools.groupby(self.pattern, key=lambda cmd: cmd.kind == CommandKind.E):
+                if is_entangle:
+                    self.backend.entangle_edges(cmd.nodes for cmd in cmds)
+                    continue
+                for cmd in cmds:
+                    if cmd.kind == CommandKind.N:
+                        self.backend.add_nodes(nodes=[cmd.node], data=cmd.state)
+                    elif cmd.kind == CommandKind.M:
+                        self.__measure_method.measure(self.backend, cmd)
+                    elif cmd.kind in {CommandKind.X, CommandKind.Z}:
+                        self.backend.correct_byproduct(cmd, self.__measure_method)
+                    elif cmd.kind == CommandKind.C:
+                        self.backend.apply_clifford(cmd.node, cmd.clifford)
+                    else:
+                        raise ValueError("invalid commands")
             self.backend.finalize(output_nodes=self.pattern.output_nodes)
         else:
             self.noise_model.assign_simulator(self)
+            channels = _NoiseChannelCache(self.noise_model)
             for node in self.pattern.input_nodes:
-                self.backend.apply_channel(self.noise_model.prepare_qubit(), [node])
+                self.backend.apply_channel(channels.get("prepare_qubit"), [node])
             for cmd in self.pattern:
                 if cmd.kind == CommandKind.N:
                     self.backend.add_nodes([cmd.node])
-                    self.backend.apply_channel(self.noise_model.prepare_qubit(), [cmd.node])
+                    self.backend.apply_channel(channels.get("prepare_qubit"), [cmd.node])
                 elif cmd.kind == CommandKind.E:
                     self.backend.entangle_nodes(cmd.nodes)
-                    self.backend.apply_channel(self.noise_model.entangle(), cmd.nodes)
+                    self.backend.apply_channel(channels.get("entangle"), cmd.nodes)
                 elif cmd.kind == CommandKind.M:
-                    self.backend.apply_channel(self.noise_model.measure(), [cmd.node])
+                    self.backend.apply_channel(channels.get("measure"), [cmd.node])
                     self.__measure_method.measure(self.backend, cmd, noise_model=self.noise_model)
                 elif cmd.kind == CommandKind.X:
                     self.backend.correct_byproduct(cmd, self.__measure_method)
                     if np.mod(sum([self.__measure_method.results[j] for j in cmd.domain]), 2) == 1:
-                        self.backend.apply_channel(self.noise_model.byproduct_x(), [cmd.node])
+                        self.backend.apply_channel(channels.get("byproduct_x"), [cmd.node])
                 elif cmd.kind == CommandKind.Z:
                     self.backend.correct_byproduct(cmd, self.__measure_method)
                     if np.mod(sum([self.__measure_method.results[j] for j in cmd.domain]), 2) == 1:
-                        self.backend.apply_channel(self.noise_model.byproduct_z(), [cmd.node])
+                        self.backend.apply_channel(channels.get("byproduct_z"), [cmd.node])
                 elif cmd.kind == CommandKind.C:
                     self.backend.apply_clifford(cmd.node, cmd.clifford)
-                    self.backend.apply_channel(self.noise_model.clifford(), [cmd.node])
+                    self.backend.apply_channel(channels.get("clifford"), [cmd.node])
                 elif cmd.kind == CommandKind.T:
                     # T command is a flag for one clock cycle in simulated experiment,
                     # to be added via hardware-agnostic pattern modifier
-                    self.noise_model.tick_clock()
+                    channels.tick_clock()
                 else:
                     raise ValueError("Invalid commands.")
             self.backend.finalize(self.pattern.output_nodes)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from graphix.fundamentals import Plane
+from graphix.ops import Ops
+from graphix.parameter import Placeholder
+from graphix.random_objects import rand_circuit
+from graphix.sim.base_backend import _op_mat_from_result
+from graphix.sim.batched_statevec import BatchedStatevec, BatchedStatevectorBackend
+from graphix.sim.statevec import Statevec
+from graphix.simulator import PatternSimulator
+from graphix.transpiler import Circuit
+
+if TYPE_CHECKING:
+    from numpy.random import Generator
+
+
+def random_batch(fx_rng: Generator, batch_size: int, nqubit: int) -> BatchedStatevec:
+    batch = BatchedStatevec(batch_size, nqubit=nqubit)
+    psi = fx_rng.random((batch_size, 2**nqubit)) + 1j * fx_rng.random((batch_size, 2**nqubit))
+    psi /= np.linalg.norm(psi, axis=1, keepdims=True)
+    batch.psi = psi.reshape((batch_size,) + (2,) * nqubit)
+    return batch
+
+
+class TestBatchedStatevec:
+    def test_evolve_single_mask(self, fx_rng: Generator) -> None:
+        batch = random_batch(fx_rng, 4, 3)
+        mask = np.array([True, False, False, True])
+        op = fx_rng.random((2, 2)) + 1j * fx_rng.random((2, 2))
+        expected = [batch[b] for b in range(4)]
+        batch.evolve_single(op, 1, mask=mask)
+        for b in range(4):
+            if mask[b]:
+                expected[b].evolve_single(op, 1)
+            assert np.allclose(batch[b].psi, expected[b].psi)
+
+    def test_entangle_edges(self, fx_rng: Generator) -> None:
+        batch = random_batch(fx_rng, 3, 4)
+        expected = [batch[b] for b in range(3)]
+        edges = [(0, 1), (1, 2), (2, 3), (0, 3)]
+        batch.entangle_edges(edges)
+        for b in range(3):
+            expected[b].entangle_edges(edges)
+            assert np.allclose(batch[b].psi, expected[b].psi)
+
+    def test_evolve_single_after_permute(self, fx_rng: Generator) -> None:
+        batch = random_batch(fx_rng, 3, 3)
+        expected = [batch[b] for b in range(3)]
+        op = fx_rng.random((2, 2)) + 1j * fx_rng.random((2, 2))
+        batch.permute([2, 0, 1])
+        for qubit in range(3):
+            batch.evolve_single(op, qubit)
+        for b in range(3):
+            expected[b].permute([2, 0, 1])
+            for qubit in range(3):
+                expected[b].evolve_single(op, qubit)
+            assert np.allclose(batch[b].psi, expected[b].psi)
+
+    @pytest.mark.parametrize("plane", list(Plane))
+    def test_measure_and_remove(self, fx_rng: Generator, plane: Plane) -> None:
+        batch_size = 8
+        batch = random_batch(fx_rng, batch_size, 3)
+        states = [batch[b] for b in range(batch_size)]
+        angles = fx_rng.random(batch_size) * 2 * np.pi
+        result = batch.measure_and_remove(1, plane, angles, rng=fx_rng)
+        assert result.shape == (batch_size,)
+        for b, state in enumerate(states):
+            state.evolve_single(_op_mat_from_result(plane.polar(angles[b]), result[b]), 1)
+            state.remove_qubit(1)
+            assert np.abs(np.vdot(batch[b].psi, state.psi)) == pytest.approx(1)
+
+
+class TestBatchedStatevectorBackend:
+    def test_pattern(self, fx_rng: Generator) -> None:
+        circuit = rand_circuit(3, 3, fx_rng)
+        pattern = circuit.transpile().pattern
+        pattern.standardize()
+        pattern.minimize_space()
+        state_ref = circuit.simulate_statevector().statevec
+        batch_size = 16
+        sim = PatternSimulator(pattern, "batched", batch_size=batch_size, rng=fx_rng)
+        sim.run()
+        results = [sim.measure_method.get_measure_result(node) for node in pattern.results]
+        # outcomes are drawn independently for each member
+        assert any(len(set(result)) == 2 for result in results)
+        for b in range(batch_size):
+            assert np.abs(np.vdot(sim.backend.state[b].flatten(), state_ref.flatten())) == pytest.approx(1)
+
+    def test_parameters(self, fx_rng: Generator) -> None:
+        alpha = Placeholder("alpha")
+        circuit = rand_circuit(2, 2, fx_rng, parameters=[alpha])
+        pattern = circuit.transpile().pattern
+        assert pattern.is_parameterized()
+        values = fx_rng.uniform(high=2, size=5)
+        sim = PatternSimulator(pattern, "batched", batch_size=len(values), parameters={alpha: values}, rng=fx_rng)
+        sim.run()
+        for b, value in enumerate(values):
+            state_ref = circuit.subs(alpha, value).simulate_statevector().statevec
+            assert np.abs(np.vdot(sim.backend.state[b].flatten(), state_ref.flatten())) == pytest.approx(1)
+
+    def test_unbound_parameter(self) -> None:
+        alpha = Placeholder("alpha")
+        circuit = Circuit(1)
+        circuit.rx(0, alpha)
+        pattern = circuit.transpile().pattern
+        with pytest.raises(ValueError):
+            pattern.simulate_pattern("batched", batch_size=2)
+
+    def test_clifford(self) -> None:
+        backend = BatchedStatevectorBackend(batch_size=2)
+        backend.add_nodes([0])
+        backend.apply_single(0, Ops.H)
+        assert np.allclose(backend.state[1].psi, Statevec(data=[1, 0]).psi)
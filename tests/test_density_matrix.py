@@ -10,9 +10,16 @@ import numpy.typing as npt
 import pytest
 
 import graphix.random_objects as randobj
-from graphix.channels import KrausChannel, dephasing_channel, depolarising_channel
+from graphix.channels import (
+    KrausChannel,
+    KrausData,
+    dephasing_channel,
+    depolarising_channel,
+    two_qubit_depolarising_tensor_channel,
+)
 from graphix.fundamentals import Plane
 from graphix.ops import Ops
+from graphix.sim.base_backend import perform_measure
 from graphix.sim.density_matrix import DensityMatrix, DensityMatrixBackend
 from graphix.sim.statevec import CNOT_TENSOR, CZ_TENSOR, SWAP_TENSOR, Statevec, StatevectorBackend
 from graphix.simulator import DefaultMeasureMethod
@@ -335,6 +342,14 @@ class TestDensityMatrix:
         with pytest.raises(ValueError):
             dm.swap((2, 1))
 
+    def test_permute(self, fx_rng: Generator) -> None:
+        psi = _randstate_raw(3, fx_rng)
+        psi /= np.sqrt(np.sum(np.abs(psi) ** 2))
+        dm = DensityMatrix(data=np.outer(psi, psi.conj()))
+        dm.permute([2, 0, 1])
+        psi = np.transpose(psi.reshape((2, 2, 2)), (2, 0, 1)).flatten()
+        assert np.allclose(dm.rho, np.outer(psi, psi.conj()))
+
     def test_swap_success(self, fx_rng: Generator) -> None:
         dm = DensityMatrix(nqubit=2)
         dm_swap = copy.copy(dm)
@@ -365,6 +380,20 @@ class TestDensityMatrix:
         with pytest.raises(ValueError):
             dm.entangle((0, 1, 2))
 
+    def test_copy_independent(self, fx_rng: Generator) -> None:
+        dm = DensityMatrix(nqubit=2)
+        dm.reserve(3)
+        dm_copy = copy.copy(dm)
+        rho = dm.rho.copy()
+        dm_copy.evolve_single(fx_rng.random((2, 2)), 1)
+        dm_copy.entangle((0, 1))
+        dm_copy.add_nodes(1, BasicStates.ZERO)
+        assert np.array_equal(dm.rho, rho)
+        rho_copy = dm_copy.rho.copy()
+        dm.evolve_single(Ops.H, 0)
+        dm.add_nodes(1, BasicStates.ONE)
+        assert np.array_equal(dm_copy.rho, rho_copy)
+
     def test_entangle_success(self, fx_rng: Generator) -> None:
         dm = DensityMatrix(nqubit=2)
         dm_entangle = copy.copy(dm)
@@ -513,6 +542,46 @@ class TestDensityMatrix:
         dm.normalize()
         assert np.allclose(np.trace(dm.rho), 1)
 
+    def test_reserve(self, fx_rng: Generator) -> None:
+        dm = DensityMatrix(nqubit=0)
+        ref = DensityMatrix(nqubit=0)
+        dm.reserve(4)
+        buffer = dm.rho.base
+        states = [BasicStates.PLUS, BasicStates.ZERO, PlanarState(Plane.XY, 0.3)]
+        for nqb in range(1, 4):
+            data = states[nqb % len(states)]
+            dm.add_nodes(1, data)
+            ref.add_nodes(1, data)
+            assert np.allclose(dm.rho, ref.rho)
+            assert dm.rho.base is buffer
+        # a mixed state tensored in place with a mixed state
+        mixed = randobj.rand_dm(2, fx_rng)
+        dm.tensor(mixed)
+        ref.rho = np.kron(ref.rho, mixed.rho)
+        assert np.allclose(dm.rho, ref.rho)
+        op = randobj.rand_unit(2, fx_rng)
+        for state in (dm, ref):
+            state.evolve_single(op, 2)
+            state.entangle((3, 0))
+            state.remove_qubit(1)
+        assert np.allclose(dm.rho, ref.rho)
+        assert dm.rho.base is buffer
+        # the density matrix does not fit in the buffer anymore
+        dm.add_nodes(2, BasicStates.PLUS)
+        ref.add_nodes(2, BasicStates.PLUS)
+        assert np.allclose(dm.rho, ref.rho)
+        assert dm.rho.base is not buffer
+
+    def test_evolve_single_inplace(self, fx_rng: Generator) -> None:
+        dm = randobj.rand_dm(2**3, fx_rng)
+        rho = dm.rho
+        op = randobj.rand_unit(2, fx_rng)
+        expected = np.kron(np.kron(np.eye(2), op), np.eye(2))
+        expected = expected @ rho @ expected.conj().T
+        dm.evolve_single(op, 1)
+        assert dm.rho is rho
+        assert np.allclose(dm.rho, expected)
+
     def test_ptrace_fail(self) -> None:
         dm = DensityMatrix(nqubit=0)
         with pytest.raises(AssertionError):
@@ -558,6 +627,30 @@ class TestDensityMatrix:
         )
         assert np.allclose(dm.rho, expected_matrix)
 
+    def test_ptrace_mixed(self, fx_rng: Generator) -> None:
+        # tracing out qubits 1 and 3 of 4 against the explicit sum over their values
+        rho = randobj.rand_dm(2**4, fx_rng, dm_dtype=False)
+        rho_tensor = rho.reshape((2,) * 8)
+        expected = sum(rho_tensor[:, a, :, b, :, a, :, b] for a in range(2) for b in range(2)).reshape(4, 4)
+        dm = DensityMatrix(data=rho)
+        dm.ptrace([3, 1])
+        assert np.allclose(dm.rho, expected)
+        dm = DensityMatrix(data=rho)
+        assert np.allclose(dm.reduced_density_single(2), np.einsum("abcdabed->ce", rho_tensor))
+
+    @pytest.mark.parametrize("plane", list(Plane))
+    def test_measure_and_remove(self, fx_rng: Generator, plane: Plane) -> None:
+        rho = randobj.rand_dm(2**3, fx_rng, dm_dtype=False)
+        angle = fx_rng.uniform(0, 2 * np.pi)
+        for seed in range(4):
+            dm = DensityMatrix(data=rho)
+            dm_ref = DensityMatrix(data=rho)
+            result = dm.measure_and_remove(1, plane, angle, rng=np.random.default_rng(seed))
+            result_ref = perform_measure(1, plane, angle, dm_ref, rng=np.random.default_rng(seed))
+            dm_ref.remove_qubit(1)
+            assert result == result_ref
+            assert np.allclose(dm.rho, dm_ref.rho)
+
     def test_apply_dephasing_channel(self, fx_rng: Generator) -> None:
         # check on single qubit first
         # # create random density matrix
@@ -565,7 +658,7 @@ class TestDensityMatrix:
         dm = randobj.rand_dm(2, fx_rng)
 
         # copy of initial dm
-        rho_test = dm.rho
+        rho_test = dm.rho.copy()
 
         # create dephasing channel
         prob = fx_rng.uniform()
@@ -643,7 +736,7 @@ class TestDensityMatrix:
         dm = randobj.rand_dm(2, fx_rng)
 
         # copy of initial dm
-        rho_test = dm.rho
+        rho_test = dm.rho.copy()
 
         # create dephasing channel
         prob = fx_rng.uniform()
@@ -833,6 +926,47 @@ class TestDensityMatrix:
         with pytest.raises(TypeError):
             dm.apply_channel("a", [i])
 
+    def test_apply_channel_not_trace_preserving(self, fx_rng: Generator) -> None:
+        dm = randobj.rand_dm(2**2, fx_rng)
+        rho = dm.rho.copy()
+        channel = dephasing_channel(0.3)
+        # bypass the validation of the Kraus operators
+        channel.__dict__["superoperator"] = 2 * channel.superoperator
+        with pytest.raises(ValueError):
+            dm.apply_channel(channel, [1])
+        # the density matrix is left untouched
+        assert np.array_equal(dm.rho, rho)
+
+    @pytest.mark.parametrize(
+        "channel",
+        [
+            dephasing_channel(0.3),
+            two_qubit_depolarising_tensor_channel(0.2),
+            randobj.rand_pauli_channel_kraus(4, np.random.default_rng(0)),
+            randobj.rand_channel_kraus(4, np.random.default_rng(0)),
+            KrausChannel(
+                [
+                    KrausData(1, np.array([[1, 0], [0, np.sqrt(0.7)]])),
+                    KrausData(np.sqrt(0.3), np.array([[0, 1], [0, 0]])),
+                ]
+            ),
+        ],
+    )
+    def test_apply_channel_non_adjacent(self, fx_rng: Generator, channel: KrausChannel) -> None:
+        dm = randobj.rand_dm(2**4, fx_rng)
+        rho = dm.rho.copy()
+        qargs = [3, 1][: channel.nqubit]
+        expected = np.zeros_like(rho)
+        for data in channel:
+            dm_op = DensityMatrix(data=rho)
+            dm_op.evolve(data.operator, qargs)
+            expected += abs(data.coef) ** 2 * dm_op.rho
+        dm_input = dm.rho
+        dm.apply_channel(channel, qargs)
+        assert np.allclose(dm.rho, expected)
+        # the matrix is updated in place
+        assert np.shares_memory(dm.rho, dm_input)
+
 
 class TestDensityMatrixBackend:
     """Test for DensityMatrixBackend class."""
@@ -960,3 +1094,11 @@ class TestDensityMatrixBackend:
         psi = backend.state.psi
 
         assert np.allclose(rho, np.outer(psi, psi.conj()))
+
+    def test_single_precision(self, fx_rng: Generator) -> None:
+        circuit = randobj.rand_circuit(3, 2, fx_rng)
+        pattern = circuit.transpile().pattern
+        state_ref = circuit.simulate_statevector().statevec
+        rho = pattern.simulate_pattern("densitymatrix", dtype=np.complex64, rng=fx_rng).rho
+        assert rho.dtype == np.complex64
+        assert np.abs(state_ref.flatten().conj() @ rho @ state_ref.flatten()) == pytest.approx(1, abs=1e-5)
@@ -180,3 +180,23 @@ class TestChannel:
         for i in range(len(depol_tensor_channel_2_qubit)):
             assert np.allclose(depol_tensor_channel_2_qubit[i].coef, data[i].coef)
             assert np.allclose(depol_tensor_channel_2_qubit[i].operator, data[i].operator)
+
+    def test_superoperator(self, fx_rng: Generator) -> None:
+        channel = two_qubit_depolarising_tensor_channel(fx_rng.uniform())
+        rho = randobj.rand_dm(4, fx_rng, dm_dtype=False)
+        assert isinstance(rho, np.ndarray)
+        expected = np.zeros((4, 4), dtype=np.complex128)
+        for i in range(len(channel)):
+            data = channel[i]
+            expected += abs(data.coef) ** 2 * data.operator @ rho @ data.operator.conj().T
+        assert channel.superoperator.shape == (16, 16)
+        assert np.allclose(channel.superoperator @ rho.flatten(), expected.flatten())
+        assert channel.superoperator is channel.superoperator
+
+    def test_is_mixed_unitary(self) -> None:
+        assert depolarising_channel(0.2).is_mixed_unitary
+        assert two_qubit_depolarising_channel(0.2).is_mixed_unitary
+        damping = KrausChannel(
+            [KrausData(1.0, np.diag([1, np.sqrt(0.5)])), KrausData(np.sqrt(0.5), np.array([[0, 1], [0, 0]]))]
+        )
+        assert not damping.is_mixed_unitary
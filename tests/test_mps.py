@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from graphix.fundamentals import Plane
+from graphix.ops import Ops
+from graphix.random_objects import rand_circuit
+from graphix.sim.mps import MPS
+from graphix.sim.statevec import Statevec
+from graphix.simulator import PatternSimulator
+from graphix.states import BasicStates
+from graphix.transpiler import Circuit
+
+if TYPE_CHECKING:
+    from numpy.random import Generator
+
+
+def random_mps(fx_rng: Generator, nqubit: int) -> tuple[MPS, Statevec]:
+    psi = fx_rng.random(2**nqubit) + 1j * fx_rng.random(2**nqubit)
+    psi /= np.linalg.norm(psi)
+    return MPS(data=psi), Statevec(data=psi)
+
+
+class TestMPS:
+    def test_add_nodes(self, fx_rng: Generator) -> None:
+        vec, vec_ref = random_mps(fx_rng, 3)
+        assert vec.bond_dims == [2, 2]
+        assert np.allclose(vec.flatten(), vec_ref.flatten())
+        for state in (vec, vec_ref):
+            state.add_nodes(2, [BasicStates.ONE, BasicStates.PLUS])
+        assert vec.bond_dims == [2, 2, 1, 1]
+        assert np.allclose(vec.flatten(), vec_ref.flatten())
+
+    def test_evolve_single(self, fx_rng: Generator) -> None:
+        vec, vec_ref = random_mps(fx_rng, 4)
+        op = fx_rng.random((2, 2)) + 1j * fx_rng.random((2, 2))
+        for state in (vec, vec_ref):
+            state.evolve_single(op, 2)
+            state.evolve_single(Ops.H, 0)
+        assert np.allclose(vec.flatten(), vec_ref.flatten())
+
+    def test_entangle(self, fx_rng: Generator) -> None:
+        vec, vec_ref = random_mps(fx_rng, 5)
+        for state in (vec, vec_ref):
+            state.entangle((0, 1))
+            state.entangle((4, 1))
+            state.entangle((0, 4))
+        assert np.allclose(vec.flatten(), vec_ref.flatten())
+
+    def test_permute(self, fx_rng: Generator) -> None:
+        vec, vec_ref = random_mps(fx_rng, 4)
+        for state in (vec, vec_ref):
+            state.permute([2, 0, 3, 1])
+            state.swap((0, 3))
+        assert np.allclose(vec.flatten(), vec_ref.flatten())
+
+    @pytest.mark.parametrize("plane", list(Plane))
+    def test_measure_and_remove(self, fx_rng: Generator, plane: Plane) -> None:
+        vec, vec_ref = random_mps(fx_rng, 4)
+        for qubit in (0, 2, 3):
+            vec_1 = MPS(data=vec.flatten())
+            vec_2 = Statevec(data=vec_ref)
+            result = vec_1.measure_and_remove(qubit, plane, 0.4, rng=np.random.default_rng(qubit))
+            result_ref = vec_2.measure_and_remove(qubit, plane, 0.4, rng=np.random.default_rng(qubit))
+            assert result == result_ref
+            assert vec_1.nqubit == 3
+            assert np.allclose(vec_1.flatten(), vec_2.flatten())
+
+    def test_remove_qubit(self) -> None:
+        vec = MPS(data=[BasicStates.PLUS, BasicStates.ONE, BasicStates.MINUS])
+        vec.remove_qubit(1)
+        assert np.abs(np.vdot(vec.flatten(), Statevec(data=[BasicStates.PLUS, BasicStates.MINUS]).flatten())) == (
+            pytest.approx(1)
+        )
+
+    def test_truncation(self, fx_rng: Generator) -> None:
+        vec, vec_ref = random_mps(fx_rng, 6)
+        vec.max_bond = 2
+        vec.entangle((0, 5))
+        vec_ref.entangle((0, 5))
+        assert max(vec.bond_dims) == 2
+        assert 0 < vec.discarded_weight < 1
+        # the truncated state is normalized, and its infidelity is bounded by the discarded weight
+        assert np.linalg.norm(vec.flatten()) == pytest.approx(1)
+        assert 1 - abs(np.vdot(vec.flatten(), vec_ref.flatten())) ** 2 <= vec.discarded_weight + 1e-12
+
+
+class TestMPSBackend:
+    def test_pattern(self, fx_rng: Generator) -> None:
+        circuit = rand_circuit(4, 3, fx_rng)
+        pattern = circuit.transpile().pattern
+        pattern.standardize()
+        state_ref = circuit.simulate_statevector().statevec
+        for minimize_space in (False, True):
+            if minimize_space:
+                pattern.minimize_space()
+            state = pattern.simulate_pattern("mps", rng=fx_rng)
+            assert np.abs(np.vdot(state.flatten(), state_ref.flatten())) == pytest.approx(1)
+
+    def test_long_chain(self, fx_rng: Generator) -> None:
+        circuit = Circuit(2)
+        for _ in range(60):
+            circuit.rz(0, fx_rng.random())
+            circuit.h(0)
+            circuit.rx(1, fx_rng.random())
+            circuit.cnot(0, 1)
+        pattern = circuit.transpile().pattern
+        pattern.standardize()
+        pattern.minimize_space()
+        assert pattern.n_node > 300
+        sim = PatternSimulator(pattern, "mps", rng=fx_rng)
+        sim.run()
+        state = sim.backend.state
+        assert state.nqubit == 2
+        assert sim.backend.discarded_weight < 1e-12
+        state_ref = circuit.simulate_statevector().statevec
+        assert np.abs(np.vdot(state.flatten(), state_ref.flatten())) == pytest.approx(1)
+
+    def test_max_bond(self, fx_rng: Generator) -> None:
+        circuit = rand_circuit(4, 3, fx_rng)
+        pattern = circuit.transpile().pattern
+        pattern.standardize()
+        pattern.minimize_space()
+        sim = PatternSimulator(pattern, "mps", rng=fx_rng, max_bond=1)
+        sim.run()
+        assert sim.backend.state.bond_dims == [1, 1, 1]
+        assert sim.backend.discarded_weight > 0
@@ -1,22 +1,22 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, ClassVar
 
 import numpy as np
 import numpy.typing as npt
 import pytest
 
+from graphix import command
 from graphix.channels import KrausChannel, KrausData, depolarising_channel, two_qubit_depolarising_channel
 from graphix.noise_models.noise_model import NoiseModel
 from graphix.noise_models.noiseless_noise_model import NoiselessNoiseModel
 from graphix.ops import Ops
+from graphix.pattern import Pattern
 from graphix.transpiler import Circuit
 
 if TYPE_CHECKING:
     from numpy.random import Generator
 
-    from graphix.pattern import Pattern
-
 
 class NoiseModelTester(NoiseModel):
     """Noise model for testing.
@@ -27,6 +27,8 @@ class NoiseModelTester(NoiseModel):
     :type NoiseModel: class
     """
 
+    cache_channels: ClassVar[bool] = True
+
     def __init__(
         self,
         prepare_error_prob: float = 0.0,
@@ -500,3 +502,22 @@ class TestNoisyDensityMatrixBackend:
             or np.allclose(res.rho, Ops.Z @ exact @ Ops.Z)
             or np.allclose(res.rho, Ops.Z @ Ops.X @ exact @ Ops.X @ Ops.Z)
         )
+
+    @pytest.mark.parametrize("cache_channels", [True, False])
+    def test_channel_cache(self, fx_rng: Generator, cache_channels: bool) -> None:
+        class CountingNoiseModel(NoiseModelTester):
+            def prepare_qubit(self) -> KrausChannel:
+                self.calls += 1
+                return super().prepare_qubit()
+
+        noise_model = CountingNoiseModel(prepare_error_prob=0.1)
+        noise_model.cache_channels = cache_channels
+        noise_model.calls = 0
+        pattern = Pattern(input_nodes=[0])
+        pattern.add(command.N(node=1))
+        pattern.add(command.T())
+        pattern.add(command.N(node=2))
+        pattern.add(command.N(node=3))
+        pattern.simulate_pattern(backend="densitymatrix", noise_model=noise_model, rng=fx_rng)
+        # with the cache, the channel is built once per clock cycle
+        assert noise_model.calls == (2 if cache_channels else 4)
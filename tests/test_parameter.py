@@ -171,6 +171,50 @@ def test_random_circuit_with_parameters(
     assert np.abs(np.dot(state_mbqc.flatten().conjugate(), state.flatten())) == pytest.approx(1)
 
 
+@pytest.mark.parametrize("backend", ["statevector", "densitymatrix"])
+def test_compile(fx_rng: Generator, backend: str) -> None:
+    alpha = Placeholder("alpha")
+    beta = Placeholder("beta")
+    circuit = rand_circuit(3, 3, fx_rng, parameters=[alpha, beta])
+    pattern = circuit.transpile().pattern
+    pattern.standardize()
+    pattern.shift_signals()
+    pattern.perform_pauli_measurements()
+    pattern.minimize_space()
+    assert pattern.is_parameterized()
+    simulate = pattern.compile([beta, alpha], backend=backend)
+    for _ in range(3):
+        values = fx_rng.uniform(high=2, size=2)
+        state = circuit.xreplace({beta: values[0], alpha: values[1]}).simulate_statevector().statevec
+        state_mbqc = simulate(values)
+        if backend == "statevector":
+            assert np.abs(np.vdot(state_mbqc.flatten(), state.flatten())) == pytest.approx(1)
+        else:
+            assert isinstance(state_mbqc, DensityMatrix)
+            assert np.allclose(state_mbqc.rho, DensityMatrix(state).rho)
+    # the pattern itself is left unchanged
+    assert pattern.is_parameterized()
+
+
+def test_compile_wrong_number_of_values() -> None:
+    pattern = Pattern(input_nodes=[0])
+    alpha = Placeholder("alpha")
+    pattern.add(graphix.command.M(node=0, angle=alpha))
+    simulate = pattern.compile([alpha])
+    simulate([0.5])
+    with pytest.raises(ValueError):
+        simulate([0.5, 1])
+
+
+def test_compile_missing_parameter() -> None:
+    pattern = Pattern(input_nodes=[0])
+    alpha = Placeholder("alpha")
+    pattern.add(graphix.command.M(node=0, angle=alpha))
+    simulate = pattern.compile([])
+    with pytest.raises(ValueError):
+        simulate([])
+
+
 def test_visualization() -> None:
     mpl.use("Agg")  # Use a non-interactive backend
     pattern = Pattern(input_nodes=[0, 1])
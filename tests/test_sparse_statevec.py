@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from graphix import command
+from graphix.fundamentals import Plane
+from graphix.ops import Ops
+from graphix.pattern import Pattern
+from graphix.random_objects import rand_circuit
+from graphix.sim.sparse_statevec import SparseStatevec
+from graphix.sim.statevec import Statevec
+from graphix.simulator import PatternSimulator
+from graphix.states import BasicStates
+
+if TYPE_CHECKING:
+    from numpy.random import Generator
+
+
+def random_sparse(fx_rng: Generator, nqubit: int, nonzero: int) -> tuple[SparseStatevec, Statevec]:
+    psi = np.zeros(2**nqubit, dtype=np.complex128)
+    indices = fx_rng.choice(2**nqubit, size=nonzero, replace=False)
+    psi[indices] = fx_rng.random(nonzero) + 1j * fx_rng.random(nonzero)
+    psi /= np.linalg.norm(psi)
+    return SparseStatevec(data=psi), Statevec(data=psi)
+
+
+class TestSparseStatevec:
+    def test_add_nodes(self) -> None:
+        vec = SparseStatevec(nqubit=3, data=BasicStates.ZERO)
+        assert vec.nqubit == 3
+        assert np.array_equal(vec.indices, [0])
+        vec.add_nodes(2, [BasicStates.ONE, BasicStates.PLUS])
+        assert np.array_equal(vec.indices, [2, 3])
+        assert np.allclose(
+            vec.flatten(), Statevec(data=[BasicStates.ZERO] * 3 + [BasicStates.ONE, BasicStates.PLUS]).flatten()
+        )
+
+    def test_evolve_single(self, fx_rng: Generator) -> None:
+        vec, vec_ref = random_sparse(fx_rng, 5, 4)
+        op = fx_rng.random((2, 2)) + 1j * fx_rng.random((2, 2))
+        for state in (vec, vec_ref):
+            state.evolve_single(op, 2)
+            state.evolve_single(Ops.X, 4)
+        assert np.all(np.diff(vec.indices) > 0)
+        assert np.allclose(vec.flatten(), vec_ref.flatten())
+
+    def test_entangle_edges(self, fx_rng: Generator) -> None:
+        vec, vec_ref = random_sparse(fx_rng, 5, 10)
+        edges = [(0, 1), (1, 2), (2, 4), (0, 4), (3, 4)]
+        for state in (vec, vec_ref):
+            state.entangle_edges(edges)
+            state.entangle((0, 3))
+        assert np.allclose(vec.flatten(), vec_ref.flatten())
+
+    def test_permute(self, fx_rng: Generator) -> None:
+        vec, vec_ref = random_sparse(fx_rng, 4, 5)
+        for state in (vec, vec_ref):
+            state.permute([2, 0, 3, 1])
+            state.swap((0, 3))
+        assert np.all(np.diff(vec.indices) > 0)
+        assert np.allclose(vec.flatten(), vec_ref.flatten())
+
+    @pytest.mark.parametrize("plane", list(Plane))
+    def test_measure_and_remove(self, fx_rng: Generator, plane: Plane) -> None:
+        vec, vec_ref = random_sparse(fx_rng, 4, 6)
+        for seed in range(4):
+            vec_1 = SparseStatevec(data=vec.flatten())
+            vec_2 = Statevec(data=vec_ref)
+            result = vec_1.measure_and_remove(1, plane, 0.4, rng=np.random.default_rng(seed))
+            result_ref = vec_2.measure_and_remove(1, plane, 0.4, rng=np.random.default_rng(seed))
+            assert result == result_ref
+            assert vec_1.nqubit == 3
+            assert np.allclose(vec_1.flatten(), vec_2.flatten())
+
+    def test_remove_qubit(self) -> None:
+        vec = SparseStatevec(data=[BasicStates.PLUS, BasicStates.ONE, BasicStates.MINUS])
+        vec.remove_qubit(1)
+        assert np.allclose(vec.flatten(), Statevec(data=[BasicStates.PLUS, BasicStates.MINUS]).flatten())
+
+    def test_dense_fallback(self) -> None:
+        nqubit = 13
+        vec = SparseStatevec(nqubit=nqubit, data=BasicStates.ZERO, fill_threshold=0.3)
+        vec_ref = Statevec(nqubit=nqubit, data=BasicStates.ZERO)
+        for qubit in range(11):
+            vec.evolve_single(Ops.H, qubit)
+            vec_ref.evolve_single(Ops.H, qubit)
+        # small states are kept sparse
+        assert vec.dense is None
+        assert vec.fill_ratio == pytest.approx(0.25)
+        for state in (vec, vec_ref):
+            state.evolve_single(Ops.H, 11)
+            state.entangle((0, 12))
+            state.measure_and_remove(1, Plane.XY, 0.3, rng=np.random.default_rng(0))
+        assert vec.dense is not None
+        assert vec.nqubit == nqubit - 1
+        assert np.allclose(vec.flatten(), vec_ref.flatten())
+
+
+class TestSparseStatevectorBackend:
+    def test_pattern(self, fx_rng: Generator) -> None:
+        circuit = rand_circuit(4, 3, fx_rng)
+        pattern = circuit.transpile().pattern
+        pattern.standardize()
+        pattern.minimize_space()
+        state_ref = circuit.simulate_statevector().statevec
+        for fill_threshold in (0.1, 1):
+            state = pattern.simulate_pattern("sparse", fill_threshold=fill_threshold, rng=fx_rng)
+            assert np.abs(np.vdot(state.flatten(), state_ref.flatten())) == pytest.approx(1)
+
+    def test_computational_basis(self, fx_rng: Generator) -> None:
+        # Z-basis preparations and measurements: the state keeps a single nonzero amplitude
+        nqubit = 40
+        pattern = Pattern(input_nodes=[])
+        for node in range(nqubit):
+            pattern.add(command.N(node=node, state=BasicStates.ONE if node % 3 == 0 else BasicStates.ZERO))
+        for node in range(nqubit - 1):
+            pattern.add(command.E(nodes=(node, node + 1)))
+        for node in range(0, nqubit, 2):
+            pattern.add(command.M(node=node, plane=Plane.XZ, angle=0))
+        sim = PatternSimulator(pattern, "sparse", rng=fx_rng)
+        sim.run(input_state=None)
+        state = sim.backend.state
+        assert state.dense is None
+        assert state.nqubit == nqubit // 2
+        assert len(state.values) == 1
+        assert all(sim.measure_method.get_measure_result(node) for node in range(0, nqubit, 6))
+        assert not any(sim.measure_method.get_measure_result(node) for node in range(2, nqubit, 6))
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import copy
 import functools
 from typing import TYPE_CHECKING
 
@@ -7,10 +8,13 @@ import numpy as np
 import pytest
 
 from graphix.fundamentals import Plane
+from graphix.ops import Ops
 from graphix.sim.statevec import Statevec
 from graphix.states import BasicStates, PlanarState
 
 if TYPE_CHECKING:
+    from pathlib import Path
+
     from numpy.random import Generator
 
 
@@ -133,6 +137,20 @@ class TestStatevec:
         assert np.allclose(vec.psi, test_vec.psi)
         assert len(vec.dims()) == len(test_vec.dims())
 
+    def test_copy_independent(self, fx_rng: Generator) -> None:
+        vec = Statevec(nqubit=3)
+        vec.reserve(4)
+        vec_copy = copy.copy(vec)
+        psi = vec.psi.copy()
+        vec_copy.evolve_single(fx_rng.random((2, 2)), 1)
+        vec_copy.entangle((0, 2))
+        vec_copy.add_nodes(1, BasicStates.ZERO)
+        assert np.array_equal(vec.psi, psi)
+        psi_copy = vec_copy.psi.copy()
+        vec.evolve_single(Ops.H, 0)
+        vec.add_nodes(1, BasicStates.ONE)
+        assert np.array_equal(vec_copy.psi, psi_copy)
+
     # try calling with incorrect number of qubits compared to inferred one
     def test_copy_fail(self, fx_rng: Generator) -> None:
         nqb = fx_rng.integers(2, 5)
@@ -143,3 +161,210 @@ class TestStatevec:
 
         with pytest.raises(ValueError):
             _vec = Statevec(nqubit=length - 1, data=test_vec)
+
+    @pytest.mark.parametrize("nqb", [1, 3, 5])
+    def test_evolve_single_inplace(self, fx_rng: Generator, nqb: int) -> None:
+        length = 2**nqb
+        rand_vec = fx_rng.random(length) + 1j * fx_rng.random(length)
+        rand_vec /= np.sqrt(np.sum(np.abs(rand_vec) ** 2))
+        for op in [Ops.X, Ops.Z, Ops.H, fx_rng.random((2, 2)) + 1j * fx_rng.random((2, 2))]:
+            for i in range(nqb):
+                vec = Statevec(data=rand_vec)
+                buffer = vec.psi
+                vec.evolve_single(op, i)
+                expected = np.moveaxis(np.tensordot(op, rand_vec.reshape((2,) * nqb), (1, i)), 0, i)
+                assert np.allclose(vec.psi, expected)
+                assert np.shares_memory(vec.psi, buffer)
+
+    def test_evolve_single_inplace_large(self, fx_rng: Generator) -> None:
+        # large enough for the kernel to process the state by chunks
+        nqb = 18
+        rand_vec = fx_rng.random(2**nqb) + 1j * fx_rng.random(2**nqb)
+        rand_vec /= np.sqrt(np.sum(np.abs(rand_vec) ** 2))
+        for i in [0, nqb // 2, nqb - 1]:
+            vec = Statevec(data=rand_vec)
+            vec.evolve_single(Ops.H, i)
+            expected = np.moveaxis(np.tensordot(Ops.H, rand_vec.reshape((2,) * nqb), (1, i)), 0, i)
+            assert np.allclose(vec.psi, expected)
+
+    def test_evolve_single_object_dtype(self) -> None:
+        vec = Statevec(nqubit=2)
+        op = np.array([[0, 1], [1, 0]], dtype=object)
+        vec.evolve_single(op, 0)
+        assert vec.psi.dtype == np.object_
+        assert np.allclose(vec.psi.astype(np.complex128), Statevec(nqubit=2).psi)
+
+    def test_expectation_single(self, fx_rng: Generator) -> None:
+        nqb = 4
+        rand_vec = fx_rng.random(2**nqb) + 1j * fx_rng.random(2**nqb)
+        vec = Statevec(data=rand_vec / np.linalg.norm(rand_vec))
+        # unnormalized state
+        vec.psi *= 3
+        for op in [Ops.X, Ops.Y, Ops.Z, fx_rng.random((2, 2)) + 1j * fx_rng.random((2, 2))]:
+            for loc in range(nqb):
+                psi = vec.psi / np.linalg.norm(vec.psi)
+                expected = np.vdot(psi, np.moveaxis(np.tensordot(op, psi, (1, loc)), 0, loc))
+                assert vec.expectation_single(op, loc) == pytest.approx(expected)
+
+    def test_reduced_density_single(self, fx_rng: Generator) -> None:
+        nqb = 3
+        rand_vec = fx_rng.random(2**nqb) + 1j * fx_rng.random(2**nqb)
+        vec = Statevec(data=rand_vec / np.linalg.norm(rand_vec))
+        for loc in range(nqb):
+            psi = np.moveaxis(vec.psi, loc, 0).reshape(2, -1)
+            assert np.allclose(vec.reduced_density_single(loc), psi @ psi.conj().T)
+            # non-contiguous state
+            vec_t = Statevec(data=vec)
+            vec_t.psi = vec_t.psi.transpose()
+            assert np.allclose(vec_t.reduced_density_single(nqb - 1 - loc), psi @ psi.conj().T)
+
+    def test_reserve(self, fx_rng: Generator) -> None:
+        vec = Statevec(nqubit=0)
+        ref = Statevec(nqubit=0)
+        vec.reserve(6)
+        buffer = vec.psi.base
+        states = [BasicStates.PLUS, BasicStates.ZERO, PlanarState(Plane.XY, 0.3)]
+        for nqb in range(1, 6):
+            data = states[nqb % len(states)]
+            vec.add_nodes(1, data)
+            ref.add_nodes(1, data)
+            assert np.allclose(vec.psi, ref.psi)
+            assert vec.psi.base is buffer
+        op = fx_rng.random((2, 2)) + 1j * fx_rng.random((2, 2))
+        vec.evolve_single(op, 2)
+        ref.evolve_single(op, 2)
+        for qubit, seed in [(3, 1), (0, 2)]:
+            result = vec.measure_and_remove(qubit, Plane.XY, 0.7, rng=np.random.default_rng(seed))
+            ref_result = ref.measure_and_remove(qubit, Plane.XY, 0.7, rng=np.random.default_rng(seed))
+            assert result == ref_result
+            assert np.allclose(vec.psi, ref.psi)
+            assert vec.psi.base is buffer
+        # the state does not fit in the buffer anymore
+        vec.add_nodes(4, BasicStates.PLUS)
+        ref.add_nodes(4, BasicStates.PLUS)
+        assert np.allclose(vec.psi, ref.psi)
+        assert vec.psi.base is not buffer
+
+    def test_reserve_large(self, fx_rng: Generator) -> None:
+        # large enough for the in-place product to be computed by chunks
+        nqb = 17
+        rand_vec = fx_rng.random(2**nqb) + 1j * fx_rng.random(2**nqb)
+        rand_vec /= np.linalg.norm(rand_vec)
+        vec = Statevec(data=rand_vec)
+        vec.reserve(nqb + 2)
+        vec.add_nodes(2, PlanarState(Plane.XY, 0.3))
+        expected = np.kron(rand_vec, Statevec(nqubit=2, data=PlanarState(Plane.XY, 0.3)).flatten())
+        assert np.allclose(vec.flatten(), expected)
+
+    def test_single_precision(self, fx_rng: Generator) -> None:
+        vec = Statevec(nqubit=3, data=PlanarState(Plane.XY, 0.3), dtype=np.complex64)
+        assert vec.psi.dtype == np.complex64
+        vec.add_nodes(1, BasicStates.PLUS)
+        vec.evolve_single(Ops.H, 1)
+        vec.entangle((0, 3))
+        vec.swap((0, 2))
+        vec.measure_and_remove(2, Plane.XY, 0.5, rng=fx_rng)
+        assert vec.psi.dtype == np.complex64
+        assert Statevec(vec).psi.dtype == np.complex64
+        assert Statevec(vec, dtype=np.complex128).psi.dtype == np.complex128
+
+    def test_measure_and_remove_with_operator(self, fx_rng: Generator) -> None:
+        nqb = 3
+        rand_vec = fx_rng.random(2**nqb) + 1j * fx_rng.random(2**nqb)
+        vec = Statevec(data=rand_vec / np.linalg.norm(rand_vec))
+        vec_ref = Statevec(data=vec)
+        op = Ops.H @ Ops.S
+        vec_ref.evolve_single(op, 1)
+        for seed in range(4):
+            vec_1 = Statevec(data=vec)
+            result = vec_1.measure_and_remove(1, Plane.YZ, 0.4, rng=np.random.default_rng(seed), op=op)
+            vec_2 = Statevec(data=vec_ref)
+            result_ref = vec_2.measure_and_remove(1, Plane.YZ, 0.4, rng=np.random.default_rng(seed))
+            assert result == result_ref
+            assert np.allclose(vec_1.psi, vec_2.psi)
+
+    def test_num_threads(self, fx_rng: Generator) -> None:
+        # large enough for the kernels to be split into several chunks
+        nqb = 18
+        rand_vec = fx_rng.random(2**nqb) + 1j * fx_rng.random(2**nqb)
+        rand_vec /= np.linalg.norm(rand_vec)
+        vec = Statevec(data=rand_vec)
+        vec_threaded = Statevec(data=rand_vec, num_threads=4)
+        edges = [(0, 1), (2, 17), (5, 9), (3, 4), (10, 11), (12, 13)]
+        for state in (vec, vec_threaded):
+            state.evolve_single(Ops.H, 3)
+            state.evolve_single(Ops.S, 17)
+            state.entangle((0, 17))
+            state.entangle_edges(edges)
+            state.measure_and_remove(4, Plane.XY, 0.3, rng=np.random.default_rng(0))
+            state.normalize()
+        assert np.allclose(vec.psi, vec_threaded.psi)
+        assert np.allclose(vec.reduced_density_single(2), vec_threaded.reduced_density_single(2))
+
+    def test_num_threads_invalid(self) -> None:
+        with pytest.raises(ValueError):
+            Statevec(nqubit=1, num_threads=0)
+
+    def test_sample(self, fx_rng: Generator) -> None:
+        vec = Statevec(data=[0, 0, 0, 0, 0, 0, 1, 0])
+        assert np.array_equal(vec.sample(3), np.array([[1, 1, 0]] * 3, dtype=np.uint8))
+        assert np.array_equal(vec.sample(2, qubits=[2, 0], rng=fx_rng), np.array([[0, 1]] * 2, dtype=np.uint8))
+        assert vec.sample(0).shape == (0, 3)
+        with pytest.raises(ValueError):
+            vec.sample(1, qubits=[0, 0])
+
+    def test_sample_marginal(self, fx_rng: Generator) -> None:
+        nqb = 4
+        rand_vec = fx_rng.random(2**nqb) + 1j * fx_rng.random(2**nqb)
+        rand_vec /= np.linalg.norm(rand_vec)
+        vec = Statevec(data=rand_vec)
+        shots = 20000
+        samples = vec.sample(shots, qubits=[3, 1], rng=fx_rng)
+        assert samples.dtype == np.uint8
+        assert samples.shape == (shots, 2)
+        probs = np.abs(rand_vec.reshape((2,) * nqb)) ** 2
+        expected = probs.sum(axis=(0, 2)).T
+        counts = np.zeros((2, 2))
+        np.add.at(counts, (samples[:, 0], samples[:, 1]), 1)
+        assert np.allclose(counts / shots, expected, atol=0.02)
+
+    def test_permute(self, fx_rng: Generator) -> None:
+        nqb = 4
+        rand_vec = fx_rng.random(2**nqb) + 1j * fx_rng.random(2**nqb)
+        rand_vec /= np.linalg.norm(rand_vec)
+        vec = Statevec(data=rand_vec)
+        vec.permute([2, 0, 3, 1])
+        expected = np.transpose(rand_vec.reshape((2,) * nqb), (2, 0, 3, 1))
+        assert np.allclose(vec.psi, expected)
+        # the state is made contiguous again by in-place operations
+        vec.evolve_single(Ops.H, 1)
+        assert vec.psi.flags.c_contiguous
+        assert np.allclose(vec.flatten(), np.moveaxis(np.tensordot(Ops.H, expected, (1, 1)), 0, 1).flatten())
+
+    def test_swap(self, fx_rng: Generator) -> None:
+        nqb = 4
+        rand_vec = fx_rng.random(2**nqb) + 1j * fx_rng.random(2**nqb)
+        rand_vec /= np.linalg.norm(rand_vec)
+        vec = Statevec(data=rand_vec)
+        vec.swap((3, 1))
+        assert np.allclose(vec.psi, np.swapaxes(rand_vec.reshape((2,) * nqb), 1, 3))
+
+    def test_reserve_mmap(self, fx_rng: Generator, tmp_path: Path) -> None:
+        nqb = 17
+        rand_vec = fx_rng.random(2**nqb) + 1j * fx_rng.random(2**nqb)
+        rand_vec /= np.linalg.norm(rand_vec)
+        vec = Statevec(data=rand_vec)
+        vec_ref = Statevec(data=rand_vec)
+        vec.reserve(nqb + 1, path=tmp_path / "psi.bin")
+        assert isinstance(vec.psi, np.memmap)
+        edges = [(0, 1), (2, 16), (5, 9), (3, 4), (10, 11), (12, 13)]
+        for state in (vec, vec_ref):
+            state.add_nodes(1, BasicStates.PLUS)
+            state.entangle_edges(edges)
+            state.swap((0, 17))
+            state.evolve_single(Ops.H, 3)
+            state.measure_and_remove(4, Plane.XY, 0.3, rng=np.random.default_rng(0))
+            state.psi *= 2
+            state.normalize()
+        assert isinstance(vec.psi, np.memmap)
+        assert np.allclose(vec.psi, vec_ref.psi)
@@ -5,17 +5,24 @@ from typing import TYPE_CHECKING
 
 import numpy as np
 import pytest
+from numpy.random import PCG64, Generator
 
 from graphix.clifford import Clifford
 from graphix.fundamentals import Plane
 from graphix.measurements import Measurement
+from graphix.ops import Ops
 from graphix.pauli import Pauli
-from graphix.sim.statevec import Statevec, StatevectorBackend
+from graphix.random_objects import rand_circuit
+from graphix.sim.base_backend import NodeIndex, State, perform_measure
+from graphix.sim.statevec import CZ_TENSOR, FactorizedStatevectorBackend, Statevec, StatevectorBackend
+from graphix.simulator import PatternSimulator
 from graphix.states import BasicStates, PlanarState
+from graphix.transpiler import Circuit
 from tests.test_graphsim import meas_op
+from tests.test_pattern import IterGenerator
 
 if TYPE_CHECKING:
-    from numpy.random import Generator
+    from pathlib import Path
 
 
 class TestStatevec:
@@ -61,6 +68,52 @@ class TestStatevec:
         with pytest.raises(AssertionError):
             sv.remove_qubit(k)
 
+    def test_entangle_inplace(self, fx_rng: Generator) -> None:
+        n = 4
+        rand_vec = fx_rng.random(2**n) + 1j * fx_rng.random(2**n)
+        rand_vec /= np.linalg.norm(rand_vec)
+        for edge in [(0, 1), (3, 1), (0, 3)]:
+            sv = Statevec(data=rand_vec)
+            buffer = sv.psi
+            sv.entangle(edge)
+            expected = np.moveaxis(np.tensordot(CZ_TENSOR, rand_vec.reshape((2,) * n), ((2, 3), edge)), (0, 1), edge)
+            assert np.allclose(sv.psi, expected)
+            assert np.shares_memory(sv.psi, buffer)
+
+    def test_entangle_edges(self, fx_rng: Generator) -> None:
+        n = 6
+        rand_vec = fx_rng.random(2**n) + 1j * fx_rng.random(2**n)
+        rand_vec /= np.linalg.norm(rand_vec)
+        edges = [(i, j) for i in range(n) for j in range(i + 1, n) if fx_rng.random() < 0.6]
+        sv = Statevec(data=rand_vec)
+        sv.entangle_edges(edges)
+        sv_ref = Statevec(data=rand_vec)
+        for edge in edges:
+            sv_ref.entangle(edge)
+        assert np.allclose(sv.psi, sv_ref.psi)
+
+    @pytest.mark.parametrize("plane", Plane)
+    @pytest.mark.parametrize("pr_calc", [False, True])
+    def test_measure_and_remove(self, fx_rng: Generator, plane: Plane, pr_calc: bool) -> None:
+        n = 4
+        rand_vec = fx_rng.random(2**n) + 1j * fx_rng.random(2**n)
+        rand_vec /= np.linalg.norm(rand_vec)
+        angle = fx_rng.random() * 2 * np.pi
+        for qubit in range(n):
+            seed = fx_rng.integers(2**32)
+            sv = Statevec(data=rand_vec)
+            result = sv.measure_and_remove(qubit, plane, angle, rng=np.random.default_rng(seed), pr_calc=pr_calc)
+            sv_ref = Statevec(data=rand_vec)
+            result_ref = perform_measure(qubit, plane, angle, sv_ref, np.random.default_rng(seed), pr_calc=pr_calc)
+            sv_ref.remove_qubit(qubit)
+            assert result == result_ref
+            assert np.allclose(sv.psi, sv_ref.psi)
+
+    def test_measure_and_remove_zero_probability(self) -> None:
+        sv = Statevec(nqubit=2, data=BasicStates.ZERO)
+        with pytest.raises(ValueError):
+            sv.measure_and_remove(0, Plane.XZ, np.pi, pr_calc=False, rng=IterGenerator([0]))
+
 
 class TestStatevecNew:
     # test initialization only
@@ -202,3 +255,203 @@ class TestStatevecNew:
             result = backend.measure(node=node_to_measure, measurement=measurement)
             assert result == expected_result
             assert list(backend.node_index) == list(range(1, n_neighbors + 1))
+
+    def test_entangle_edges_backend(self) -> None:
+        nodes = [3, 1, 4, 5, 9, 2]
+        edges = [*zip(nodes, nodes[1:]), (3, 9), (1, 2)]
+        backend = StatevectorBackend()
+        backend.add_nodes(nodes)
+        backend.entangle_edges(edges)
+        backend_ref = StatevectorBackend()
+        backend_ref.add_nodes(nodes)
+        for edge in edges:
+            backend_ref.entangle_nodes(edge)
+        assert np.allclose(backend.state.psi, backend_ref.state.psi)
+
+    def test_pending_operators(self, fx_rng: Generator) -> None:
+        seed = fx_rng.integers(2**32)
+        backend = StatevectorBackend(rng=np.random.default_rng(seed))
+        backend.add_nodes([0, 1, 2])
+        backend.apply_clifford(0, Clifford.H)
+        backend.apply_single(0, Ops.X)
+        backend.apply_single(1, Ops.Z)
+        backend.apply_clifford(2, Clifford.S)
+        backend.entangle_edges([(0, 1), (1, 2)])
+        backend.apply_clifford(2, Clifford.H)
+        result = backend.measure(2, Measurement(0.3, Plane.XY))
+        ref = Statevec(nqubit=3)
+        ref.evolve_single(Clifford.H.matrix, 0)
+        ref.evolve_single(Ops.X, 0)
+        ref.evolve_single(Ops.Z, 1)
+        ref.evolve_single(Clifford.S.matrix, 2)
+        ref.entangle_edges([(0, 1), (1, 2)])
+        ref.evolve_single(Clifford.H.matrix, 2)
+        result_ref = ref.measure_and_remove(2, Plane.XY, 0.3, rng=np.random.default_rng(seed))
+        assert result == result_ref
+        assert np.allclose(backend.state.psi, ref.psi)
+
+    def test_reset(self) -> None:
+        backend = StatevectorBackend(max_space=3)
+        buffer = backend.state.psi.base
+        backend.add_nodes([0, 1])
+        backend.apply_single(0, Ops.X)
+        rng = np.random.default_rng(1)
+        backend.reset(rng)
+        assert list(backend.node_index) == []
+        assert backend.rng is rng
+        # the pending operator is dropped
+        backend.add_nodes([2], data=BasicStates.ZERO)
+        assert np.allclose(backend.state.flatten(), [1, 0])
+        assert backend.state.psi.base is buffer
+
+    def test_max_space(self, hadamardpattern) -> None:
+        backend = StatevectorBackend(max_space=hadamardpattern.max_space())
+        buffer = backend.state.psi.base
+        assert len(buffer) == 2 ** hadamardpattern.max_space()
+        sim = PatternSimulator(hadamardpattern, backend)
+        sim.run()
+        assert backend.state.psi.base is buffer
+        ref = hadamardpattern.simulate_pattern(max_space=None)
+        assert np.abs(np.vdot(backend.state.flatten(), ref.flatten())) == pytest.approx(1)
+
+    @pytest.mark.parametrize("in_tmp_path", [False, True])
+    def test_mmap_storage(self, fx_rng: Generator, tmp_path: Path, in_tmp_path: bool) -> None:
+        circuit = rand_circuit(5, 4, fx_rng)
+        pattern = circuit.transpile().pattern
+        pattern.standardize()
+        pattern.minimize_space()
+        path = tmp_path / "psi.bin" if in_tmp_path else None
+        sim = PatternSimulator(pattern, "statevector", storage="mmap", path=path, rng=fx_rng)
+        sim.run()
+        assert isinstance(sim.backend.state.psi, np.memmap)
+        if in_tmp_path:
+            assert path.stat().st_size == 2 ** pattern.max_space() * np.dtype(np.complex128).itemsize
+        state_ref = circuit.simulate_statevector().statevec
+        assert np.abs(np.vdot(sim.backend.state.flatten(), state_ref.flatten())) == pytest.approx(1)
+
+    def test_sample(self, fx_rng: Generator) -> None:
+        circuit = Circuit(2)
+        # the inputs are in state |+>: this prepares a Bell state
+        circuit.h(0)
+        circuit.cnot(1, 0)
+        pattern = circuit.transpile().pattern
+        sim = PatternSimulator(pattern, "statevector", rng=fx_rng)
+        sim.run()
+        samples = sim.sample(1000)
+        assert samples.shape == (1000, 2)
+        # the outcomes are equal and uniformly distributed
+        assert np.array_equal(samples[:, 0], samples[:, 1])
+        assert 0.4 < samples[:, 0].mean() < 0.6
+
+    def test_mmap_storage_invalid(self) -> None:
+        with pytest.raises(ValueError):
+            StatevectorBackend(storage="mmap")
+        with pytest.raises(ValueError):
+            StatevectorBackend(max_space=2, storage="disk")
+
+
+def test_node_index() -> None:
+    node_index = NodeIndex()
+    node_index.extend([4, 2, 7, 1])
+    node_index.remove(2)
+    node_index.extend([5])
+    node_index.swap(0, 2)
+    assert list(node_index) == [1, 7, 4, 5]
+    assert [node_index.index(node) for node in node_index] == [0, 1, 2, 3]
+    node_index.remove(7)
+    assert list(node_index) == [1, 4, 5]
+    assert [node_index.index(node) for node in node_index] == [0, 1, 2]
+    assert len(node_index) == 3
+
+
+def test_node_index_reorder() -> None:
+    node_index = NodeIndex()
+    node_index.extend([4, 2, 7, 1])
+    node_index.remove(2)
+    node_index.reorder([2, 0, 1])
+    assert list(node_index) == [1, 4, 7]
+    assert [node_index.index(node) for node in node_index] == [0, 1, 2]
+    node_index.extend([5])
+    assert node_index.index(5) == 3
+    with pytest.raises(ValueError):
+        node_index.reorder([0, 0, 1, 2])
+
+
+def test_sort_qubits(fx_rng: Generator) -> None:
+    backend = StatevectorBackend()
+    nqb = 4
+    rand_vec = fx_rng.random(2**nqb) + 1j * fx_rng.random(2**nqb)
+    rand_vec /= np.linalg.norm(rand_vec)
+    backend.add_nodes([3, 1, 0, 2], data=Statevec(data=rand_vec))
+    backend.finalize([0, 2, 1])
+    assert list(backend.node_index) == [0, 2, 1, 3]
+    expected = np.transpose(rand_vec.reshape((2,) * nqb), (2, 3, 1, 0))
+    assert np.allclose(backend.state.psi, expected)
+
+
+def test_state_permute_with_swaps(fx_rng: Generator) -> None:
+    nqb = 4
+    rand_vec = fx_rng.random(2**nqb) + 1j * fx_rng.random(2**nqb)
+    rand_vec /= np.linalg.norm(rand_vec)
+    vec = Statevec(data=rand_vec)
+    order = [2, 3, 1, 0]
+    # the default implementation, for states that only provide `swap`
+    State.permute(vec, order)
+    expected = np.transpose(rand_vec.reshape((2,) * nqb), order)
+    assert np.allclose(vec.psi, expected)
+
+
+def test_single_precision(fx_rng: Generator) -> None:
+    circuit = rand_circuit(4, 3, fx_rng)
+    pattern = circuit.transpile().pattern
+    pattern.standardize()
+    pattern.minimize_space()
+    state_ref = circuit.simulate_statevector().statevec
+    state = pattern.simulate_pattern(dtype=np.complex64, rng=fx_rng)
+    assert state.psi.dtype == np.complex64
+    assert np.linalg.norm(state.flatten()) == pytest.approx(1, abs=1e-6)
+    assert np.abs(np.vdot(state.flatten(), state_ref.flatten())) == pytest.approx(1, abs=1e-5)
+
+
+class TestFactorizedStatevectorBackend:
+    @pytest.mark.parametrize("jumps", range(1, 6))
+    def test_pattern(self, fx_bg: PCG64, jumps: int) -> None:
+        rng = Generator(fx_bg.jumped(jumps))
+        circuit = rand_circuit(4, 3, rng)
+        pattern = circuit.transpile().pattern
+        state_ref = circuit.simulate_statevector().statevec
+        state = pattern.simulate_pattern(factorize=True, rng=rng)
+        assert np.abs(np.vdot(state.flatten(), state_ref.flatten())) == pytest.approx(1)
+
+    def test_same_outcomes(self, fx_rng: Generator) -> None:
+        pattern = rand_circuit(3, 2, fx_rng).transpile().pattern
+        seed = fx_rng.integers(2**32)
+        sim = PatternSimulator(pattern, factorize=True, rng=np.random.default_rng(seed))
+        sim.run()
+        results = dict(sim.measure_method.results)
+        sim_ref = PatternSimulator(pattern, rng=np.random.default_rng(seed))
+        sim_ref.run()
+        assert results == sim_ref.measure_method.results
+        assert np.abs(np.vdot(sim.backend.state.flatten(), sim_ref.backend.state.flatten())) == pytest.approx(1)
+
+    def test_buffer_size(self, fx_rng: Generator) -> None:
+        pattern = rand_circuit(3, 2, fx_rng).transpile().pattern
+        assert pattern.max_space() > len(pattern.output_nodes)
+        sim = PatternSimulator(pattern, factorize=True, rng=fx_rng)
+        sim.run()
+        # the buffer of the main state only holds the output qubits
+        assert sim.backend.state.psi.base.size == 2 ** len(pattern.output_nodes)
+
+    def test_blocks(self) -> None:
+        backend = FactorizedStatevectorBackend()
+        backend.add_nodes([0, 1, 2, 3])
+        assert len(backend.blocks) == 4
+        backend.entangle_edges([(0, 1), (2, 3)])
+        assert sorted(len(block.node_index) for block in backend.blocks) == [2, 2]
+        backend.measure(1, Measurement(0, Plane.XY))
+        assert sorted(len(block.node_index) for block in backend.blocks) == [1, 2]
+        backend.entangle_nodes((0, 2))
+        assert [len(block.node_index) for block in backend.blocks] == [3]
+        backend.finalize([3, 0, 2])
+        assert list(backend.node_index) == [3, 0, 2]
+        assert backend.blocks == []
@@ -9,10 +9,14 @@ from numpy.random import PCG64, Generator
 from quimb.tensor import Tensor
 
 from graphix.clifford import Clifford
-from graphix.command import C, E, X, Z
+from graphix.command import C, E, M, N, X, Z
+from graphix.fundamentals import Plane
 from graphix.ops import Ops
+from graphix.parameter import Placeholder
+from graphix.pattern import Pattern
 from graphix.random_objects import rand_circuit
-from graphix.sim.tensornet import MBQCTensorNet, gen_str
+from graphix.sim.tensornet import ContractionPathCache, MBQCTensorNet, gen_str
+from graphix.simulator import PatternSimulator
 from graphix.states import BasicStates
 from graphix.transpiler import Circuit
 
@@ -380,6 +384,104 @@ class TestTN:
         inner_product = np.inner(statevec_tn, statevec_ref.flatten().conjugate())
         assert abs(inner_product) == pytest.approx(1)
 
+    @pytest.mark.parametrize("max_open", [0, 2, 10])
+    def test_to_statevector_sliced(self, fx_rng: Generator, max_open: int) -> None:
+        circuit = rand_circuit(4, 2, fx_rng)
+        pattern = circuit.transpile().pattern
+        pattern.standardize()
+        statevec_ref = circuit.simulate_statevector().statevec
+        tn = pattern.simulate_pattern("tensornetwork", rng=fx_rng)
+        statevec_tn = tn.to_statevector(max_open=max_open)
+        assert statevec_tn.shape == (2**4,)
+        assert abs(np.vdot(statevec_tn, statevec_ref.flatten())) == pytest.approx(1)
+
+    def test_path_cache(self, fx_rng: Generator, tmp_path) -> None:
+        alpha = Placeholder("alpha")
+        circuit = rand_circuit(3, 2, fx_rng, parameters=[alpha])
+        pattern = circuit.transpile().pattern
+        pattern.standardize()
+        file = tmp_path / "paths.json"
+        cache = ContractionPathCache(path=file)
+        for value in (0.3, 1.1):
+            tn = pattern.subs(alpha, value).simulate_pattern("tensornetwork", path_cache=cache, rng=fx_rng)
+            statevec_ref = circuit.subs(alpha, value).simulate_statevector().statevec
+            assert abs(np.vdot(tn.to_statevector(), statevec_ref.flatten())) == pytest.approx(1)
+            assert tn.get_norm() == pytest.approx(1)
+            # the structure of the network does not depend on the angles
+            assert len(cache) == 2
+        # the paths are persisted
+        assert len(ContractionPathCache(path=file)) == 2
+        # the least recently used paths are discarded
+        small_cache = ContractionPathCache(maxsize=1)
+        tn = pattern.subs(alpha, 0.3).simulate_pattern("tensornetwork", path_cache=small_cache, rng=fx_rng)
+        tn.to_statevector()
+        tn.get_norm()
+        assert len(small_cache) == 1
+
+    def test_cached_norm(self, fx_rng: Generator) -> None:
+        circuit = rand_circuit(3, 2, fx_rng)
+        pattern = circuit.transpile().pattern
+        pattern.standardize()
+        tn = pattern.simulate_pattern("tensornetwork", rng=fx_rng)
+        statevec = tn.to_statevector()
+        norm = tn.get_norm()
+        coefs = [tn.get_basis_coefficient(number, normalize=False) for number in range(len(statevec))]
+        assert np.allclose(np.array(coefs) / norm, statevec)
+        # the cached norm and networks are discarded when the network is modified
+        tn.evolve_single(pattern.output_nodes[0], 2 * Ops.X)
+        assert tn.get_norm() == pytest.approx(2 * norm)
+        statevec = statevec.reshape((2,) * 3)[::-1].flatten()
+        assert np.allclose([tn.get_basis_coefficient(number) for number in range(len(statevec))], statevec)
+        assert np.allclose(tn.to_statevector(), statevec)
+
+    @pytest.mark.parametrize("graph_prep", ["parallel", "sequential"])
+    def test_reduced_density_single(self, fx_rng: Generator, graph_prep: str) -> None:
+        circuit = rand_circuit(3, 2, fx_rng)
+        pattern = circuit.transpile().pattern
+        pattern.standardize()
+        statevec_ref = circuit.simulate_statevector().statevec
+        tn = pattern.simulate_pattern("tensornetwork", graph_prep=graph_prep, rng=fx_rng)
+        for i, node in enumerate(pattern.output_nodes):
+            rho = tn.reduced_density_single(node)
+            rho_ref = statevec_ref.reduced_density_single(i)
+            assert np.allclose(rho / np.trace(rho), rho_ref / np.trace(rho_ref))
+        assert np.trace(tn.reduced_density_single(pattern.output_nodes[0])) == pytest.approx(tn.get_norm() ** 2)
+        # the environments are updated when nodes are measured
+        tn.measure_single(pattern.output_nodes[0], basis="X", bypass_probability_calculation=False)
+        with pytest.raises(ValueError):
+            tn.reduced_density_single(pattern.output_nodes[0])
+        assert np.trace(tn.reduced_density_single(pattern.output_nodes[1])) == pytest.approx(1)
+
+    def test_measure_single_probability(self, fx_rng: Generator) -> None:
+        circuit = Circuit(1)
+        circuit.h(0)
+        pattern = circuit.transpile().pattern
+        pattern.standardize()
+        (node,) = pattern.output_nodes
+        for _ in range(5):
+            # the output state is |0>
+            tn = pattern.simulate_pattern("tensornetwork", rng=fx_rng)
+            assert tn.measure_single(node, basis="Z", bypass_probability_calculation=False) == 0
+        tn = pattern.simulate_pattern("tensornetwork", rng=fx_rng)
+        with pytest.raises(ValueError):
+            tn.measure_single(node, basis="Z", bypass_probability_calculation=False, outcome=1)
+
+    @pytest.mark.parametrize("pr_calc", [False, True])
+    def test_measure_probability(self, pr_calc: bool) -> None:
+        # after the measurement of node 0, node 1 is in state |s_0>
+        pattern = Pattern(input_nodes=[0])
+        pattern.add(N(node=1))
+        pattern.add(E(nodes=(0, 1)))
+        pattern.add(M(node=0))
+        pattern.add(M(node=1, plane=Plane.XZ, angle=0))
+        correlated = []
+        for seed in range(20):
+            sim = PatternSimulator(pattern, "tensornetwork", rng=np.random.default_rng(seed), pr_calc=pr_calc)
+            sim.run()
+            results = [sim.measure_method.get_measure_result(node) for node in (0, 1)]
+            correlated.append(results[0] == results[1])
+        assert all(correlated) == pr_calc
+
     @pytest.mark.parametrize("jumps", range(1, 11))
     def test_evolve(self, fx_bg: PCG64, jumps: int, fx_rng: Generator) -> None:
         rng = Generator(fx_bg.jumped(jumps))
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from graphix.channels import KrausChannel, KrausData
+from graphix.noise_models.noiseless_noise_model import NoiselessNoiseModel
+from graphix.random_objects import rand_circuit
+from graphix.sim.density_matrix import DensityMatrix
+from graphix.sim.trajectory import TrajectoryBackend, _reduced_density, simulate_trajectories
+from graphix.simulator import PatternSimulator
+from graphix.states import BasicStates
+from graphix.transpiler import Circuit
+from tests.test_noisy_density_matrix import NoiseModelTester
+
+if TYPE_CHECKING:
+    from numpy.random import Generator
+
+    from graphix.sim.statevec import Statevec
+
+
+def amplitude_damping_channel(gamma: float) -> KrausChannel:
+    return KrausChannel(
+        [
+            KrausData(1.0, np.array([[1, 0], [0, np.sqrt(1 - gamma)]])),
+            KrausData(np.sqrt(gamma), np.array([[0, 1], [0, 0]])),
+        ]
+    )
+
+
+def population_0(state: Statevec) -> float:
+    return abs(state.flatten()[0]) ** 2
+
+
+class TestTrajectoryBackend:
+    def test_noiseless(self, fx_rng: Generator) -> None:
+        circuit = rand_circuit(3, 2, fx_rng)
+        pattern = circuit.transpile().pattern
+        state_ref = circuit.simulate_statevector().statevec
+        state = pattern.simulate_pattern("trajectory", noise_model=NoiselessNoiseModel(), rng=fx_rng)
+        assert np.abs(np.vdot(state.flatten(), state_ref.flatten())) == pytest.approx(1)
+
+    def test_non_unitary_channel(self, fx_rng: Generator) -> None:
+        backend = TrajectoryBackend(rng=fx_rng)
+        backend.add_nodes([0, 1], data=[BasicStates.PLUS, BasicStates.ONE])
+        # full damping takes the qubit to |0> on both branches
+        backend.apply_channel(amplitude_damping_channel(1.0), [0])
+        backend.apply_channel(amplitude_damping_channel(1.0), [1])
+        assert np.allclose(backend.state.flatten(), [1, 0, 0, 0])
+
+    def test_sample(self, fx_rng: Generator) -> None:
+        pattern = rand_circuit(2, 1, fx_rng).transpile().pattern
+        sim = PatternSimulator(pattern, "trajectory", noise_model=NoiselessNoiseModel(), rng=fx_rng)
+        sim.run()
+        with pytest.raises(ValueError, match="simulate_trajectories"):
+            sim.sample(10)
+
+    def test_reset(self) -> None:
+        circuit = Circuit(2)
+        circuit.cnot(0, 1)
+        pattern = circuit.transpile().pattern
+        noise_model = NoiseModelTester(prepare_error_prob=0.2)
+        backend = TrajectoryBackend(max_space=pattern.max_space())
+        states = []
+        for seed in (1, 2):
+            backend.reset(np.random.default_rng(seed))
+            PatternSimulator(pattern, backend, noise_model=noise_model).run()
+            states.append(backend.state.psi)
+            state_ref = pattern.simulate_pattern("trajectory", noise_model=noise_model, rng=np.random.default_rng(seed))
+            assert np.allclose(backend.state.flatten(), state_ref.flatten())
+        # the second trajectory is computed in the buffer of the first one
+        assert states[0].base is states[1].base is not None
+
+    @pytest.mark.parametrize("chunk_size", [2, 1 << 16])
+    def test_reduced_density(self, fx_rng: Generator, monkeypatch: pytest.MonkeyPatch, chunk_size: int) -> None:
+        monkeypatch.setattr("graphix.sim.statevec._CHUNK_SIZE", chunk_size)
+        psi = fx_rng.random(2**4) + 1j * fx_rng.random(2**4)
+        psi /= np.linalg.norm(psi)
+        dm = DensityMatrix(data=np.outer(psi, psi.conj()))
+        dm.ptrace([0, 2])
+        dm.swap((0, 1))
+        assert np.allclose(_reduced_density(psi.reshape((2,) * 4), [3, 1]), dm.rho)
+
+
+class TestSimulateTrajectories:
+    def test_density_matrix(self) -> None:
+        circuit = Circuit(1)
+        circuit.h(0)
+        pattern = circuit.transpile().pattern
+        noise_model = NoiseModelTester(prepare_error_prob=0.3, entanglement_error_prob=0.2)
+        rho = pattern.simulate_pattern("densitymatrix", noise_model=noise_model).rho
+        estimate = simulate_trajectories(pattern, noise_model, 400, population_0, seed=1, confidence=0.99)
+        assert len(estimate.values) == 400
+        assert estimate.interval[0] < estimate.mean < estimate.interval[1]
+        assert estimate.interval[0] < rho[0, 0].real < estimate.interval[1]
+
+    def test_max_workers(self) -> None:
+        circuit = Circuit(2)
+        circuit.cnot(0, 1)
+        pattern = circuit.transpile().pattern
+        noise_model = NoiseModelTester(prepare_error_prob=0.2)
+        estimate = simulate_trajectories(pattern, noise_model, 8, population_0, seed=3)
+        estimate_pool = simulate_trajectories(pattern, noise_model, 8, population_0, seed=3, max_workers=2)
+        assert np.array_equal(estimate.values, estimate_pool.values)
+
+    def test_invalid(self) -> None:
+        pattern = Circuit(1).transpile().pattern
+        with pytest.raises(ValueError):
+            simulate_trajectories(pattern, NoiselessNoiseModel(), 0, population_0)
+        with pytest.raises(ValueError):
+            simulate_trajectories(pattern, NoiselessNoiseModel(), 1, population_0, confidence=1)
+        with pytest.raises(ValueError):
+            PatternSimulator(pattern, "statevector", noise_model=NoiselessNoiseModel())